@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List
+from app_utils.metrics import REGISTRY
+
+RUNTIME_ASYNCIO = 'asyncio'
+
+class AsyncRuntime:
+    """
+    Runtime de un solo event loop (runtime: asyncio).
+
+    El lector serial (reader del loop sobre el descriptor del puerto), el
+    vaciado de la cola MQTT, los temporizadores GPIO y los RPC corren como
+    coroutines en el hilo principal. Las llamadas bloqueantes (abrir el puerto,
+    conectar, publicar, fsync del log) van a un executor pequeño, y las
+    escrituras del log de la cola (put y ack) a un hilo propio. Solo quedan
+    además el hilo de red de paho y los de los executors.
+
+    Igual que ThreadManager, una tarea que termina con una excepción se
+    reinicia a los 5 segundos; una que termina normalmente no se reinicia.
+    """
+
+    def __init__(self, app, executor_workers: int = 2):
+        self.app = app
+        self.executor_workers = executor_workers
+        self.restart_delay = 5
+        self.logger = logging.getLogger(__name__)
+        self.restarts = REGISTRY.counter('facp_thread_restarts_total', 'Tasks restarted after dying')
+
+    def run(self) -> None:
+        asyncio.run(self._main())
+
+    async def _supervise(self, coroutine: Callable[[], Awaitable[None]]) -> None:
+        name = coroutine.__name__
+        while True:
+            try:
+                await coroutine()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Task {name} has died: {e}. Restarting in {self.restart_delay} seconds.")
+                await asyncio.sleep(self.restart_delay)
+                self.restarts.inc()
+
+    def _coroutines(self) -> List[Callable[[], Awaitable[None]]]:
+        app = self.app
+        # El lector serial primero: abre el puerto antes que la conexión MQTT ocupe el executor
+        coroutines = [
+            app.serial_handler.listening_to_serial_async,
+            app.mqtt_handler.process_queue_async,
+            app.queue_manager.sync_queue_periodically_async,
+            app.relay_monitor.monitor_relays_async,
+            app.relay_controller.relay_control_async
+        ]
+        if app.config.events.unknown_report_interval > 0:
+            coroutines.append(app.serial_handler.report_unknown_events_async)
+        if app.config.metrics.telemetry_interval > 0:
+            coroutines.append(app.metrics_reporter.report_metrics_async)
+        if app.config.tracing.enabled and app.config.tracing.report_interval > 0:
+            coroutines.append(app.mqtt_handler.report_latency_async)
+        return coroutines
+
+    async def _main(self) -> None:
+        app = self.app
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.executor_workers, thread_name_prefix='runtime-io')
+        loop.set_default_executor(executor)
+        # Un hilo propio para el log de la cola: put y ack no bloquean el loop y se escriben en orden
+        log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='queue-log')
+        app.queue.log_executor = log_executor
+
+        stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+
+        # Arranque escalonado como en el runtime de hilos; el backlog se restaura en su propio hilo
+        await app.mqtt_handler.start_async()
+        app.queue_manager.start_restore()
+        app.serial_handler = app._create_serial_handler()
+        app.silence_controller.loop = loop
+        app.reset_controller.loop = loop
+        if app.profiler:
+            app.profiler.loop = loop
+
+        # Configurar manejadores RPC
+        app._setup_rpc_handlers()
+
+        tasks = [loop.create_task(self._supervise(coroutine), name=coroutine.__name__)
+                 for coroutine in self._coroutines()]
+        for task in tasks:
+            self.logger.info(f"Started task: {task.get_name()}")
+        # Dejar que cada tarea dé su primer paso antes de levantar el endpoint de métricas
+        await asyncio.sleep(0)
+        app.metrics_reporter.start_server()
+        app.start_gpio_script()
+
+        try:
+            await stop.wait()
+            self.logger.info("Program terminated by signal")
+        finally:
+            controller_tasks = [*app.silence_controller.tasks, *app.reset_controller.tasks]
+            for task in tasks + controller_tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, *controller_tasks, return_exceptions=True)
+            app.mqtt_handler.loop = None
+            app.silence_controller.loop = None
+            app.reset_controller.loop = None
+            if app.profiler:
+                app.profiler.loop = None
+            app.queue.on_put = None
+            # Escribir lo pendiente antes de que el apagado cierre el log
+            app.queue.log_executor = None
+            log_executor.shutdown(wait=True)
@@ -1,50 +1,63 @@
 import logging
+from typing import Dict
 from config.loader import ConfigSchema
+from config.schema import PanelProfileSchema
 from classes.mqtt_sender import MqttHandler
-from classes.specific_serial_handler import Edwards_iO1000, Edwards_EST3x, Notifier_NFS, Simplex
+from classes.panel_profile import PanelProfile
 from app_utils.queue_operations import SafeQueue
-from components.update_app import update_check_thread
 from components.relay_controller import RelayController
 from components.silence_controller import SilenceController
 from components.reset_controller import ResetController
 from components.queue_manager import QueueManager
 from components.thread_manager import ThreadManager
+from components.metrics_reporter import MetricsReporter
+from app_utils.metrics import REGISTRY
 from classes.relay_monitor import RelayMonitor
+from classes.gpio_backend import SimulatedGpio, create_gpio_backend, load_gpio_script
 from classes.serial_port_handler import SerialPortHandler
+from app.async_runtime import AsyncRuntime, RUNTIME_ASYNCIO
 
 class Application:
-    def __init__(self, config: ConfigSchema, event_severity_levels: dict):
+    def __init__(self, config: ConfigSchema, event_severity_levels: dict, panel_profiles: Dict[int, PanelProfileSchema]):
         self.config = config
         self.event_severity_levels = event_severity_levels
+        self.panel_profiles = panel_profiles
         self.queue = SafeQueue()
         self.mqtt_handler = MqttHandler(self.config, self.queue)
         self.id_modelo_panel: int = self.config.id_modelo_panel
         self.serial_handler: SerialPortHandler = None
 
-        self.queue_manager = QueueManager(self.queue, "queue_backup.pkl")
-        self.relay_controller = RelayController(config.relay)
-        self.silence_controller = SilenceController(config.silence_relay, self.mqtt_handler)
-        self.reset_controller = ResetController(config.reset_relay, self.mqtt_handler)
-        self.relay_monitor = RelayMonitor(config, self.mqtt_handler)
+        self.queue_manager = QueueManager(self.queue, self.config.queue)
+        self.gpio = create_gpio_backend(config.gpio.backend)
+        self.relay_controller = RelayController(config.relay, self.gpio)
+        self.silence_controller = SilenceController(config.silence_relay, self.mqtt_handler, self.gpio)
+        self.reset_controller = ResetController(config.reset_relay, self.mqtt_handler, self.gpio)
+        self.relay_monitor = RelayMonitor(config, self.mqtt_handler, self.gpio)
+        self.profiler = self._create_profiler()
         self.thread_manager = ThreadManager()
+        self.metrics_reporter = MetricsReporter(REGISTRY, self.mqtt_handler, config.metrics)
 
         self.logger = logging.getLogger(__name__)
 
+    def _create_profiler(self):
+        """El perfilador (tracemalloc, gzip) solo se importa si está habilitado"""
+        if not self.config.profiling.enabled:
+            return None
+        from components.profiler import ProfilerController
+        return ProfilerController(self.config.profiling)
+
     def _create_serial_handler(self):
         severity_list = self.event_severity_levels.get(self.id_modelo_panel, {})
         
-        handlers = {
-            10001: Edwards_iO1000,
-            10002: Edwards_EST3x,
-            10003: Notifier_NFS,
-            10004: Simplex
-        }
-        
-        handler_class = handlers.get(self.id_modelo_panel)
-        if not handler_class:
+        profile_schema = self.panel_profiles.get(self.id_modelo_panel)
+        if not profile_schema:
             raise ValueError(f"Unsupported panel model: {self.id_modelo_panel}")
         
-        return handler_class(self.config, severity_list, self.queue)
+        # El perfil se compila una sola vez al arrancar
+        profile = PanelProfile(self.id_modelo_panel, profile_schema)
+        self.logger.info(f"Using panel profile {profile.name} ({profile.code})")
+        
+        return SerialPortHandler(self.config, severity_list, self.queue, profile, self.mqtt_handler.tracer)
 
     def _setup_rpc_handlers(self):
         """Configura los manejadores de comandos RPC desde ThingsBoard"""
@@ -60,6 +73,13 @@ class Application:
                 'reiniciar_panel',
                 self.reset_controller.handle_reset_rpc
             )
+
+            # Perfilado bajo demanda, solo si está habilitado
+            if self.profiler:
+                self.mqtt_handler.subscribe_to_rpc(
+                    'perfilar_proceso',
+                    self.profiler.handle_profile_rpc
+                )
             
             self.logger.info("RPC handlers configured successfully")
             
@@ -78,25 +98,52 @@ class Application:
         except Exception as e:
             self.logger.error(f"Error setting up RPC handlers: {e}")
 
+    def start_gpio_script(self):
+        """Con el backend simulado, reproduce el guion de entradas configurado"""
+        script = self.config.gpio.script
+        if not script:
+            return
+        if not isinstance(self.gpio, SimulatedGpio):
+            self.logger.warning("gpio.script is only used with the simulated GPIO backend")
+            return
+        self.gpio.play_in_background(load_gpio_script(script), self.config.gpio.script_speed)
+        self.logger.info(f"Playing GPIO script {script} at {self.config.gpio.script_speed}x")
+
     def start(self):
+        """
+        Arranque escalonado: primero el lector serial, que encola desde el
+        inicio; la restauración del backlog y la conexión MQTT siguen en
+        paralelo sin demorarlo.
+        """
         self.logger.info("Starting application...")
-        self.queue_manager.load_queue()
-        self.mqtt_handler.start()
-        
-        # Configurar manejadores RPC
-        self._setup_rpc_handlers()
-        
+        if self.config.runtime == RUNTIME_ASYNCIO:
+            self._start_async()
+            return
+
+        self.queue_manager.start_restore()
         self.serial_handler = self._create_serial_handler()
         
         threads = [
-            self.queue_manager.save_queue_periodically,
+            self.serial_handler.listening_to_serial,
+            self.queue_manager.sync_queue_periodically,
             self.relay_monitor.monitor_relays,
-            self.relay_controller.relay_control,
-            self.serial_handler.listening_to_serial
+            self.relay_controller.relay_control
         ]
+        if self.config.events.unknown_report_interval > 0:
+            threads.append(self.serial_handler.report_unknown_events)
+        if self.config.metrics.telemetry_interval > 0:
+            threads.append(self.metrics_reporter.report_metrics)
+        if self.config.tracing.enabled and self.config.tracing.report_interval > 0:
+            threads.append(self.mqtt_handler.report_latency)
 
         self.thread_manager.start_threads(threads)
 
+        # Configurar manejadores RPC antes de conectar
+        self._setup_rpc_handlers()
+        self.mqtt_handler.start()
+        self.metrics_reporter.start_server()
+        self.start_gpio_script()
+
         try:
             self.thread_manager.monitor_threads()
         except KeyboardInterrupt:
@@ -104,13 +151,27 @@ class Application:
         finally:
             self.shutdown()
 
+    def _start_async(self):
+        self.logger.info("Using asyncio runtime")
+        try:
+            AsyncRuntime(self).run()
+        except KeyboardInterrupt:
+            self.logger.info("Program terminated by user")
+        finally:
+            self.shutdown()
+
     def shutdown(self):
         self.logger.info("Initiating graceful shutdown...")
+        if self.serial_handler:
+            self.serial_handler.request_stop()
         self.thread_manager.stop_all_threads()
-        self.queue_manager.save_queue()
         self.relay_controller.cleanup()
         self.silence_controller.cleanup()
         self.reset_controller.cleanup()
         self.relay_monitor.cleanup()
         self.mqtt_handler.stop()
+        self.queue_manager.close()
+        self.metrics_reporter.stop()
+        if self.serial_handler and self.serial_handler.capture:
+            self.serial_handler.capture.close()
         self.logger.info("Graceful shutdown completed")
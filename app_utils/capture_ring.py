@@ -0,0 +1,221 @@
+"""
+Anillo de captura de bytes crudos del puerto serial, sobre un archivo
+mapeado en memoria de tamaño fijo.
+
+Exportar un rango de tiempo en el formato de captura de
+benchmarks/panel_emulator.py (JSON Lines):
+    python -m app_utils.capture_ring serial_capture.ring --last 600 -o salida.jsonl
+    python -m app_utils.capture_ring serial_capture.ring --since 2025-02-01T10:15 --until 2025-02-01T10:20
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+from typing import Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Encabezado del archivo: magic, capacidad del área de datos, head y tail (offsets lógicos)
+FILE_MAGIC = b'FACPRNG1'
+FILE_HEADER = struct.Struct('<8sQQQ')
+DATA_OFFSET = 64
+# Registro: tipo, largo de los datos, time.monotonic_ns() y time.time_ns() de la lectura
+RECORD_HEADER = struct.Struct('<IIqq')
+RECORD_DATA = 0xFAC0DA7A
+RECORD_PAD = 0xFAC0BAD0
+
+MIN_CAPACITY = 4096
+
+
+class CaptureRing:
+    """
+    Escritor del anillo de captura.
+
+    Cada lectura del puerto se copia al mapa como un registro (encabezado de
+    24 bytes y los bytes tal cual llegaron); no hay E/S explícita ni
+    asignaciones por línea, el sistema operativo escribe las páginas
+    modificadas al archivo. head y tail son offsets lógicos que solo crecen:
+    al dar la vuelta se descartan los registros más antiguos avanzando tail.
+    El archivo se conserva entre reinicios, así que lo capturado antes de una
+    caída de la aplicación sigue disponible (un corte de luz puede perder lo
+    que el sistema aún no escribió).
+
+    Cualquier error desactiva la captura: nunca debe afectar la lectura serial.
+    """
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.capacity = max(MIN_CAPACITY, size - DATA_OFFSET)
+        # Un registro nunca ocupa más de un cuarto del anillo
+        self.max_record = self.capacity // 4 - RECORD_HEADER.size
+        self.mm: mmap.mmap | None = None
+        self.head = 0
+        self.tail = 0
+        self._open()
+
+    def _open(self) -> None:
+        file_size = DATA_OFFSET + self.capacity
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            reuse = os.fstat(fd).st_size == file_size
+            if not reuse:
+                os.ftruncate(fd, file_size)
+            self.mm = mmap.mmap(fd, file_size)
+        finally:
+            os.close(fd)
+
+        magic, capacity, head, tail = FILE_HEADER.unpack_from(self.mm, 0)
+        if reuse and magic == FILE_MAGIC and capacity == self.capacity and tail <= head:
+            self.head, self.tail = head, tail
+            logger.info(f"Serial capture ring opened: {_format_size(self.head - self.tail)} captured in {self.path}")
+        else:
+            self.head = self.tail = 0
+            FILE_HEADER.pack_into(self.mm, 0, FILE_MAGIC, self.capacity, 0, 0)
+            logger.info(f"Serial capture ring created: {self.path} ({_format_size(self.capacity)})")
+
+    def write(self, data: bytes) -> None:
+        mm = self.mm
+        if mm is None or not data:
+            return
+        try:
+            mono_ns, wall_ns = time.monotonic_ns(), time.time_ns()
+            if len(data) <= self.max_record:
+                self._append(mm, data, mono_ns, wall_ns)
+            else:
+                view = memoryview(data)
+                for start in range(0, len(data), self.max_record):
+                    self._append(mm, view[start:start + self.max_record], mono_ns, wall_ns)
+            FILE_HEADER.pack_into(mm, 0, FILE_MAGIC, self.capacity, self.head, self.tail)
+        except Exception as e:
+            self.mm = None
+            logger.error(f"Serial capture disabled after write error: {e}")
+
+    def _append(self, mm: mmap.mmap, data, mono_ns: int, wall_ns: int) -> None:
+        size = RECORD_HEADER.size + len(data)
+        position = self.head % self.capacity
+        remaining = self.capacity - position
+        if remaining < size:
+            # No cabe antes del final: rellenar y seguir desde el inicio del área
+            self._reserve(remaining)
+            if remaining >= RECORD_HEADER.size:
+                RECORD_HEADER.pack_into(mm, DATA_OFFSET + position, RECORD_PAD,
+                                        remaining - RECORD_HEADER.size, 0, 0)
+            self.head += remaining
+            position = 0
+
+        self._reserve(size)
+        offset = DATA_OFFSET + position
+        RECORD_HEADER.pack_into(mm, offset, RECORD_DATA, len(data), mono_ns, wall_ns)
+        mm[offset + RECORD_HEADER.size:offset + size] = data
+        self.head += size
+
+    def _reserve(self, size: int) -> None:
+        """Avanza tail hasta que haya ``size`` bytes libres después de head"""
+        limit = self.head + size - self.capacity
+        if self.tail >= limit:
+            return
+        while self.tail < limit:
+            self.tail = _next_record(self.mm, self.capacity, self.tail)
+        # Encabezado antes de sobrescribir: una caída a mitad deja un anillo consistente
+        FILE_HEADER.pack_into(self.mm, 0, FILE_MAGIC, self.capacity, self.head, self.tail)
+
+    def close(self) -> None:
+        mm, self.mm = self.mm, None
+        if mm is not None:
+            mm.flush()
+            mm.close()
+
+
+def _format_size(size: int) -> str:
+    return f"{size / 1024:.1f} KiB"
+
+
+def _next_record(mm, capacity: int, logical: int) -> int:
+    """Offset lógico del registro que sigue al que empieza en ``logical``"""
+    position = logical % capacity
+    if capacity - position < RECORD_HEADER.size:
+        return logical + capacity - position
+    _, length, _, _ = RECORD_HEADER.unpack_from(mm, DATA_OFFSET + position)
+    return logical + RECORD_HEADER.size + length
+
+
+def read_records(path: str) -> Iterator[Tuple[int, int, bytes]]:
+    """Registros del anillo, del más antiguo al más reciente: (monotonic_ns, wall_ns, datos)"""
+    with open(path, 'rb') as f:
+        buffer = f.read()
+    magic, capacity, head, tail = FILE_HEADER.unpack_from(buffer, 0)
+    if magic != FILE_MAGIC:
+        raise ValueError(f"{path} is not a serial capture ring")
+
+    logical = tail
+    while logical < head:
+        position = logical % capacity
+        if capacity - position >= RECORD_HEADER.size:
+            kind, length, mono_ns, wall_ns = RECORD_HEADER.unpack_from(buffer, DATA_OFFSET + position)
+            if kind not in (RECORD_DATA, RECORD_PAD) or position + RECORD_HEADER.size + length > capacity:
+                raise ValueError(f"Corrupted capture record at offset {logical}")
+            if kind == RECORD_DATA:
+                start = DATA_OFFSET + position + RECORD_HEADER.size
+                yield mono_ns, wall_ns, buffer[start:start + length]
+        logical = _next_record(buffer, capacity, logical)
+
+
+def export_capture(path: str, out, since_ns: int | None = None, until_ns: int | None = None) -> int:
+    """
+    Escribe en ``out`` los registros con hora entre since_ns y until_ns en el
+    formato de captura de panel_emulator. ``t`` se calcula con el reloj
+    monotónico; si retrocede (la captura abarca un reinicio del equipo) se usa
+    la diferencia de hora de pared. Devuelve la cantidad de registros escritos.
+    """
+    count = 0
+    t = 0.0
+    previous = None
+    for mono_ns, wall_ns, data in read_records(path):
+        if since_ns is not None and wall_ns < since_ns:
+            continue
+        if until_ns is not None and wall_ns > until_ns:
+            break
+        if previous is not None:
+            prev_mono, prev_wall = previous
+            delta = mono_ns - prev_mono if mono_ns >= prev_mono else max(0, wall_ns - prev_wall)
+            t += delta / 1e9
+        previous = (mono_ns, wall_ns)
+        out.write(json.dumps({"t": round(t, 6), "data": data.decode('latin-1')}) + "\n")
+        count += 1
+    return count
+
+
+def _parse_time(value: str) -> int:
+    return int(datetime.fromisoformat(value).timestamp() * 1e9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("ring", help="Archivo del anillo (config.serial.capture_file)")
+    parser.add_argument("--since", help="Hora local de inicio, ISO 8601")
+    parser.add_argument("--until", help="Hora local de fin, ISO 8601")
+    parser.add_argument("--last", type=float, help="Solo los últimos N segundos")
+    parser.add_argument("-o", "--output", help="Archivo de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    since_ns = _parse_time(args.since) if args.since else None
+    until_ns = _parse_time(args.until) if args.until else None
+    if args.last is not None:
+        since_ns = time.time_ns() - int(args.last * 1e9)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        count = export_capture(args.ring, out, since_ns, until_ns)
+    finally:
+        if args.output:
+            out.close()
+    print(f"{count} records exported", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
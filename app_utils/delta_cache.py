@@ -0,0 +1,84 @@
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class DeltaCache:
+    """
+    Último valor publicado por clave, para enviar solo las claves que cambiaron.
+
+    filter() devuelve las claves cuyo valor difiere del último valor aceptado
+    para entrega; commit() registra los valores aceptados. La telemetría que
+    pasa por la cola se acepta al encolarse (el log la conserva hasta el
+    PUBACK); la que se envía directo, solo si el envío se hizo.
+
+    Cada keyframe_interval segundos, y con reset() (p. ej. tras una
+    reconexión), la caché se vacía y todo se vuelve a enviar completo.
+    """
+
+    def __init__(self, keyframe_interval: float, enabled: bool = True):
+        self.enabled = enabled
+        self.keyframe_interval = keyframe_interval
+        self.values: Dict[tuple, Any] = {}
+        self.lock = threading.Lock()
+        self.next_keyframe = time.monotonic() + keyframe_interval
+        self.sent_keys = 0
+        self.suppressed_keys = 0
+        self.suppressed_messages = 0
+        self.keyframes = 0
+
+    def filter(self, namespace: str, values: Dict[str, Any], keyframe: bool = False) -> Dict[str, Any]:
+        """
+        Claves de ``values`` que hay que enviar. Con keyframe=True se envían
+        todas. Un resultado vacío significa que el mensaje completo sobra.
+        """
+        if not self.enabled:
+            return values
+        with self.lock:
+            now = time.monotonic()
+            if now >= self.next_keyframe:
+                self._reset("keyframe interval")
+                self.next_keyframe = now + self.keyframe_interval
+            if keyframe:
+                changes = dict(values)
+            else:
+                changes = {key: value for key, value in values.items()
+                           if self.values.get((namespace, key), _MISSING) != value}
+            self.sent_keys += len(changes)
+            self.suppressed_keys += len(values) - len(changes)
+            if not changes:
+                self.suppressed_messages += 1
+            return changes
+
+    def commit(self, namespace: str, values: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        with self.lock:
+            for key, value in values.items():
+                self.values[(namespace, key)] = value
+
+    def reset(self, reason: str) -> None:
+        """Fuerza un keyframe: lo próximo de cada clave se envía aunque no haya cambiado"""
+        with self.lock:
+            self._reset(reason)
+
+    def _reset(self, reason: str) -> None:
+        if not self.values:
+            return
+        self.values.clear()
+        self.keyframes += 1
+        logger.info(f"Delta telemetry keyframe ({reason}): {self.suppressed_messages} messages and "
+                    f"{self.suppressed_keys} keys suppressed so far")
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "sent_keys": self.sent_keys,
+                "suppressed_keys": self.suppressed_keys,
+                "suppressed_messages": self.suppressed_messages,
+                "keyframes": self.keyframes,
+            }
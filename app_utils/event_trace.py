@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List
+from app_utils.metrics import REGISTRY
+
+# Etapas en orden; la latencia de cada una se mide desde la anterior
+STAGE_FRAMED = 'framed'  # Desde el primer byte leído hasta que el evento quedó delimitado
+STAGE_PARSED = 'parsed'
+STAGE_ENQUEUED = 'enqueued'
+STAGE_DEQUEUED = 'dequeued'  # Espera en la cola de salida
+STAGE_SENT = 'sent'
+STAGE_ACKED = 'acked'  # Desde el envío hasta el PUBACK del broker
+STAGES = (STAGE_FRAMED, STAGE_PARSED, STAGE_ENQUEUED, STAGE_DEQUEUED, STAGE_SENT, STAGE_ACKED)
+TOTAL = 'total'  # Del primer byte al PUBACK
+
+# Posición de cada marca en la traza: [mensaje, leído, framed, parsed, enqueued, dequeued, sent]
+_READ = 1
+_STAGE_INDEX = {stage: index + 2 for index, stage in enumerate(STAGES[:-1])}
+
+
+class EventTracer:
+    """
+    Trazas de latencia de extremo a extremo de los eventos del panel.
+
+    SerialPortHandler inicia la traza justo antes de encolar el evento, con
+    la hora (time.monotonic) de la lectura de su primer byte, la de
+    delimitado y la de parseo, y marca el encolado con enqueued(); así el
+    consumidor nunca recibe un evento sin traza. MqttHandler marca sobre los lotes la salida
+    de la cola y el envío, y la cierra con el PUBACK. Las trazas se indexan
+    por identidad del mensaje encolado y guardan una referencia a él, así la
+    identidad no se reutiliza mientras la traza exista. Si un mensaje sale de
+    memoria (desborde a disco, expiración) su traza se descarta al superar
+    max_traced, empezando por la más antigua.
+
+    Cada traza cerrada alimenta un histograma acumulado por etapa en el
+    registro de métricas y una ventana con las muestras desde el último
+    report(), que resume percentiles por etapa.
+    """
+
+    def __init__(self, enabled: bool = True, max_traced: int = 1000, window_samples: int = 10000):
+        self.enabled = enabled
+        self.max_traced = max_traced
+        self.traces: OrderedDict[int, List[Any]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.window: Dict[str, deque] = {stage: deque(maxlen=window_samples) for stage in STAGES + (TOTAL,)}
+        self.histograms = {
+            stage: REGISTRY.histogram(f'facp_event_latency_{stage}_seconds', f'Event latency of the {stage} stage')
+            for stage in STAGES + (TOTAL,)
+        }
+
+    def start(self, message: Any, read_at: float, framed_at: float, parsed_at: float) -> None:
+        if not self.enabled:
+            return
+        with self.lock:
+            self.traces[id(message)] = [message, read_at, framed_at, parsed_at, None, None, None]
+            if len(self.traces) > self.max_traced:
+                self.traces.popitem(last=False)
+
+    def enqueued(self, message: Any, enqueued_at: float) -> None:
+        """
+        Marca el encolado de un mensaje trazado. Si el consumidor ya lo sacó
+        de la cola la marca se omite y esa espera se mide con la etapa siguiente.
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            trace = self.traces.get(id(message))
+            if trace is not None and trace[_STAGE_INDEX[STAGE_DEQUEUED]] is None:
+                trace[_STAGE_INDEX[STAGE_ENQUEUED]] = enqueued_at
+
+    def mark(self, batch: List[Any], stage: str) -> None:
+        """Registra la hora de ``stage`` (dequeued o sent) en los elementos trazados del lote"""
+        if not self.traces:
+            return
+        now = time.monotonic()
+        index = _STAGE_INDEX[stage]
+        with self.lock:
+            for _, (_, message) in batch:
+                trace = self.traces.get(id(message))
+                if trace is not None:
+                    trace[index] = now
+
+    def finish(self, batch: List[Any]) -> None:
+        """Cierra con el PUBACK las trazas del lote y registra sus latencias"""
+        if not self.traces:
+            return
+        now = time.monotonic()
+        with self.lock:
+            closed = [trace for trace in (self.traces.pop(id(message), None) for _, (_, message) in batch)
+                      if trace is not None]
+            for trace in closed:
+                self._observe(trace[_READ:] + [now])
+
+    def _observe(self, marks: List[float | None]) -> None:
+        # Una marca faltante (p. ej. dequeued de un lote reencolado) se mide junto con la etapa siguiente
+        previous = marks[0]
+        for stage, mark in zip(STAGES, marks[1:]):
+            if mark is None:
+                continue
+            self._record(stage, mark - previous)
+            previous = mark
+        self._record(TOTAL, marks[-1] - marks[0])
+
+    def _record(self, stage: str, seconds: float) -> None:
+        self.histograms[stage].observe(seconds)
+        self.window[stage].append(seconds)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Percentiles (ms) por etapa de las trazas cerradas desde el último
+        report(), como telemetría plana; vacío si no hubo ninguna.
+        """
+        with self.lock:
+            windows = {stage: sorted(samples) for stage, samples in self.window.items()}
+            for samples in self.window.values():
+                samples.clear()
+        if not windows[TOTAL]:
+            return {}
+        telemetry: Dict[str, Any] = {"latency_events": len(windows[TOTAL])}
+        for stage, samples in windows.items():
+            if not samples:
+                continue
+            telemetry[f"latency_{stage}_p50_ms"] = round(_percentile(samples, 0.50) * 1000, 2)
+            telemetry[f"latency_{stage}_p95_ms"] = round(_percentile(samples, 0.95) * 1000, 2)
+            telemetry[f"latency_{stage}_max_ms"] = round(samples[-1] * 1000, 2)
+        return telemetry
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    """Percentil por rango más cercano de una lista ordenada"""
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
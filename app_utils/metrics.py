@@ -0,0 +1,192 @@
+import bisect
+import logging
+import math
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Segundos; cubren desde el PUBACK en la red local hasta un envío demorado por el límite
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Counter:
+    """Contador monótono"""
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self.lock:
+            self.value += amount
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [(self.name, '', self.value)]
+
+
+class Gauge:
+    """Valor instantáneo: asignado con set() o calculado al leerlo con ``fn``"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float] | None = None):
+        self.name = name
+        self.help = help
+        self.value = 0.0
+        self.fn = fn
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [(self.name, '', self.fn() if self.fn is not None else self.value)]
+
+
+class Histogram:
+    """Histograma de buckets fijos: un bisect y tres sumas por observación"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # El último es +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self.lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        samples = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            le = '+Inf' if bound == math.inf else repr(float(bound))
+            samples.append((f"{self.name}_bucket", f'le="{le}"', cumulative))
+        samples.append((f"{self.name}_sum", '', total))
+        samples.append((f"{self.name}_count", '', count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas del proceso.
+
+    counter(), gauge() e histogram() devuelven la métrica existente con ese
+    nombre o la crean, así cada componente obtiene las suyas al construirse.
+    Un gauge con ``fn`` se calcula al leerlo; registrar otra vez el mismo
+    nombre con otra función la reemplaza (gana la instancia más reciente).
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Counter | Gauge | Histogram] = {}
+        self.lock = threading.Lock()
+
+    def _get(self, cls, name: str, *args):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str, fn: Callable[[], float] | None = None) -> Gauge:
+        gauge = self._get(Gauge, name, help)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets)
+
+    def _collect(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            try:
+                yield metric, metric.samples()
+            except Exception as e:
+                logger.debug(f"Metric {metric.name} unavailable: {e}")
+
+    def render(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus"""
+        lines = []
+        for metric, samples in self._collect():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, float]:
+        """Valores actuales como telemetría plana; de los histogramas, _count y _sum"""
+        values = {}
+        for metric, samples in self._collect():
+            for name, labels, value in samples:
+                if not labels:
+                    values[name] = value
+        return values
+
+
+REGISTRY = MetricsRegistry()
+
+
+class MetricsServer:
+    """Endpoint HTTP local con las métricas del registro (GET /metrics)"""
+
+    def __init__(self, registry: MetricsRegistry, host: str, port: int):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.server = None  # ThreadingHTTPServer mientras está activo
+
+    def start(self) -> None:
+        # http.server se importa solo si el endpoint está habilitado
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("Metrics request: " + format, *args)
+
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            logger.error(f"Metrics endpoint unavailable on {self.host}:{self.port}: {e}")
+            return
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='metrics_server', daemon=True).start()
+        logger.info(f"Metrics endpoint listening on http://{self.host}:{self.server.server_port}/metrics")
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,79 @@
+from collections import deque
+from typing import Any, Callable, Iterator, List
+
+
+class PriorityLanes:
+    """
+    Conjunto de carriles FIFO con prioridad estricta y protección contra
+    inanición.
+
+    Cada elemento va al carril que indica lane_of (0 = más prioritario) y el
+    orden dentro de cada carril se conserva. select() elige el carril del que
+    sale el próximo lote: el más prioritario con elementos, salvo que un
+    carril con elementos lleve starvation_limit lotes sin ser atendido, en
+    cuyo caso se atiende ese.
+
+    Los carriles son deques o SpillDeque; ofrece la parte de la interfaz de
+    deque que usa SafeQueue.
+    """
+
+    def __init__(self, lanes: List[Any], lane_of: Callable[[Any], int], starvation_limit: int = 5):
+        self.lanes = lanes
+        self.lane_of = lane_of
+        self.starvation_limit = starvation_limit
+        self.skipped = [0] * len(lanes)  # Lotes servidos desde que cada carril fue atendido
+        self.current = lanes[0]
+
+    @classmethod
+    def single(cls) -> 'PriorityLanes':
+        """Un solo carril: cola FIFO simple"""
+        return cls([deque()], lambda entry: 0)
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self.lanes)
+
+    def __iter__(self) -> Iterator[Any]:
+        for lane in self.lanes:
+            yield from lane
+
+    def heads(self) -> List[Any]:
+        """Primera entrada de cada carril con elementos"""
+        return [lane[0] for lane in self.lanes if lane]
+
+    def append(self, entry: Any) -> None:
+        self.lanes[self.lane_of(entry)].append(entry)
+
+    def extend(self, entries) -> None:
+        for entry in entries:
+            self.append(entry)
+
+    def extendleft(self, entries: List[Any]) -> None:
+        """Devuelve a la cabeza de su carril entradas que salieron juntas de un mismo carril"""
+        entries = list(entries)
+        if entries:
+            self.lanes[self.lane_of(entries[0])].extendleft(entries)
+
+    def select(self) -> Any:
+        """Elige el carril del próximo lote y actualiza los contadores de inanición"""
+        chosen = None
+        if self.starvation_limit > 0:
+            starved = [index for index, lane in enumerate(self.lanes)
+                       if lane and self.skipped[index] >= self.starvation_limit]
+            if starved:
+                chosen = max(starved, key=lambda index: self.skipped[index])
+        if chosen is None:
+            chosen = next((index for index, lane in enumerate(self.lanes) if lane), 0)
+
+        for index, lane in enumerate(self.lanes):
+            self.skipped[index] = 0 if index == chosen or not lane else self.skipped[index] + 1
+        self.current = self.lanes[chosen]
+        return self.current
+
+    def popleft(self) -> Any:
+        if not self.current:
+            self.select()
+        return self.current.popleft()
+
+    def clear(self) -> None:
+        for lane in self.lanes:
+            lane.clear()
@@ -1,29 +1,329 @@
+import itertools
+import os
 import queue
+import shutil
 import logging
-from typing import Any, List
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from app_utils.metrics import REGISTRY
+from app_utils.priority_lanes import PriorityLanes
+from app_utils.spill_deque import SpillDeque
+from app_utils.write_ahead_log import WriteAheadLog
+from classes.enums import PublishType
 
 logger = logging.getLogger(__name__)
 
+QueueEntry = Tuple[int, Any]  # (seq, (PublishType, mensaje))
+NO_EXPIRY = object()
+LANE_SEVERITIES = (3, 2, 1)  # Severidad de los carriles 0..2; el resto va al último carril
+RESTORE_CHUNK_ITEMS = 500  # Entradas restauradas por toma del mutex
+
+def timestamped_telemetry(values: Dict[str, Any], ts: float | None = None) -> Dict[str, Any]:
+    """
+    Envuelve la telemetría en el formato de ThingsBoard {"ts": ms, "values": {...}}
+    con la hora de captura. La telemetría que ya trae 'ts' se devuelve igual.
+    """
+    if "ts" in values and "values" in values:
+        return values
+    return {"ts": int((ts if ts is not None else time.time()) * 1000), "values": values}
+
+def entry_severity(item: Any) -> Any:
+    """
+    Clave de expiración de un elemento de la cola: la severidad de la
+    telemetría, None para telemetría sin severidad y NO_EXPIRY para el resto
+    (atributos), que nunca expiran.
+    """
+    publish_type, message = item
+    if publish_type != PublishType.TELEMETRY or not isinstance(message, dict):
+        return NO_EXPIRY
+    return message.get("values", message).get("severity")
+
+def entry_lane(entry: QueueEntry) -> int:
+    """Carril de prioridad de una entrada: alarmas primero, atributos y telemetría sin severidad al final"""
+    severity = entry_severity(entry[1])
+    if severity in LANE_SEVERITIES:
+        return LANE_SEVERITIES.index(severity)
+    if isinstance(severity, int) and severity > LANE_SEVERITIES[0]:
+        return 0
+    return len(LANE_SEVERITIES)
+
+def _report_failure(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Queue log write failed: {future.exception()}")
+
 class SafeQueue(queue.Queue):
-    def __init__(self, maxsize: int = 0):
+    """
+    Cola de salida hacia ThingsBoard.
+
+    Internamente guarda entradas (seq, elemento). Si tiene un WriteAheadLog,
+    cada put se escribe en el log (fuera del mutex) antes de encolarse y el seq
+    es el del log; el consumidor confirma con ack() los elementos entregados.
+
+    Con configure() la cola se reparte en carriles de prioridad por severidad
+    (PriorityLanes), limita los elementos en memoria (SpillDeque) y descarta
+    al sacarlos los que superan la edad o la cantidad máxima definidas para su
+    severidad.
+
+    Durante el arranque escalonado (begin_restore() ... end_restore()) los
+    elementos nuevos se retienen fuera de los carriles mientras el backlog
+    del log se restaura, para que este salga antes y en orden; se escriben en
+    el log en cuanto está disponible (attach_log()).
+
+    Con log_executor (runtime asyncio, un solo hilo) put() y ack() no
+    bloquean: la escritura en el log y su fsync corren en ese hilo, en orden
+    de llegada, y el elemento se encola después de escrito.
+
+    Si on_put está definido se llama cada vez que la cola recibe elementos,
+    con el mutex tomado: debe ser inmediato y no usar la cola (el runtime
+    asyncio lo usa para despertar al consumidor).
+    """
+
+    def __init__(self, maxsize: int = 0, wal: WriteAheadLog | None = None):
         super().__init__(maxsize)
         self.is_serial_connected = False
+        self.wal = wal
+        self.on_put: Callable[[], None] | None = None
+        self.log_executor: Executor | None = None
+        self.next_seq = 1
+        self.restoring = False
+        self.held: List[Tuple[int | None, Any]] = []  # Elementos nuevos retenidos durante la restauración
+        self.expiry_rules: Dict[Any, Tuple[float | None, int | None]] = {}  # clave -> (edad máx. ms, cantidad máx.)
+        self.expiry_counts: Dict[Any, int] = {}  # Elementos en cola por clave con cantidad máxima
+        self.expired_total = 0
+        self.expired_unreported = 0
+        self.last_expiry_report = 0.0
+        REGISTRY.gauge('facp_queue_depth', 'Items waiting in the outgoing queue', self.qsize)
+        REGISTRY.gauge('facp_queue_oldest_age_seconds', 'Age of the oldest queued telemetry', self.oldest_age)
+        self.expired_counter = REGISTRY.counter('facp_queue_expired_total', 'Queue items dropped by expiry rules')
+
+    def _init(self, maxsize: int) -> None:
+        self.queue = PriorityLanes.single()
+
+    def configure(self, config: Any) -> None:
+        """
+        Aplica la configuración de la cola (QueueConfig): carriles de prioridad,
+        límite de elementos en memoria (0 = sin límite) y reglas de expiración
+        por severidad (severity, max_age en s, max_items).
+        """
+        with self.mutex:
+            lane_count = len(LANE_SEVERITIES) + 1 if config.priority else 1
+            if config.max_memory_items > 0:
+                shutil.rmtree(config.spill_dir, ignore_errors=True)
+                lane_memory = max(1, config.max_memory_items // lane_count)
+                lanes = [SpillDeque(os.path.join(config.spill_dir, f"lane{index}"), lane_memory, config.spill_chunk_items)
+                         for index in range(lane_count)]
+            else:
+                lanes = [deque() for _ in range(lane_count)]
+            lane_of = entry_lane if config.priority else (lambda entry: 0)
+            entries = list(self.queue)
+            self.queue = PriorityLanes(lanes, lane_of, config.starvation_limit)
+            self.queue.extend(entries)
+            self.expiry_rules = {
+                rule.severity: (rule.max_age * 1000 if rule.max_age is not None else None, rule.max_items)
+                for rule in config.expiry
+            }
+            self.expiry_counts = {key: 0 for key, (_, max_items) in self.expiry_rules.items() if max_items is not None}
+            for _, item in self.queue:
+                self._count(item, 1)
+
+    def _count(self, item: Any, delta: int) -> None:
+        if self.expiry_counts:
+            key = entry_severity(item)
+            if key in self.expiry_counts:
+                self.expiry_counts[key] += delta
+
+    def put(self, item: Any, block: bool = True, timeout: float | None = None) -> None:
+        if not self._submit_log(self._put_logged, item, block, timeout):
+            self._put_logged(item, block, timeout)
+
+    def _submit_log(self, fn: Callable, *args) -> bool:
+        """Pasa fn al hilo del log si hay log_executor; False si hay que ejecutarla aquí"""
+        executor = self.log_executor
+        if executor is None:
+            return False
+        try:
+            executor.submit(fn, *args).add_done_callback(_report_failure)
+        except RuntimeError:
+            return False  # Executor cerrado durante el apagado
+        return True
+
+    def _put_logged(self, item: Any, block: bool, timeout: float | None) -> None:
+        # La escritura en el log (y su fsync) va antes de tomar el mutex: así no
+        # bloquea al consumidor ni a las métricas; dentro solo se encola en memoria
+        wal = self.wal
+        super().put((wal.append(item) if wal is not None else None, item), block, timeout)
+
+    def _put(self, entry: Tuple[int | None, Any]) -> None:
+        seq, item = entry
+        if seq is None and self.wal is not None:
+            # El log se adjuntó entre la escritura y la toma del mutex (caso raro)
+            seq = self.wal.append(item)
+        if self.restoring:
+            self.held.append((seq, item))  # Sin log, seq None: se escribe al adjuntarlo
+            return
+        if seq is None:
+            seq = self.next_seq
+            self.next_seq += 1
+        self.queue.append((seq, item))
+        self._count(item, 1)
+        if self.on_put is not None:
+            self.on_put()
+
+    def _get(self) -> QueueEntry:
+        entry = self.queue.popleft()
+        self._count(entry[1], -1)
+        return entry
+
+    def _is_expired(self, item: Any, now_ms: float) -> bool:
+        if not self.expiry_rules:
+            return False
+        key = entry_severity(item)
+        rule = self.expiry_rules.get(key)
+        if rule is None:
+            return False
+        max_age, max_items = rule
+        if max_items is not None and self.expiry_counts[key] > max_items:
+            return True
+        return max_age is not None and now_ms - item[1].get("ts", now_ms) > max_age
+
+    def begin_restore(self) -> None:
+        """Retiene los elementos nuevos hasta end_restore()"""
+        with self.mutex:
+            self.restoring = True
+
+    def attach_log(self, wal: WriteAheadLog) -> None:
+        """A partir de aquí cada put se escribe en el log, también los ya retenidos"""
+        with self.mutex:
+            self.wal = wal
+            unlogged = [(index, item) for index, (seq, item) in enumerate(self.held) if seq is None]
+        # Fuera del mutex; hasta end_restore() held solo crece por el final
+        logged = [(index, wal.append(item)) for index, item in unlogged]
+        with self.mutex:
+            for index, seq in logged:
+                self.held[index] = (seq, self.held[index][1])
+
+    def restore(self, entries: Iterable[QueueEntry]) -> int:
+        """
+        Encola entradas (seq, elemento) recuperadas del log sin volver a
+        escribirlas. Se leen fuera del mutex y se encolan por bloques, así el
+        consumidor puede empezar a vaciar la cola antes de que termine.
+        """
+        count = 0
+        entries = iter(entries)
+        while True:
+            chunk = list(itertools.islice(entries, RESTORE_CHUNK_ITEMS))
+            if not chunk:
+                return count
+            with self.mutex:
+                for entry in chunk:
+                    self.queue.append(entry)
+                    self._count(entry[1], 1)
+                self.unfinished_tasks += len(chunk)
+                self.not_empty.notify()
+                if self.on_put is not None:
+                    self.on_put()
+            count += len(chunk)
+
+    def end_restore(self) -> int:
+        """Encola detrás del backlog los elementos retenidos, en su orden de llegada"""
+        with self.mutex:
+            self.restoring = False
+            held, self.held = self.held, []
+            for seq, item in held:
+                if seq is None:
+                    # Sin log (no se pudo recuperar): numeración en memoria
+                    seq = self.next_seq
+                    self.next_seq += 1
+                self.queue.append((seq, item))
+                self._count(item, 1)
+            if held:
+                self.not_empty.notify()
+                if self.on_put is not None:
+                    self.on_put()
+        return len(held)
+
+    def get_batch(self, max_items: int, timeout: float | None = 0) -> List[QueueEntry]:
+        """
+        Saca hasta max_items entradas (seq, elemento) consecutivas de la cabeza
+        del carril elegido que tengan el mismo PublishType que la primera. Si la cola está vacía
+        espera hasta timeout segundos (0 = no bloquear, None = sin límite).
+        Las entradas expiradas se descartan y se confirman en el log.
+
+        Raises:
+            queue.Empty: Si la cola sigue vacía al vencer el timeout
+        """
+        batch: List[QueueEntry] = []
+        expired: List[QueueEntry] = []
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        try:
+            with self.not_empty:
+                while not batch:
+                    while not self._qsize():
+                        if deadline is None:
+                            self.not_empty.wait()
+                            continue
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise queue.Empty
+                        self.not_empty.wait(remaining)
+                    now_ms = time.time() * 1000
+                    lane = self.queue.select()
+                    while lane and len(batch) < max_items:
+                        if batch and lane[0][1][0] != batch[0][1][0]:
+                            break
+                        expire = self._is_expired(lane[0][1], now_ms)
+                        entry = lane.popleft()
+                        self._count(entry[1], -1)
+                        (expired if expire else batch).append(entry)
+                self.not_full.notify()
+                return batch
+        finally:
+            if expired:
+                self._drop_expired(expired)
+
+    def _drop_expired(self, expired: List[QueueEntry]) -> None:
+        self.ack(expired)
+        self.expired_total += len(expired)
+        self.expired_counter.inc(len(expired))
+        self.expired_unreported += len(expired)
+        # Un aviso por minuto como máximo para no inundar el log al vaciar un backlog
+        if time.monotonic() - self.last_expiry_report >= 60:
+            logger.warning(f"Dropped {self.expired_unreported} expired queue items ({self.expired_total} total)")
+            self.expired_unreported = 0
+            self.last_expiry_report = time.monotonic()
+
+    def requeue_front(self, entries: List[QueueEntry]) -> None:
+        """Devuelve entradas a la cabeza de la cola conservando su orden"""
+        with self.mutex:
+            self.queue.extendleft(reversed(entries))
+            for _, item in entries:
+                self._count(item, 1)
+            self.unfinished_tasks += len(entries)
+            self.not_empty.notify()
+            if self.on_put is not None:
+                self.on_put()
+
+    def ack(self, entries: List[QueueEntry]) -> None:
+        """Confirma la entrega de las entradas para que salgan del log"""
+        if self.wal is None:
+            return
+        seqs = [seq for seq, _ in entries]
+        if not self._submit_log(self.wal.ack, seqs):
+            self.wal.ack(seqs)
 
-    def save_to_file(self, file_path: str) -> None:
-        from app_utils.file_operations import save_to_file
+    def oldest_age(self) -> float:
+        """Segundos desde la captura de la telemetría más antigua en cola (0 si no hay)"""
+        now_ms = time.time() * 1000
+        oldest = now_ms
         with self.mutex:
-            save_to_file(list(self.queue), file_path)
+            for _, (publish_type, message) in self.queue.heads():
+                if publish_type == PublishType.TELEMETRY and isinstance(message, dict):
+                    oldest = min(oldest, message.get("ts", now_ms))
+        return (now_ms - oldest) / 1000
 
-    def load_from_file(self, file_path: str) -> None:
-        from app_utils.file_operations import load_from_file
+    def items(self) -> List[Any]:
+        """Copia de los elementos encolados, en orden (los retenidos al final)"""
         with self.mutex:
-            try:
-                items: List[Any] = load_from_file(file_path)
-                for item in items:
-                    self.put(item)
-            except FileNotFoundError:
-                logger.warning(f"File {file_path} not found. Creating a new queue.")
-            except EOFError:
-                logger.debug("No pending events or reports")
-            except Exception as e:
-                logger.error(f"Unknown error loading queue: {e}")
\ No newline at end of file
+            return [item for _, item in self.queue] + [item for _, item in self.held]
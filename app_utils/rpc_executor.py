@@ -0,0 +1,70 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+from app_utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+class RpcExecutor:
+    """
+    Pool acotado para los callbacks RPC y los pulsos de los relays.
+
+    Como máximo ``workers`` hilos y ``max_pending`` tareas entre en cola y en
+    ejecución; submit() rechaza (devuelve None) las que superan el límite en
+    lugar de crear hilos sin control. Cuánto espera cada tarea en cola y cuánto
+    tarda en ejecutarse va a los histogramas facp_rpc_queue_seconds y
+    facp_rpc_run_seconds del registro de métricas.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 16):
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='rpc')
+        self.max_pending = max(1, max_pending)
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.queue_latency = REGISTRY.histogram('facp_rpc_queue_seconds', 'Time RPC tasks waited for a pool thread')
+        self.run_latency = REGISTRY.histogram('facp_rpc_run_seconds', 'Time RPC tasks took to run')
+        self.rejected = REGISTRY.counter('facp_rpc_rejected_total', 'RPC tasks rejected with the pool full')
+        self.coalesced = REGISTRY.counter('facp_rpc_coalesced_total', 'Relay pulses joined to the one already active')
+
+    def submit(self, name: str, fn: Callable, *args) -> Future | None:
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.rejected.inc()
+                logger.warning(f"RPC pool full ({self.pending} pending), rejecting {name}")
+                return None
+            self.pending += 1
+        submitted_at = time.perf_counter()
+        try:
+            future = self.executor.submit(self._run, name, submitted_at, fn, *args)
+        except RuntimeError:
+            # Pool cerrado durante el apagado
+            self._release()
+            return None
+        # También se libera si shutdown() la cancela sin ejecutarla
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future | None = None) -> None:
+        with self.lock:
+            self.pending -= 1
+
+    def _run(self, name: str, submitted_at: float, fn: Callable, *args) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.record(name, started_at - submitted_at, time.perf_counter() - started_at)
+
+    def record(self, name: str, queue_seconds: float, run_seconds: float) -> None:
+        self.queue_latency.observe(queue_seconds)
+        self.run_latency.observe(run_seconds)
+        logger.debug(f"RPC task {name}: queued {queue_seconds * 1000:.2f} ms, ran {run_seconds * 1000:.2f} ms")
+
+    def record_coalesced(self, name: str) -> None:
+        self.coalesced.inc()
+        logger.debug(f"RPC task {name} coalesced with the active one")
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
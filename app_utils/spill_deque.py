@@ -0,0 +1,116 @@
+import os
+import pickle
+import shutil
+import zlib
+from collections import deque
+from typing import Any, Deque, Iterator
+
+
+class SpillDeque:
+    """
+    Deque con límite de elementos en memoria y desborde a disco.
+
+    Orden lógico: cabeza (memoria) -> bloques en disco -> cola (memoria).
+    Mientras la cabeza tiene espacio y no hay nada desbordado, los elementos
+    nuevos van a la cabeza. Si no, se acumulan en la cola y cada chunk_items
+    se escriben comprimidos (pickle + zlib) como un bloque en spill_dir.
+    Cuando la cabeza se vacía se carga el siguiente bloque, en orden.
+
+    Los bloques son temporales: la fuente persistente es el log de la cola,
+    por eso spill_dir se vacía al crear la deque.
+    """
+
+    def __init__(self, spill_dir: str, max_memory_items: int = 5000, chunk_items: int = 500):
+        self.spill_dir = spill_dir
+        self.max_memory_items = max_memory_items
+        self.chunk_items = min(chunk_items, max_memory_items)
+        self.head: Deque[Any] = deque()
+        self.tail: Deque[Any] = deque()
+        self.chunks: Deque[str] = deque()  # Rutas de los bloques en disco, en orden
+        self.spilled_items = 0
+        self.next_chunk = 0
+        shutil.rmtree(spill_dir, ignore_errors=True)
+        os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self.head) + self.spilled_items + len(self.tail)
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from list(self.head)
+        for path in list(self.chunks):
+            yield from self._read_chunk(path)
+        yield from list(self.tail)
+
+    def append(self, item: Any) -> None:
+        if not self.chunks and not self.tail and len(self.head) < self.max_memory_items:
+            self.head.append(item)
+            return
+        self.tail.append(item)
+        if len(self.tail) >= self.chunk_items:
+            self._spill_tail()
+
+    def extend(self, items) -> None:
+        for item in items:
+            self.append(item)
+
+    def appendleft(self, item: Any) -> None:
+        self.head.appendleft(item)
+
+    def extendleft(self, items) -> None:
+        self.head.extendleft(items)
+
+    def popleft(self) -> Any:
+        if not self.head:
+            self._refill()
+        return self.head.popleft()
+
+    def __getitem__(self, index: int) -> Any:
+        if index != 0:
+            raise IndexError("SpillDeque only supports indexing the head")
+        return self.peek()
+
+    def peek(self) -> Any:
+        if not self.head:
+            self._refill()
+        return self.head[0]
+
+    def clear(self) -> None:
+        for path in self.chunks:
+            self._remove(path)
+        self.head.clear()
+        self.tail.clear()
+        self.chunks.clear()
+        self.spilled_items = 0
+
+    def _spill_tail(self) -> None:
+        path = os.path.join(self.spill_dir, f"{self.next_chunk:012d}.chunk")
+        self.next_chunk += 1
+        with open(path, 'wb') as f:
+            f.write(zlib.compress(pickle.dumps(list(self.tail), protocol=pickle.HIGHEST_PROTOCOL), 1))
+        self.chunks.append(path)
+        self.spilled_items += len(self.tail)
+        self.tail.clear()
+
+    def _refill(self) -> None:
+        if self.chunks:
+            path = self.chunks.popleft()
+            items = self._read_chunk(path)
+            self._remove(path)
+            self.spilled_items -= len(items)
+            self.head.extend(items)
+        elif self.tail:
+            self.head, self.tail = self.tail, self.head
+        else:
+            raise IndexError("pop from an empty SpillDeque")
+
+    @staticmethod
+    def _read_chunk(path: str) -> list:
+        with open(path, 'rb') as f:
+            return pickle.loads(zlib.decompress(f.read()))
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
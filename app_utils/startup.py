@@ -0,0 +1,59 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict
+from app_utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Hitos del arranque
+SERIAL_LISTENING = 'serial_listening'  # Puerto serial abierto y lector activo
+MQTT_CONNECTED = 'mqtt_connected'  # CONNACK de ThingsBoard
+QUEUE_RESTORED = 'queue_restored'  # Backlog del log de la cola restaurado
+FIRST_PUBLISH = 'first_publish'  # Primer lote de la cola confirmado con PUBACK
+
+
+def _process_started_at() -> float:
+    """
+    Hora (time.monotonic) de inicio del proceso. En Linux se toma de
+    /proc/self/stat e incluye el arranque del intérprete y los imports; en
+    otro sistema es la hora de importación de este módulo.
+    """
+    now = time.monotonic()
+    try:
+        with open('/proc/self/stat') as f:
+            # Campo 22 (starttime), contado desde el que sigue al nombre del proceso
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        age = time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf('SC_CLK_TCK')
+        return now - max(0.0, age)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return now
+
+
+class StartupTimer:
+    """
+    Segundos desde el inicio del proceso hasta cada hito del arranque. Solo
+    cuenta la primera vez de cada hito: una reconexión posterior no lo
+    cambia. Cada hito se registra en el log y como gauge
+    facp_startup_<hito>_seconds.
+    """
+
+    def __init__(self):
+        self.started_at = _process_started_at()
+        self.marks: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def mark(self, milestone: str) -> None:
+        if milestone in self.marks:
+            return
+        elapsed = time.monotonic() - self.started_at
+        with self.lock:
+            if milestone in self.marks:
+                return
+            self.marks[milestone] = elapsed
+        REGISTRY.gauge(f'facp_startup_{milestone}_seconds', f'Seconds from process start to {milestone}').set(elapsed)
+        logger.info(f"Startup: {milestone} after {elapsed:.3f}s")
+
+
+STARTUP = StartupTimer()
@@ -0,0 +1,225 @@
+import bisect
+import logging
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import Any, Iterable, Iterator, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Registro: tipo (1 byte), largo del payload, crc32 del payload, seq
+RECORD_HEADER = struct.Struct('<BIIQ')
+RECORD_ENTRY = 1
+RECORD_ACK = 2
+SEGMENT_SUFFIX = '.wal'
+
+FSYNC_ALWAYS = 'always'
+FSYNC_INTERVAL = 'interval'
+FSYNC_NEVER = 'never'
+
+
+class WriteAheadLog:
+    """
+    Log de solo-anexado para la cola de salida hacia ThingsBoard.
+
+    Cada elemento encolado se escribe como un registro con número de
+    secuencia (seq) y crc32 en el segmento activo. Los envíos confirmados se
+    registran como registros de ack; un segmento se borra cuando todas sus
+    entradas tienen ack y también se borraron los anteriores.
+
+    Política de fsync:
+      - always:   fsync en cada entrada (no se pierde nada ante un corte de luz)
+      - interval: fsync periódico con sync() (se pierde a lo sumo un intervalo)
+      - never:    solo el sistema operativo decide cuándo escribir a disco
+
+    Los acks nunca fuerzan fsync: perder un ack solo provoca un reenvío.
+    Cada seq debe confirmarse una sola vez.
+    """
+
+    def __init__(self, directory: str, segment_size: int = 1048576, fsync: str = FSYNC_INTERVAL):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.fsync_policy = fsync
+        self.lock = threading.Lock()
+        self.segment_starts: List[int] = []  # Primer seq de cada segmento, en orden
+        self.segment_live: List[int] = []  # Entradas sin ack de cada segmento
+        self.active_fd: int | None = None
+        self.active_size = 0
+        self.next_seq = 1
+        self.dirty = False
+        self.closed = False
+        os.makedirs(directory, exist_ok=True)
+
+    def _segment_path(self, first_seq: int) -> str:
+        return os.path.join(self.directory, f"{first_seq:020d}{SEGMENT_SUFFIX}")
+
+    def recover(self) -> Iterator[Tuple[int, Any]]:
+        """
+        Lee los segmentos existentes, descarta registros incompletos al final
+        (escrituras cortadas) y abre un segmento activo nuevo.
+
+        Returns:
+            Iterator[Tuple[int, Any]]: Entradas (seq, elemento) sin ack, en
+            orden. Se leen del disco a medida que se consumen.
+        """
+        with self.lock:
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith(SEGMENT_SUFFIX))
+            starts = [int(name[:-len(SEGMENT_SUFFIX)]) for name in names]
+            entry_seqs = []
+            acked = set()
+            for index, first_seq in enumerate(starts):
+                is_last = index == len(starts) - 1
+                for record_type, seq, payload in self._read_segment(self._segment_path(first_seq), is_last):
+                    if record_type == RECORD_ACK:
+                        acked.update(struct.unpack(f'<{len(payload) // 8}Q', payload))
+                    else:
+                        entry_seqs.append(seq)
+                        self.next_seq = max(self.next_seq, seq + 1)
+                self.next_seq = max(self.next_seq, first_seq)
+
+            self.segment_starts = list(starts)
+            self.segment_live = [0] * len(starts)
+            pending = 0
+            for seq in entry_seqs:
+                if seq not in acked:
+                    self.segment_live[bisect.bisect_right(starts, seq) - 1] += 1
+                    pending += 1
+            del entry_seqs
+
+            self._open_segment()
+            self._drop_acked_segments()
+            replay_starts = [first_seq for first_seq in self.segment_starts if first_seq in starts]
+            logger.info(f"Queue log recovered: {pending} pending records in {len(starts)} segments")
+            return self._replay(replay_starts, acked, self.next_seq)
+
+    def _replay(self, starts: List[int], acked: Set[int], end_seq: int) -> Iterator[Tuple[int, Any]]:
+        # El segmento activo puede ser el último recuperado (vacío o solo con
+        # acks): lo escrito en él después de recover() no es backlog
+        for first_seq in starts:
+            for record_type, seq, payload in self._read_segment(self._segment_path(first_seq), False):
+                if record_type != RECORD_ENTRY or seq in acked:
+                    continue
+                if seq >= end_seq:
+                    return
+                try:
+                    item = pickle.loads(payload)
+                except Exception as e:
+                    logger.error(f"Discarding unreadable queue record {seq}: {e}")
+                    self.ack([seq])
+                    continue
+                yield seq, item
+
+    @staticmethod
+    def _read_segment(path: str, truncate: bool) -> List[Tuple[int, int, bytes]]:
+        with open(path, 'rb') as f:
+            data = f.read()
+        records = []
+        offset = 0
+        while offset + RECORD_HEADER.size <= len(data):
+            record_type, length, crc, seq = RECORD_HEADER.unpack_from(data, offset)
+            end = offset + RECORD_HEADER.size + length
+            if record_type not in (RECORD_ENTRY, RECORD_ACK) or end > len(data):
+                break
+            payload = data[offset + RECORD_HEADER.size:end]
+            if zlib.crc32(payload) != crc:
+                break
+            records.append((record_type, seq, payload))
+            offset = end
+
+        if offset < len(data):
+            logger.warning(f"Torn record in {path} at offset {offset}, discarding {len(data) - offset} bytes")
+            if truncate:
+                os.truncate(path, offset)
+        return records
+
+    def _open_segment(self) -> None:
+        if self.active_fd is not None:
+            if self.fsync_policy != FSYNC_NEVER:
+                os.fsync(self.active_fd)
+            os.close(self.active_fd)
+        if not self.segment_starts or self.segment_starts[-1] != self.next_seq:
+            self.segment_starts.append(self.next_seq)
+            self.segment_live.append(0)
+        path = self._segment_path(self.next_seq)
+        self.active_fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.active_size = os.fstat(self.active_fd).st_size
+
+    def _write(self, record_type: int, seq: int, payload: bytes) -> None:
+        record = RECORD_HEADER.pack(record_type, len(payload), zlib.crc32(payload), seq) + payload
+        os.write(self.active_fd, record)
+        self.active_size += len(record)
+        self.dirty = True
+
+    def append(self, item: Any) -> int:
+        """Escribe un elemento en el log y devuelve su seq"""
+        payload = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            seq = self.next_seq
+            self.next_seq += 1
+            if self.closed:
+                return seq  # Cerrado durante el apagado: el elemento queda solo en memoria
+            self._write(RECORD_ENTRY, seq, payload)
+            self.segment_live[-1] += 1
+            if self.fsync_policy == FSYNC_ALWAYS:
+                self._sync()
+            if self.active_size >= self.segment_size:
+                self._open_segment()
+            return seq
+
+    def ack(self, seqs: Iterable[int]) -> None:
+        """Registra la confirmación de entrega de las entradas y borra los segmentos ya confirmados"""
+        with self.lock:
+            if self.closed:
+                return
+            acked = []
+            for seq in seqs:
+                if not self.segment_starts or seq < self.segment_starts[0] or seq >= self.next_seq:
+                    continue
+                self.segment_live[bisect.bisect_right(self.segment_starts, seq) - 1] -= 1
+                acked.append(seq)
+            if not acked:
+                return
+            self._write(RECORD_ACK, 0, struct.pack(f'<{len(acked)}Q', *acked))
+            self._drop_acked_segments()
+            if self.active_size >= self.segment_size:
+                self._open_segment()
+
+    def _drop_acked_segments(self) -> None:
+        while len(self.segment_starts) > 1 and self.segment_live[0] <= 0:
+            first_seq = self.segment_starts.pop(0)
+            self.segment_live.pop(0)
+            try:
+                os.remove(self._segment_path(first_seq))
+            except FileNotFoundError:
+                pass
+
+    def _sync(self) -> None:
+        if self.dirty and self.active_fd is not None:
+            if hasattr(os, 'fdatasync'):
+                os.fdatasync(self.active_fd)
+            else:
+                os.fsync(self.active_fd)
+            self.dirty = False
+
+    def sync(self) -> None:
+        """Fuerza a disco lo escrito desde el último fsync (política interval)"""
+        with self.lock:
+            if self.fsync_policy != FSYNC_NEVER:
+                self._sync()
+
+    @property
+    def pending(self) -> int:
+        """Entradas escritas que aún no tienen ack"""
+        with self.lock:
+            return sum(self.segment_live)
+
+    def close(self) -> None:
+        """Cierra el segmento activo; después append() y ack() ya no escriben"""
+        with self.lock:
+            self.closed = True
+            if self.active_fd is not None:
+                self._sync()
+                os.close(self.active_fd)
+                self.active_fd = None
@@ -0,0 +1,54 @@
+"""Utilidades compartidas por los benchmarks"""
+import os
+import threading
+import time
+
+from app_utils.queue_operations import SafeQueue
+from classes.panel_profile import PanelProfile
+from config.loader import load_panel_profiles, load_event_severity_levels
+from config.schema import ConfigSchema
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PANEL_MODELS = (10001, 10002, 10003, 10004)
+
+
+class TimedQueue(SafeQueue):
+    """SafeQueue que registra el instante (perf_counter) de cada put"""
+
+    def __init__(self):
+        super().__init__()
+        self.put_times = []
+        self.put_condition = threading.Condition()
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        with self.put_condition:
+            self.put_times.append(time.perf_counter())
+            self.put_condition.notify_all()
+
+    def wait_for_count(self, count: int, timeout: float) -> bool:
+        with self.put_condition:
+            return self.put_condition.wait_for(lambda: len(self.put_times) >= count, timeout)
+
+
+def make_config(port: str = "/dev/null", read_mode: str = "event", id_modelo_panel: int = 10001) -> ConfigSchema:
+    return ConfigSchema(
+        id_modelo_panel=id_modelo_panel,
+        thingsboard={"device_token": "", "host": "localhost", "port": 1883},
+        serial={"puerto": port, "read_mode": read_mode},
+        relay={"pin": 8, "high_time": 1, "low_time": 5},
+        relay_monitor={"alarm_pin": 13, "trouble_pin": 27, "publish_interval": 15,
+                       "alarm_active_high": True, "trouble_active_high": False},
+        silence_relay={"pin": 22, "activation_time": 5, "active_high": True},
+        reset_relay={"pin": 25, "activation_time": 5, "active_high": True},
+    )
+
+
+def load_profile(code: int) -> PanelProfile:
+    schemas = load_panel_profiles(os.path.join(REPO_DIR, "Codigos_FACP.yml"))
+    return PanelProfile(code, schemas[code])
+
+
+def load_severity_list(code: int) -> dict:
+    levels = load_event_severity_levels(os.path.join(REPO_DIR, "config", "eventSeverityLevels.yml"))
+    return levels.get(code, {})
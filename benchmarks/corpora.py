@@ -0,0 +1,77 @@
+"""
+Corpus sintéticos de eventos por modelo de panel.
+
+Cada variante es una función que recibe un índice y devuelve el texto de un
+evento tal como lo recibe parse_string_event (líneas separadas por '\\n').
+"""
+import random
+from typing import Callable, Dict, List
+
+KNOWN_IDS = {
+    10001: ["HUMO ACT", "CALOR ACT", "EST MAN ACT", "TRBL ACT", "SUPV ACT", "HUMO RST", "SISTEMA NORMAL"],
+    10002: ["ALARMA ACTIVA", "PULSADOR ACTIVO", "AVER. LOCAL ACT.", "MNTR LOCAL ACT.", "ALARMA RESTAUR."],
+    10003: ["AVERIA MONITOR", "NORMAL TERMICO", "SENAL SILENCIADA", "CONFIRMAR", "REARME DEL SISTEMA"],
+    10004: ["FIRE ALARM", "TROUBLE", "SUPERVISORY", "ALARM SILENCED", "SYSTEM NORMAL"],
+}
+
+EXTRA_LINES = ["LAZO 1 DISPOSITIVO 23", "DETECTOR FOTOELECTRICO", "PISO 3 CUARTO ELECTRICO"]
+
+
+def _known(model: int, i: int) -> str:
+    ids = KNOWN_IDS[model]
+    return ids[i % len(ids)]
+
+
+def _unknown(i: int) -> str:
+    return f"EVT DESCONOCIDO {i % 97}"
+
+
+def _date(i: int) -> str:
+    return f"{10 + i % 12:02d}:{i % 60:02d}:{(i * 7) % 60:02d} {1 + i % 28:02d}/02/25"
+
+
+def _simplex_header(i: int) -> str:
+    return f" {1 + i % 12}:{i % 60:02d}:{(i * 7) % 60:02d} am MON {1 + i % 28:02d}-JAN-25"
+
+
+VARIANTS: Dict[int, Dict[str, Callable[[int], str]]] = {
+    10001: {
+        "pipe": lambda i: f"{_known(10001, i)}|{_date(i)} LAZO1 DISP{i % 250} PISO {i % 9}",
+        "space": lambda i: f"{_known(10001, i)}          {_date(i)} LAZO1 DISP{i % 250}",
+        "multiline": lambda i: f"{_known(10001, i)}|{_date(i)} LAZO1 DISP{i % 250}\n" + "\n".join(EXTRA_LINES),
+        "unknown": lambda i: f"{_unknown(i)}|{_date(i)} LAZO1 DISP{i % 250}",
+    },
+    10002: {
+        "single": lambda i: f"{_known(10002, i)}::{_date(i)} LAZO {i % 4} DISP {i % 250}",
+        "dash": lambda i: f"-{_known(10002, i)}-{_date(i).replace('/', '')} LAZO {i % 4}",
+        "multiline": lambda i: f"{_known(10002, i)}::{_date(i)} LAZO {i % 4}\n" + "\n".join(EXTRA_LINES),
+        "unknown": lambda i: f"{_unknown(i)}::{_date(i)} LAZO {i % 4}",
+    },
+    10003: {
+        "single": lambda i: f"{_known(10003, i)}     MODULO {i % 159}     ZONA {i % 20}",
+        "device": lambda i: f"ALARM: HUMO     ZONA {i % 20}     PISO {i % 9} CORREDOR",
+        "multiline": lambda i: f"{_known(10003, i)}     MODULO {i % 159}\n" + "\n".join(EXTRA_LINES),
+        "unknown": lambda i: f"{_unknown(i)}     MODULO {i % 159}     ZONA {i % 20}",
+    },
+    10004: {
+        "space": lambda i: f"{_simplex_header(i)}\n{_known(10004, i)}  ZONE {i % 20}  PISO {i % 9}",
+        "pipe": lambda i: f"{_simplex_header(i)}\n{_known(10004, i)}|ZONE {i % 20}",
+        "multiline": lambda i: f"{_simplex_header(i)}\n{_known(10004, i)}  ZONE {i % 20}\n" + "\n".join(EXTRA_LINES),
+        "unknown": lambda i: f"{_simplex_header(i)}\n{_unknown(i)}  ZONE {i % 20}",
+    },
+}
+
+
+def generate(model: int, variant: str, count: int, seed: int = 0) -> List[str]:
+    """Genera ``count`` eventos de la variante, en orden aleatorio reproducible"""
+    factory = VARIANTS[model][variant]
+    indices = list(range(count))
+    random.Random(seed).shuffle(indices)
+    return [factory(i) for i in indices]
+
+
+def generate_mixed(model: int, count: int, seed: int = 0) -> List[str]:
+    """Mezcla todas las variantes del modelo en proporciones iguales"""
+    variants = list(VARIANTS[model])
+    rng = random.Random(seed)
+    return [VARIANTS[model][rng.choice(variants)](i) for i in range(count)]
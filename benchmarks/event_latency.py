@@ -0,0 +1,139 @@
+"""
+Latencia de extremo a extremo por etapa, del primer byte serial al PUBACK.
+
+Reproduce la captura de un panel sobre un pty (PanelEmulator) hacia el
+SerialPortHandler real, que encola en SafeQueue; el MqttHandler real vacía la
+cola hacia un cliente MQTT de prueba que confirma cada publicación tras
+--ack-ms. Imprime los percentiles por etapa de EventTracer: framed, parsed,
+enqueued, dequeued (espera en la cola), sent, acked y total.
+
+Uso:
+    python -m benchmarks.event_latency [--model 10001] [--speed 10] [--repeat 20] [--ack-ms 20] [--json salida.json]
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from tb_device_mqtt import TBPublishInfo
+
+from app_utils.event_trace import STAGES, TOTAL
+from app_utils.queue_operations import SafeQueue
+from benchmarks.common import make_config, load_profile, load_severity_list
+from benchmarks.panel_emulator import CAPTURES_DIR, PANEL_MODELS, PanelEmulator, load_capture
+from classes.mqtt_sender import MqttHandler
+from classes.serial_port_handler import SerialPortHandler
+
+
+class DelayedAck:
+    """Resultado de publicación cuyo PUBACK llega ack_delay segundos después del envío"""
+    rc = 0
+
+    def __init__(self, ack_delay: float):
+        self.acked_at = time.monotonic() + ack_delay
+
+    def is_published(self) -> bool:
+        return time.monotonic() >= self.acked_at
+
+    def wait_for_publish(self, timeout=None):
+        delay = self.acked_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay if timeout is None else min(delay, timeout))
+
+
+class DelayedAckClient:
+    """Cliente MQTT de prueba: cuenta los eventos enviados y confirma con retardo"""
+
+    def __init__(self, ack_delay: float):
+        self.ack_delay = ack_delay
+        self.events_sent = 0
+
+    def is_connected(self) -> bool:
+        return True
+
+    def send_telemetry(self, telemetry):
+        records = telemetry if isinstance(telemetry, list) else [telemetry]
+        self.events_sent += sum(1 for record in records if "event" in record.get("values", record))
+        return TBPublishInfo([DelayedAck(self.ack_delay)])
+
+    def send_attributes(self, attributes):
+        return TBPublishInfo([DelayedAck(self.ack_delay)])
+
+    def set_server_side_rpc_request_handler(self, handler):
+        pass
+
+    def disconnect(self):
+        pass
+
+
+def run_benchmark(model: int, capture_path: str, speed: float, repeat: int, ack_ms: float) -> Dict[str, Any]:
+    profile = load_profile(model)
+    emulator = PanelEmulator(load_capture(capture_path), profile.serial_config, speed)
+    port = emulator.open()
+
+    config = make_config(port, "event", model)
+    config.thingsboard.rate_limit_state_file = ""
+    queue = SafeQueue()
+    mqtt_handler = MqttHandler(config, queue)
+    mqtt_handler.client = DelayedAckClient(ack_ms / 1000)
+    mqtt_handler.shutdown_flag = threading.Event()
+    serial_handler = SerialPortHandler(config, load_severity_list(model), queue, profile, mqtt_handler.tracer)
+
+    shutdown_flag = threading.Event()
+    threads = [
+        threading.Thread(target=serial_handler.listening_to_serial, args=(shutdown_flag,), daemon=True),
+        threading.Thread(target=mqtt_handler.process_queue, daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    expected = len(emulator.replay(repeat))
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline and (mqtt_handler.client.events_sent < expected or mqtt_handler.inflight):
+        time.sleep(0.05)
+    time.sleep(ack_ms / 1000 + 0.2)
+
+    shutdown_flag.set()
+    mqtt_handler.shutdown_flag.set()
+    serial_handler.request_stop()
+    for thread in threads:
+        thread.join(timeout=5)
+    emulator.close()
+    mqtt_handler.rpc_executor.shutdown()
+
+    return {"name": profile.name, "expected": expected, "report": mqtt_handler.tracer.report()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", type=int, choices=PANEL_MODELS, default=PANEL_MODELS[0], help="Modelo de panel")
+    parser.add_argument("--capture", help="Archivo de captura. Por defecto benchmarks/captures/<modelo>.jsonl")
+    parser.add_argument("--speed", type=float, default=10.0, help="Factor de velocidad de la reproducción")
+    parser.add_argument("--repeat", type=int, default=20, help="Veces que se repite la captura")
+    parser.add_argument("--ack-ms", type=float, default=20.0, help="Retardo simulado del PUBACK del broker")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    capture = args.capture or os.path.join(CAPTURES_DIR, f"{args.model}.jsonl")
+    result = run_benchmark(args.model, capture, args.speed, args.repeat, args.ack_ms)
+    report = result["report"]
+
+    print(f"{result['name']}: {report.get('latency_events', 0)}/{result['expected']} events traced")
+    print(f"{'stage':<10} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for stage in STAGES + (TOTAL,):
+        if f"latency_{stage}_p50_ms" in report:
+            print(f"{stage:<10} {report[f'latency_{stage}_p50_ms']:>9.2f} "
+                  f"{report[f'latency_{stage}_p95_ms']:>9.2f} {report[f'latency_{stage}_max_ms']:>9.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Latencia de relays medida de extremo a extremo con el backend GPIO simulado.
+
+edge-to-MQTT: inyecta flancos en el pin de alarma del SimulatedGpio y mide
+hasta que el RelayMonitor real, a través de MqttHandler, entrega el cambio
+al cliente MQTT (modo 'edge' contra 'polling'). También cuenta los mensajes
+de relays enviados durante la prueba.
+
+RPC-to-relay: envía el RPC 'silenciar_panel' a MqttHandler._handle_rpc_request
+y mide hasta que el SilenceController escribe el nivel activo en el pin.
+
+No necesita una Raspberry Pi.
+
+Uso:
+    python -m benchmarks.gpio_latency [--edges 10] [--spacing 0.5] [--poll-interval 1] [--rpcs 50] [--json salida.json]
+"""
+import argparse
+import json
+import logging
+import statistics
+import threading
+import time
+from typing import Any, Dict, List
+
+from tb_device_mqtt import TBPublishInfo
+
+from app_utils.queue_operations import SafeQueue
+from benchmarks.common import make_config
+from benchmarks.priority_bench import PublishedMessage
+from classes.gpio_backend import SimulatedGpio
+from classes.mqtt_sender import MqttHandler
+from classes.relay_monitor import RelayMonitor
+from components.silence_controller import SilenceController
+
+
+class RelayRecordingClient:
+    """Cliente MQTT de prueba: registra cuándo se envía cada estado de alarm_relay"""
+
+    def __init__(self):
+        self.alarm_sent: List[tuple] = []  # (instante, estado)
+        self.messages = 0
+        self.condition = threading.Condition()
+        self.rpc_replies = 0
+
+    def is_connected(self) -> bool:
+        return True
+
+    def _record(self, values: Dict[str, Any]) -> None:
+        if "alarm_relay" in values:
+            with self.condition:
+                self.alarm_sent.append((time.perf_counter(), values["alarm_relay"]))
+                self.condition.notify_all()
+
+    def send_telemetry(self, telemetry):
+        self.messages += 1
+        records = telemetry if isinstance(telemetry, list) else [telemetry]
+        for record in records:
+            self._record(record.get("values", record))
+        return TBPublishInfo([PublishedMessage()])
+
+    def send_attributes(self, attributes):
+        self.messages += 1
+        return TBPublishInfo([PublishedMessage()])
+
+    def send_rpc_reply(self, request_id, response):
+        self.rpc_replies += 1
+
+    def set_server_side_rpc_request_handler(self, handler):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def wait_for_state(self, state: bool, after: float, timeout: float) -> float | None:
+        def find():
+            for at, value in self.alarm_sent:
+                if at >= after and value == state:
+                    return at
+            return None
+
+        with self.condition:
+            self.condition.wait_for(lambda: find() is not None, timeout)
+            return find()
+
+
+def make_handler(config, client: RelayRecordingClient) -> MqttHandler:
+    config.thingsboard.rate_limit_state_file = ""
+    handler = MqttHandler(config, SafeQueue())
+    handler.client = client
+    handler.shutdown_flag = threading.Event()
+    return handler
+
+
+def percentiles(latencies: List[float]) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "p50_ms": statistics.median(latencies) if latencies else None,
+        "max_ms": latencies[-1] if latencies else None,
+    }
+
+
+def run_edge_to_mqtt(mode: str, edges: int, spacing: float, poll_interval: int) -> Dict[str, Any]:
+    config = make_config()
+    config.relay_monitor.mode = mode
+    config.relay_monitor.publish_interval = poll_interval
+    gpio = SimulatedGpio()
+    client = RelayRecordingClient()
+    handler = make_handler(config, client)
+    monitor = RelayMonitor(config, handler, gpio)
+
+    pin = config.relay_monitor.alarm_pin
+    active = gpio.HIGH if config.relay_monitor.alarm_active_high else gpio.LOW
+    inactive = gpio.LOW if active == gpio.HIGH else gpio.HIGH
+    gpio.set_input(pin, inactive)
+
+    shutdown_flag = threading.Event()
+    threads = [
+        threading.Thread(target=handler.process_queue, daemon=True),
+        threading.Thread(target=monitor.monitor_relays, args=(shutdown_flag,), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+
+    latencies = []
+    start = time.perf_counter()
+    messages_before = client.messages
+    for i in range(edges):
+        level = active if i % 2 == 0 else inactive
+        edge_at = time.perf_counter()
+        gpio.set_input(pin, level)
+        sent_at = client.wait_for_state(level == active, edge_at, timeout=poll_interval + 5)
+        if sent_at is not None:
+            latencies.append((sent_at - edge_at) * 1000)
+        time.sleep(spacing)
+    elapsed = time.perf_counter() - start
+
+    shutdown_flag.set()
+    handler.shutdown_flag.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    monitor.cleanup()
+
+    return {"mode": mode, **percentiles(latencies), "messages": client.messages - messages_before,
+            "elapsed_s": elapsed}
+
+
+def run_rpc_to_relay(rpcs: int) -> Dict[str, Any]:
+    config = make_config()
+    config.silence_relay.activation_time = 0
+    gpio = SimulatedGpio()
+    client = RelayRecordingClient()
+    handler = make_handler(config, client)
+    controller = SilenceController(config.silence_relay, handler, gpio)
+    handler.subscribe_to_rpc('silenciar_panel', controller.handle_silence_rpc)
+
+    pin = config.silence_relay.pin
+    active = gpio.HIGH if config.silence_relay.active_high else gpio.LOW
+    inactive = gpio.LOW if active == gpio.HIGH else gpio.HIGH
+
+    latencies = []
+    for request_id in range(rpcs):
+        sent_at = time.perf_counter()
+        handler._handle_rpc_request(request_id, {"method": "silenciar_panel", "params": {}})
+        activated_at = gpio.wait_for_output(pin, active, after=sent_at, timeout=5)
+        if activated_at is not None:
+            latencies.append((activated_at - sent_at) * 1000)
+        # Esperar el fin del pulso para que el siguiente no se combine con este
+        gpio.wait_for_output(pin, inactive, after=sent_at, timeout=5)
+        while controller.is_silencing:
+            time.sleep(0.001)
+
+    handler.rpc_executor.shutdown()
+    controller.cleanup()
+    return percentiles(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edges", type=int, default=10, help="Flancos inyectados en el pin de alarma")
+    parser.add_argument("--spacing", type=float, default=0.5, help="Segundos entre flancos")
+    parser.add_argument("--poll-interval", type=int, default=1, help="publish_interval del modo polling")
+    parser.add_argument("--rpcs", type=int, default=50, help="Comandos RPC de silencio enviados")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    results: Dict[str, Any] = {"edge_to_mqtt": [], "rpc_to_relay": None}
+    print(f"{'edge-to-MQTT':<12} {'edges':>6} {'p50 ms':>9} {'max ms':>9} {'messages':>9} {'elapsed s':>10}")
+    for mode in ("edge", "polling"):
+        r = run_edge_to_mqtt(mode, args.edges, args.spacing, args.poll_interval)
+        results["edge_to_mqtt"].append(r)
+        p50 = f"{r['p50_ms']:.2f}" if r['p50_ms'] is not None else "-"
+        worst = f"{r['max_ms']:.2f}" if r['max_ms'] is not None else "-"
+        print(f"{r['mode']:<12} {r['count']:>6} {p50:>9} {worst:>9} {r['messages']:>9} {r['elapsed_s']:>10.2f}")
+
+    r = run_rpc_to_relay(args.rpcs)
+    results["rpc_to_relay"] = r
+    p50 = f"{r['p50_ms']:.2f}" if r['p50_ms'] is not None else "-"
+    worst = f"{r['max_ms']:.2f}" if r['max_ms'] is not None else "-"
+    print(f"\n{'RPC-to-relay':<12} {'rpcs':>6} {'p50 ms':>9} {'max ms':>9}")
+    print(f"{'silence':<12} {r['count']:>6} {p50:>9} {worst:>9}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Emulador de panel sobre un pseudo-terminal.
+
+Abre un pty, lo expone en una ruta (enlace simbólico) que puede usarse como
+config.serial.puerto y reproduce tráfico capturado de un panel con la
+temporización del puerto serial: tiempo de transmisión según el baud rate
+del perfil, pausas entre registros de la captura y ráfagas a N veces la
+velocidad real.
+
+Formato de captura (JSON Lines), un registro por escritura del panel:
+    {"t": 0.25, "event": true, "data": "HUMO ACT|10:15:02 01/02/25 ...\\r\\n"}
+  t      segundos desde el inicio de la captura (opcional)
+  event  el registro inicia un evento (opcional, para medir latencia)
+  data   bytes recibidos, decodificados como latin-1
+
+Uso:
+    # Benchmark end-to-end de listening_to_serial dentro del proceso
+    python -m benchmarks.panel_emulator --model 10001 --speed 10 --repeat 50
+    python -m benchmarks.panel_emulator --model 10002 --burst --repeat 500
+    # Mismo benchmark con el lector del runtime asyncio
+    python -m benchmarks.panel_emulator --runtime asyncio --repeat 50
+    # Solo exponer el pty para correr main.py contra él
+    python -m benchmarks.panel_emulator --model 10003 --serve --link /tmp/facp-emulator
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import REPO_DIR, PANEL_MODELS, TimedQueue, make_config, load_profile, load_severity_list
+from classes.serial_port_handler import SerialPortHandler
+
+CAPTURES_DIR = os.path.join(REPO_DIR, "benchmarks", "captures")
+WIRE_CHUNK_SIZE = 16
+
+
+def load_capture(path: str) -> List[Dict[str, Any]]:
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+
+def bits_per_char(serial_config: Dict[str, Any]) -> int:
+    parity_bits = 0 if serial_config.get('parity', 'none') == 'none' else 1
+    return 1 + serial_config.get('bytesize', 8) + parity_bits + int(serial_config.get('stopbits', 1))
+
+
+class PanelEmulator:
+    """Reproduce una captura sobre el lado maestro de un pty"""
+
+    def __init__(self, records: List[Dict[str, Any]], serial_config: Dict[str, Any],
+                 speed: float = 1.0, burst: bool = False, link_path: str | None = None):
+        self.records = records
+        self.speed = speed
+        self.burst = burst
+        self.link_path = link_path
+        self.seconds_per_byte = bits_per_char(serial_config) / serial_config.get('baudrate', 9600)
+        self.master: int | None = None
+        self.slave: int | None = None
+        self.port: str | None = None
+
+    def open(self) -> str:
+        self.master, self.slave = os.openpty()
+        self.port = os.ttyname(self.slave)
+        if self.link_path:
+            if os.path.islink(self.link_path):
+                os.unlink(self.link_path)
+            os.symlink(self.port, self.link_path)
+            return self.link_path
+        return self.port
+
+    def close(self) -> None:
+        if self.link_path and os.path.islink(self.link_path):
+            os.unlink(self.link_path)
+        for fd in (self.master, self.slave):
+            if fd is not None:
+                os.close(fd)
+        self.master = self.slave = None
+
+    def capture_duration(self) -> float:
+        last = self.records[-1]
+        return last.get('t', 0.0) + len(last['data']) * self.seconds_per_byte
+
+    def replay(self, repeat: int = 1, stop_event: threading.Event | None = None) -> List[float]:
+        """
+        Escribe la captura ``repeat`` veces respetando la temporización.
+
+        Returns:
+            Instante (perf_counter) en que se escribió el primer byte de cada
+            registro marcado como inicio de evento
+        """
+        event_start_times: List[float] = []
+        start = time.perf_counter()
+        cursor = start
+        cycle = self.capture_duration()
+
+        for rep in range(repeat):
+            for record in self.records:
+                if stop_event is not None and stop_event.is_set():
+                    return event_start_times
+                data = record['data'].encode('latin-1')
+
+                if self.burst:
+                    if record.get('event'):
+                        event_start_times.append(time.perf_counter())
+                    self._write_all(data)
+                    continue
+
+                # Pausa entre registros según la captura, escalada por la velocidad
+                offset = (rep * cycle + record.get('t', 0.0)) / self.speed
+                cursor = max(cursor, start + offset)
+                first_chunk = True
+                for i in range(0, len(data), WIRE_CHUNK_SIZE):
+                    chunk = data[i:i + WIRE_CHUNK_SIZE]
+                    # Cada fragmento llega cuando termina de transmitirse su último byte
+                    cursor += len(chunk) * self.seconds_per_byte / self.speed
+                    delay = cursor - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    if first_chunk and record.get('event'):
+                        event_start_times.append(time.perf_counter())
+                    first_chunk = False
+                    self._write_all(chunk)
+        return event_start_times
+
+    def _write_all(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            written = os.write(self.master, view)
+            view = view[written:]
+
+
+class AsyncReader:
+    """Corre listening_to_serial_async en un event loop propio en otro hilo"""
+
+    def __init__(self, handler: SerialPortHandler):
+        self.handler = handler
+        self.loop = asyncio.new_event_loop()
+        self.task: asyncio.Task | None = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.task = self.loop.create_task(self.handler.listening_to_serial_async())
+        try:
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(lambda: self.task.cancel())
+        self.thread.join(timeout=5)
+
+
+def run_benchmark(model: int, capture_path: str, speed: float, burst: bool, repeat: int,
+                  runtime: str = "threads") -> Dict[str, Any]:
+    profile = load_profile(model)
+    emulator = PanelEmulator(load_capture(capture_path), profile.serial_config, speed, burst)
+    port = emulator.open()
+
+    queue = TimedQueue()
+    handler = SerialPortHandler(make_config(port, "event", model), load_severity_list(model), queue, profile)
+    shutdown_flag = threading.Event()
+    if runtime == "asyncio":
+        reader = AsyncReader(handler)
+    else:
+        reader = threading.Thread(target=handler.listening_to_serial, args=(shutdown_flag,), daemon=True)
+    reader.start()
+
+    deadline = time.monotonic() + 5
+    while not queue.is_serial_connected and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    event_times = emulator.replay(repeat)
+    # Los modos block/header publican el último evento por inactividad
+    settle = (profile.message_timeout or 0) + profile.serial_config.get('timeout', 1) + 2
+    queue.wait_for_count(len(event_times), timeout=settle)
+
+    if runtime == "asyncio":
+        reader.stop()
+    else:
+        shutdown_flag.set()
+        handler.request_stop()
+        reader.join(timeout=5)
+    emulator.close()
+
+    received = len(queue.put_times)
+    paired = min(received, len(event_times))
+    latencies = sorted((queue.put_times[i] - event_times[i]) * 1000 for i in range(paired))
+    elapsed = (queue.put_times[-1] - event_times[0]) if paired else 0.0
+    return {
+        "model": model,
+        "name": profile.name,
+        "expected": len(event_times),
+        "received": received,
+        "events_per_s": received / elapsed if elapsed > 0 else 0.0,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": latencies[max(0, int(len(latencies) * 0.95) - 1)] if latencies else 0.0,
+        "p99": latencies[max(0, int(len(latencies) * 0.99) - 1)] if latencies else 0.0,
+        "max": latencies[-1] if latencies else 0.0,
+    }
+
+
+def serve(model: int, capture_path: str, speed: float, burst: bool, repeat: int, link_path: str) -> None:
+    profile = load_profile(model)
+    emulator = PanelEmulator(load_capture(capture_path), profile.serial_config, speed, burst, link_path)
+    port = emulator.open()
+    print(f"Emulating {profile.name} on {port} -> {emulator.port}. Set serial.puerto: {port}")
+    input("Press Enter to start the replay...")
+    try:
+        emulator.replay(repeat)
+        input("Replay finished. Press Enter to close the port...")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", type=int, choices=PANEL_MODELS, action="append",
+                        help="Modelo de panel (repetible). Por defecto todos")
+    parser.add_argument("--capture", help="Archivo de captura. Por defecto benchmarks/captures/<modelo>.jsonl")
+    parser.add_argument("--speed", type=float, default=1.0, help="Factor de velocidad respecto al tiempo real")
+    parser.add_argument("--burst", action="store_true", help="Escribir sin pausas (volcado tras reconexión)")
+    parser.add_argument("--repeat", type=int, default=1, help="Veces que se reproduce la captura")
+    parser.add_argument("--runtime", choices=("threads", "asyncio"), default="threads",
+                        help="Lector serial: hilo con select() o coroutine del runtime asyncio")
+    parser.add_argument("--serve", action="store_true", help="Solo exponer el pty, sin lector en el proceso")
+    parser.add_argument("--link", default="/tmp/facp-emulator", help="Ruta del enlace al pty en modo --serve")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    models = args.model or list(PANEL_MODELS)
+
+    if args.serve:
+        model = models[0]
+        serve(model, args.capture or os.path.join(CAPTURES_DIR, f"{model}.jsonl"),
+              args.speed, args.burst, args.repeat, args.link)
+        return
+
+    print(f"{'model':<24} {'events':>11} {'events/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for model in models:
+        r = run_benchmark(model, args.capture or os.path.join(CAPTURES_DIR, f"{model}.jsonl"),
+                          args.speed, args.burst, args.repeat, args.runtime)
+        print(f"{r['name']:<24} {r['received']:>5}/{r['expected']:<5} {r['events_per_s']:>10.1f} "
+              f"{r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f} {r['max']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Microbenchmark de parse_string_event y publish_parsed_event por modelo.
+
+Usa corpus sintéticos (benchmarks/corpora.py) con variantes de una línea,
+multi-línea, con pipe o espacios e IDs desconocidos. Reporta eventos/s,
+µs/evento y memoria pico (tracemalloc) de cada combinación.
+
+Uso:
+    python -m benchmarks.parser_bench [--events 20000] [--model 10001] [--json salida.json]
+"""
+import argparse
+import gc
+import json
+import logging
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from app_utils.queue_operations import SafeQueue
+from benchmarks.common import PANEL_MODELS, make_config, load_profile, load_severity_list
+from benchmarks.corpora import VARIANTS, generate
+from classes.serial_port_handler import SerialPortHandler
+
+
+def _run(func: Callable[[str], Any], corpus: List[str]) -> float:
+    start = time.perf_counter()
+    for event in corpus:
+        func(event)
+    return time.perf_counter() - start
+
+
+def _peak_memory(func: Callable[[str], Any], corpus: List[str]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for event in corpus:
+            func(event)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_model(model: int, events: int, repeats: int) -> List[Dict[str, Any]]:
+    profile = load_profile(model)
+    results = []
+    for variant in VARIANTS[model]:
+        corpus = generate(model, variant, events)
+        for operation in ("parse_string_event", "publish_parsed_event"):
+            queue = SafeQueue()
+            handler = SerialPortHandler(make_config(id_modelo_panel=model), load_severity_list(model), queue, profile)
+            func = getattr(handler, operation)
+
+            func(corpus[0])  # Calentamiento
+            best = min(_run(func, corpus) for _ in range(repeats))
+            with queue.mutex:
+                queue.queue.clear()
+            peak = _peak_memory(func, corpus)
+
+            results.append({
+                "model": model,
+                "name": profile.name,
+                "variant": variant,
+                "operation": operation,
+                "events": events,
+                "events_per_s": events / best,
+                "us_per_event": best * 1e6 / events,
+                "peak_kib": peak / 1024,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000, help="Eventos por corpus")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeticiones (se reporta la mejor)")
+    parser.add_argument("--model", type=int, choices=PANEL_MODELS, action="append",
+                        help="Modelo de panel (repetible). Por defecto todos")
+    parser.add_argument("--log-level", default="CRITICAL", help="Nivel de logging durante la medición")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()))
+
+    results = []
+    print(f"{'model':<24} {'variant':<10} {'operation':<22} {'events/s':>11} {'us/event':>9} {'peak KiB':>9}")
+    for model in args.model or PANEL_MODELS:
+        for r in bench_model(model, args.events, args.repeats):
+            results.append(r)
+            print(f"{r['name']:<24} {r['variant']:<10} {r['operation']:<22} "
+                  f"{r['events_per_s']:>11.0f} {r['us_per_event']:>9.2f} {r['peak_kib']:>9.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Latencia de entrega de alarmas con un backlog grande de baja prioridad.
+
+Llena la cola con un backlog de notificaciones (severidad 1) y atributos,
+arranca el drenado real de MqttHandler.process_queue contra un cliente que
+solo registra los envíos, e inyecta alarmas (severidad 3) durante el
+drenado. Compara la cola FIFO con los carriles de prioridad.
+
+Uso:
+    python -m benchmarks.priority_bench [--backlog 20000] [--alarms 10] [--rate 100] [--json salida.json]
+"""
+import argparse
+import json
+import logging
+import statistics
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+from tb_device_mqtt import TBPublishInfo
+
+from app_utils.queue_operations import SafeQueue, timestamped_telemetry
+from benchmarks.common import make_config
+from classes.enums import PublishType
+from classes.mqtt_sender import MqttHandler
+from config.schema import QueueConfig, RateLimitConfig
+
+
+class PublishedMessage:
+    """Resultado de publicación con PUBACK inmediato"""
+    rc = 0
+
+    def is_published(self) -> bool:
+        return True
+
+    def wait_for_publish(self, timeout=None):
+        pass
+
+
+class RecordingClient:
+    """Cliente MQTT de prueba: registra el instante de entrega de cada alarma"""
+
+    def __init__(self):
+        self.alarm_sent: Dict[int, float] = {}
+        self.messages = 0
+        self.done = threading.Event()
+        self.expected_alarms = 0
+
+    def is_connected(self) -> bool:
+        return True
+
+    def send_telemetry(self, records: List[Dict[str, Any]]):
+        self.messages += 1
+        now = time.perf_counter()
+        for record in records:
+            alarm = record["values"].get("alarm")
+            if alarm is not None:
+                self.alarm_sent[alarm] = now
+        if len(self.alarm_sent) >= self.expected_alarms:
+            self.done.set()
+        return TBPublishInfo([PublishedMessage()])
+
+    def send_attributes(self, attributes: Dict[str, Any]):
+        self.messages += 1
+        return TBPublishInfo([PublishedMessage()])
+
+    def disconnect(self):
+        pass
+
+
+def run(priority: bool, backlog: int, alarms: int, interval: float, rate: int, batch_size: int) -> Dict[str, Any]:
+    config = make_config()
+    config.thingsboard.batch_size = batch_size
+    config.thingsboard.rate_limits = [RateLimitConfig(limit=rate, period=1)]
+    config.thingsboard.rate_limit_state_file = ""
+
+    queue = SafeQueue()
+    with tempfile.TemporaryDirectory() as spill_dir:
+        queue.configure(QueueConfig(priority=priority, max_memory_items=0, spill_dir=spill_dir))
+        for i in range(backlog):
+            if i % 20 == 0:
+                queue.put((PublishType.ATTRIBUTE, {"backlog_attribute": i}))
+            queue.put((PublishType.TELEMETRY, timestamped_telemetry(
+                {"event": "SUPV ACT", "description": f"LAZO1 DISP{i % 250}", "severity": 1})))
+
+        handler = MqttHandler(config, queue)
+        client = RecordingClient()
+        client.expected_alarms = alarms
+        handler.client = client
+        handler.shutdown_flag = threading.Event()
+        drain = threading.Thread(target=handler.process_queue, daemon=True)
+
+        put_times: Dict[int, float] = {}
+        start = time.perf_counter()
+        drain.start()
+        for alarm in range(alarms):
+            time.sleep(interval)
+            put_times[alarm] = time.perf_counter()
+            queue.put((PublishType.TELEMETRY, timestamped_telemetry(
+                {"event": "HUMO ACT", "description": "PISO 3", "severity": 3, "alarm": alarm})))
+
+        client.done.wait(timeout=backlog / batch_size / rate + 30)
+        handler.shutdown_flag.set()
+        drain.join(timeout=5)
+
+    latencies = sorted((client.alarm_sent[a] - put_times[a]) * 1000 for a in client.alarm_sent)
+    return {
+        "mode": "priority" if priority else "fifo",
+        "backlog": backlog,
+        "alarms_delivered": len(latencies),
+        "alarm_p50_ms": statistics.median(latencies) if latencies else None,
+        "alarm_max_ms": latencies[-1] if latencies else None,
+        "messages": client.messages,
+        "elapsed_s": time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backlog", type=int, default=20000, help="Notificaciones en cola antes de las alarmas")
+    parser.add_argument("--alarms", type=int, default=10, help="Alarmas inyectadas durante el drenado")
+    parser.add_argument("--interval", type=float, default=0.1, help="Segundos entre alarmas")
+    parser.add_argument("--rate", type=int, default=100, help="Mensajes por segundo del limitador")
+    parser.add_argument("--batch-size", type=int, default=50, help="Eventos por mensaje")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    results = []
+    print(f"{'mode':<9} {'backlog':>8} {'alarms':>7} {'p50 ms':>9} {'max ms':>9} {'messages':>9} {'elapsed s':>10}")
+    for priority in (False, True):
+        r = run(priority, args.backlog, args.alarms, args.interval, args.rate, args.batch_size)
+        results.append(r)
+        p50 = f"{r['alarm_p50_ms']:.1f}" if r['alarm_p50_ms'] is not None else "-"
+        worst = f"{r['alarm_max_ms']:.1f}" if r['alarm_max_ms'] is not None else "-"
+        print(f"{r['mode']:<9} {r['backlog']:>8} {r['alarms_delivered']:>7} {p50:>9} {worst:>9} "
+              f"{r['messages']:>9} {r['elapsed_s']:>10.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
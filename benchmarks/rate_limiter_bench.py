@@ -0,0 +1,146 @@
+"""
+Microbenchmark del limitador de envíos: GCRA (APILimitsManager actual)
+contra la implementación anterior con deques de timestamps.
+
+Ambos corren sobre un reloj simulado para recorrer horas de tráfico en
+segundos. Reporta ns por llamada a can_send(), envíos permitidos y memoria
+retenida por el limitador (tracemalloc).
+
+Escenarios:
+    steady: 2 intentos/s durante 2 h (llena la ventana de una hora)
+    burst:  1000 intentos/s durante 10 min (casi todos rechazados)
+
+Uso:
+    python -m benchmarks.rate_limiter_bench [--json salida.json]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Dict, List
+
+import classes.mqtt_sender as mqtt_sender
+from classes.mqtt_sender import APILimitsManager
+
+SCENARIOS = {
+    "steady": (0.5, 2 * 3600),
+    "burst": (0.001, 600),
+}
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+clock = SimulatedClock()
+
+
+class DequeLimiter:
+    """Implementación anterior de APILimitsManager (ventanas con deques)"""
+
+    def __init__(self):
+        self.second_limit = 100
+        self.minute_limit = 3000
+        self.hour_limit = 7000
+        self.second_window = deque()
+        self.minute_window = deque()
+        self.hour_window = deque()
+
+    def can_send(self) -> bool:
+        current_time = clock.time()
+        self._update_windows(current_time)
+
+        if (len(self.second_window) < self.second_limit and
+            len(self.minute_window) < self.minute_limit and
+            len(self.hour_window) < self.hour_limit):
+            self._add_request(current_time)
+            return True
+        return False
+
+    def _update_windows(self, current_time: float):
+        self._clean_window(self.second_window, current_time - 1)
+        self._clean_window(self.minute_window, current_time - 60)
+        self._clean_window(self.hour_window, current_time - 3600)
+
+    def _clean_window(self, window: deque, oldest_allowed: float):
+        while window and window[0] < oldest_allowed:
+            window.popleft()
+
+    def _add_request(self, current_time: float):
+        self.second_window.append(current_time)
+        self.minute_window.append(current_time)
+        self.hour_window.append(current_time)
+
+
+IMPLEMENTATIONS = {
+    "deque": DequeLimiter,
+    "gcra": lambda: APILimitsManager(state_file=None),
+}
+
+
+def run(name: str, scenario: str) -> Dict[str, Any]:
+    step, duration = SCENARIOS[scenario]
+    calls = int(duration / step)
+    clock.now = 1_700_000_000.0
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        limiter = IMPLEMENTATIONS[name]()
+        baseline = tracemalloc.get_traced_memory()[0]
+        allowed = 0
+        for _ in range(calls):
+            clock.now += step
+            allowed += limiter.can_send()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    # Medición de tiempo sin tracemalloc
+    clock.now = 1_700_000_000.0
+    limiter = IMPLEMENTATIONS[name]()
+    start = time.perf_counter()
+    for _ in range(calls):
+        clock.now += step
+        limiter.can_send()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "implementation": name,
+        "scenario": scenario,
+        "calls": calls,
+        "allowed": allowed,
+        "ns_per_call": elapsed * 1e9 / calls,
+        "retained_kib": retained / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    mqtt_sender.time = clock
+    results: List[Dict[str, Any]] = []
+    print(f"{'implementation':<15} {'scenario':<8} {'calls':>9} {'allowed':>8} {'ns/call':>9} {'retained KiB':>13}")
+    for scenario in SCENARIOS:
+        for name in IMPLEMENTATIONS:
+            r = run(name, scenario)
+            results.append(r)
+            print(f"{r['implementation']:<15} {r['scenario']:<8} {r['calls']:>9} {r['allowed']:>8} "
+                  f"{r['ns_per_call']:>9.0f} {r['retained_kib']:>13.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
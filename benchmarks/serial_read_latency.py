@@ -0,0 +1,91 @@
+"""
+Benchmark de latencia de lectura serial: modo 'event' (select) contra 'polling'.
+
+Abre un pseudo-terminal, escribe eventos en instantes aleatorios y mide el
+tiempo desde que se escribe la línea hasta que el evento parseado llega a la
+cola. También mide el CPU y los cambios de contexto con el panel en silencio.
+
+Uso:
+    python -m benchmarks.serial_read_latency [--events 50] [--idle 5]
+"""
+import argparse
+import logging
+import os
+import random
+import resource
+import statistics
+import threading
+import time
+
+from benchmarks.common import TimedQueue, make_config, load_profile
+from classes.serial_port_handler import SerialPortHandler
+
+EVENT_LINE = b"HUMO ACT|01/02/25 10:15 Z1 PISO 3\r\n"
+
+
+def _rusage():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime, usage.ru_nvcsw + usage.ru_nivcsw
+
+
+def run_mode(read_mode: str, events: int, idle_seconds: float) -> dict:
+    master, slave = os.openpty()
+    port = os.ttyname(slave)
+    queue = TimedQueue()
+    handler = SerialPortHandler(make_config(port, read_mode), {"HUMO ACT": 3}, queue, load_profile(10001))
+    shutdown_flag = threading.Event()
+    reader = threading.Thread(target=handler.listening_to_serial, args=(shutdown_flag,), daemon=True)
+    reader.start()
+
+    deadline = time.monotonic() + 5
+    while not queue.is_serial_connected and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Panel en silencio: CPU y cambios de contexto consumidos por el lector
+    cpu_start, switches_start = _rusage()
+    time.sleep(idle_seconds)
+    cpu_end, switches_end = _rusage()
+
+    latencies = []
+    for i in range(events):
+        time.sleep(random.uniform(0.05, 0.25))
+        written_at = time.perf_counter()
+        os.write(master, EVENT_LINE)
+        if not queue.wait_for_count(i + 1, timeout=5):
+            raise RuntimeError(f"Event {i} did not reach the queue in read mode '{read_mode}'")
+        latencies.append((queue.put_times[i] - written_at) * 1000)
+
+    shutdown_flag.set()
+    handler.request_stop()
+    reader.join(timeout=5)
+    os.close(master)
+    os.close(slave)
+
+    latencies.sort()
+    return {
+        "mode": read_mode,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "max": latencies[-1],
+        "idle_cpu_ms_per_s": (cpu_end - cpu_start) * 1000 / idle_seconds,
+        "idle_switches_per_s": (switches_end - switches_start) / idle_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=50, help="Eventos a escribir por modo")
+    parser.add_argument("--idle", type=float, default=5.0, help="Segundos en silencio para medir CPU")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    print(f"{'mode':<8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'idle CPU ms/s':>14} {'idle ctxsw/s':>13}")
+    for read_mode in ("polling", "event"):
+        r = run_mode(read_mode, args.events, args.idle)
+        print(f"{r['mode']:<8} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['max']:>8.2f} "
+              f"{r['idle_cpu_ms_per_s']:>14.3f} {r['idle_switches_per_s']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Tiempo de arranque del gateway: del inicio del proceso a cada hito.
+
+Arranca la aplicación como main.py (imports, validación de la
+configuración, cola, conexión MQTT y lector serial) en un proceso nuevo,
+contra un pty con el emulador de panel y un broker MQTT mínimo local que
+responde CONNACK (con --connack-ms de demora), SUBACK y PUBACK. El proceso hijo imprime los hitos
+de STARTUP y termina en cuanto tiene el primer PUBACK:
+
+  serial_listening  puerto serial abierto y lector activo
+  mqtt_connected    CONNACK recibido
+  queue_restored    backlog del log de la cola restaurado
+  first_publish     primer lote de la cola confirmado
+
+Con --backlog N el log de la cola empieza con N eventos sin entregar. Con
+--no-broker el puerto MQTT no escucha: solo se mide serial_listening.
+
+Uso:
+    python -m benchmarks.startup_bench [--runs 5] [--runtime threads] [--connack-ms 0] [--backlog 0] [--no-broker] [--json salida.json]
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+import yaml
+
+from app_utils.startup import SERIAL_LISTENING, MQTT_CONNECTED, QUEUE_RESTORED, FIRST_PUBLISH
+from app_utils.queue_operations import timestamped_telemetry
+from app_utils.write_ahead_log import WriteAheadLog
+from benchmarks.common import REPO_DIR, PANEL_MODELS, make_config, load_profile
+from benchmarks.panel_emulator import CAPTURES_DIR, PanelEmulator, load_capture
+from classes.enums import PublishType
+
+MILESTONES = (SERIAL_LISTENING, MQTT_CONNECTED, QUEUE_RESTORED, FIRST_PUBLISH)
+
+
+def _read_exact(conn: socket.socket, size: int) -> bytes:
+    data = b''
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("closed")
+        data += chunk
+    return data
+
+
+def _read_varint(data: bytes, offset: int) -> tuple:
+    value, shift = 0, 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+RPC_REQUEST_TOPIC = 'v1/devices/me/rpc/request/'
+RPC_RESPONSE_TOPIC = 'v1/devices/me/rpc/response/'
+# Respuesta a getSessionLimits, que el cliente pide al conectar: sin límites
+SESSION_LIMITS = b'{"rateLimits": {}}'
+
+
+class MiniBroker:
+    """
+    Broker MQTT 5 mínimo para un cliente: confirma todo, descarta lo
+    publicado y responde los RPC del dispositivo (getSessionLimits), como
+    ThingsBoard; sin esa respuesta el cliente retiene los envíos hasta 5 s.
+    """
+
+    def __init__(self, connack_delay: float = 0.0):
+        self.connack_delay = connack_delay
+        self.server = socket.create_server(('127.0.0.1', 0))
+        self.port = self.server.getsockname()[1]
+        self.publishes = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _read_packet(self, conn: socket.socket) -> tuple:
+        header = _read_exact(conn, 1)[0]
+        length, shift = 0, 0
+        while True:
+            byte = _read_exact(conn, 1)[0]
+            length |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                break
+            shift += 7
+        return header, _read_exact(conn, length)
+
+    def _serve(self, conn: socket.socket) -> None:
+        try:
+            while True:
+                header, body = self._read_packet(conn)
+                kind = header >> 4
+                if kind == 1:  # CONNECT
+                    time.sleep(self.connack_delay)
+                    conn.sendall(b'\x20\x03\x00\x00\x00')
+                elif kind == 8:  # SUBSCRIBE: id, propiedades, filtros (largo, texto, opciones)
+                    properties, offset = _read_varint(body, 2)
+                    offset += properties
+                    topics = 0
+                    while offset < len(body):
+                        offset += 2 + int.from_bytes(body[offset:offset + 2], 'big') + 1
+                        topics += 1
+                    conn.sendall(bytes([0x90, 3 + topics]) + body[:2] + b'\x00' + b'\x01' * topics)
+                elif kind == 3:  # PUBLISH
+                    self.publishes += 1
+                    offset = 2 + int.from_bytes(body[:2], 'big')
+                    topic = body[2:offset].decode()
+                    if (header >> 1) & 0x03:
+                        conn.sendall(b'\x40\x02' + body[offset:offset + 2])
+                    if topic.startswith(RPC_REQUEST_TOPIC):
+                        reply = (RPC_RESPONSE_TOPIC + topic[len(RPC_REQUEST_TOPIC):]).encode()
+                        packet = len(reply).to_bytes(2, 'big') + reply + b'\x00' + SESSION_LIMITS
+                        conn.sendall(bytes([0x30, len(packet)]) + packet)
+                elif kind == 12:  # PINGREQ
+                    conn.sendall(b'\xd0\x00')
+                elif kind == 14:  # DISCONNECT
+                    return
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        self.server.close()
+
+
+def _unused_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def write_backlog(wal_dir: str, count: int) -> None:
+    """Deja en el log de la cola ``count`` eventos sin entregar, como tras un corte de red"""
+    wal = WriteAheadLog(wal_dir)
+    for _ in wal.recover():
+        pass
+    for index in range(count):
+        wal.append((PublishType.TELEMETRY, timestamped_telemetry(
+            {"event": f"HUMO ACT|backlog {index}", "severity": 1}, time.time() - 3600)))
+    wal.close()
+
+
+def write_config(directory: str, port: str, model: int, runtime: str, mqtt_port: int) -> str:
+    config = make_config(port, "event", model).model_dump(mode='json')
+    config["runtime"] = runtime
+    config["thingsboard"].update(device_token="bench", host="127.0.0.1", port=mqtt_port, rate_limit_state_file="")
+    config["queue"].update(wal_dir=os.path.join(directory, "queue_wal"), spill_dir=os.path.join(directory, "queue_spill"))
+    config["metrics"]["enabled"] = False
+    config["gpio"]["backend"] = "simulated"
+    path = os.path.join(directory, "config.yml")
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return path
+
+
+# Proceso hijo: arranca la aplicación igual que main.py, con la configuración
+# del benchmark, e imprime los hitos; solo importa lo que importa main.py
+CHILD_SCRIPT = """
+import json, logging, os, sys, threading, time
+from app_utils.startup import STARTUP
+config_path, timeout, wait_for, repo_dir = sys.argv[1], float(sys.argv[2]), sys.argv[3], sys.argv[4]
+
+def report():
+    deadline = time.monotonic() + timeout
+    while wait_for not in STARTUP.marks and time.monotonic() < deadline:
+        time.sleep(0.005)
+    print(json.dumps(STARTUP.marks), flush=True)
+    os._exit(0)
+
+threading.Thread(target=report, daemon=True).start()
+logging.basicConfig(level=logging.ERROR)
+from config.loader import load_and_validate_config, load_event_severity_levels, load_panel_profiles
+from app.core import Application
+config = load_and_validate_config(config_path)
+event_severity_levels = load_event_severity_levels(os.path.join(repo_dir, "config", "eventSeverityLevels.yml"))
+panel_profiles = load_panel_profiles(os.path.join(repo_dir, "Codigos_FACP.yml"))
+Application(config, event_severity_levels, panel_profiles).start()
+"""
+
+
+def run_once(model: int, runtime: str, connack_ms: float, backlog: int, broker: bool, timeout: float) -> Dict[str, Any]:
+    profile = load_profile(model)
+    emulator = PanelEmulator(load_capture(os.path.join(CAPTURES_DIR, f"{model}.jsonl")), profile.serial_config)
+    port = emulator.open()
+    mqtt_broker = MiniBroker(connack_ms / 1000) if broker else None
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            config_path = write_config(directory, port, model, runtime,
+                                       mqtt_broker.port if mqtt_broker else _unused_port())
+            write_backlog(os.path.join(directory, "queue_wal"), backlog)
+            wait_for = FIRST_PUBLISH if broker else SERIAL_LISTENING
+            env = dict(os.environ, PYTHONPATH=REPO_DIR)
+            started = time.monotonic()
+            output = subprocess.run(
+                [sys.executable, "-c", CHILD_SCRIPT, config_path, str(timeout), wait_for, REPO_DIR],
+                cwd=directory, env=env, capture_output=True, text=True, timeout=timeout + 10)
+            wall = time.monotonic() - started
+    finally:
+        emulator.close()
+        if mqtt_broker:
+            mqtt_broker.close()
+    marks = json.loads(output.stdout.strip().splitlines()[-1])
+    marks["wall"] = wall
+    return marks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", type=int, choices=PANEL_MODELS, default=PANEL_MODELS[0], help="Modelo de panel")
+    parser.add_argument("--runtime", choices=("threads", "asyncio"), default="threads")
+    parser.add_argument("--runs", type=int, default=5, help="Arranques a medir")
+    parser.add_argument("--connack-ms", type=float, default=0.0, help="Demora del CONNACK del broker")
+    parser.add_argument("--backlog", type=int, default=0, help="Eventos sin entregar en el log de la cola al arrancar")
+    parser.add_argument("--no-broker", action="store_true", help="Sin broker: la conexión MQTT falla")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Segundos máximos por arranque")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    runs: List[Dict[str, Any]] = [run_once(args.model, args.runtime, args.connack_ms, args.backlog, not args.no_broker, args.timeout)
+                                  for _ in range(args.runs)]
+    print(f"{args.runs} starts, runtime={args.runtime}, connack={args.connack_ms:.0f}ms, backlog={args.backlog}"
+          f"{', no broker' if args.no_broker else ''}")
+    print(f"{'milestone':<18} {'median s':>9} {'min s':>9} {'max s':>9}")
+    for milestone in MILESTONES + ("wall",):
+        values = [run[milestone] for run in runs if milestone in run]
+        if values:
+            print(f"{milestone:<18} {statistics.median(values):>9.3f} {min(values):>9.3f} {max(values):>9.3f}")
+        else:
+            print(f"{milestone:<18} {'-':>9}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(runs, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import time
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+from classes.panel_profile import PanelProfile
+
+FRAME_EVENT = 'event'
+FRAME_REPORT = 'report'
+
+Frame = Tuple[str, str]
+
+
+class EventFramer(ABC):
+    """
+    Agrupa las líneas recibidas del panel en eventos y reportes completos.
+
+    push() recibe cada línea (ya sin terminador) y devuelve los fragmentos que
+    quedaron completos como tuplas (FRAME_EVENT | FRAME_REPORT, texto).
+    """
+
+    def __init__(self, profile: PanelProfile):
+        self.profile = profile
+        self.report_delimiter = profile.report_delimiter
+        self.max_report_delimiter_count = profile.max_report_delimiter_count
+        self.message_timeout = profile.message_timeout
+        self.buffer_lines: List[str] = []
+        self.report_count = 0
+        self.last_activity_time = time.monotonic()
+
+    @abstractmethod
+    def push(self, line: str) -> List[Frame]:
+        """Agrega una línea y devuelve los fragmentos completados por ella"""
+
+    def pending_timeout(self) -> float | None:
+        """Segundos hasta que lo acumulado deba publicarse por inactividad"""
+        if not self.buffer_lines or self.message_timeout is None:
+            return None
+        return max(0.0, self.message_timeout - (time.monotonic() - self.last_activity_time))
+
+    def expire(self) -> List[Frame]:
+        """Publica lo acumulado si pasó message_timeout sin actividad"""
+        if self.pending_timeout() == 0.0:
+            self.last_activity_time = time.monotonic()
+            return self.flush()
+        return []
+
+    def flush(self) -> List[Frame]:
+        """Entrega lo acumulado sin importar si está completo"""
+        if not self.buffer_lines:
+            return []
+        frame = (FRAME_REPORT if self.report_count > 0 else FRAME_EVENT, "\n".join(self.buffer_lines))
+        self.buffer_lines = []
+        self.report_count = 0
+        return [frame]
+
+    def _is_report_delimiter(self, line: str) -> bool:
+        return bool(self.report_delimiter) and self.report_delimiter in line
+
+
+class LineEventFramer(EventFramer):
+    """
+    Cada línea es un evento completo. Dentro de un reporte (entre el primer
+    delimitador y max_report_delimiter_count) las líneas se acumulan.
+    """
+
+    def push(self, line: str) -> List[Frame]:
+        line = line.strip()
+        self.last_activity_time = time.monotonic()
+        if self._is_report_delimiter(line):
+            self.report_count += 1
+        if line:
+            self.buffer_lines.append(line)
+
+        # Fuera de un reporte, o al cerrarlo, lo acumulado está completo
+        if self.report_count == 0 or self.report_count == self.max_report_delimiter_count:
+            return self.flush()
+        return []
+
+
+class BlockEventFramer(EventFramer):
+    """
+    Acumula líneas hasta recibir una línea que completa el mensaje
+    (complete_pattern), una línea vacía o hasta que pase message_timeout.
+    """
+
+    def push(self, line: str) -> List[Frame]:
+        line = line.strip()
+
+        if line:
+            self.last_activity_time = time.monotonic()
+
+            # Verificar si es un delimitador de reporte
+            if self._is_report_delimiter(line):
+                self.report_count += 1
+                self.buffer_lines.append(line)
+                return []
+
+            # Verificar si la línea contiene un mensaje completo
+            if self.profile.complete_pattern.search(line):
+                self.buffer_lines.append(line)
+                return self.flush()
+
+            # Línea parcial, acumular en buffer
+            self.buffer_lines.append(line)
+            return []
+
+        # Línea vacía puede indicar fin de mensaje multi-línea
+        # Solo es reporte si se recibieron todos sus delimitadores
+        if self.report_count != self.max_report_delimiter_count:
+            self.report_count = 0
+        return self.flush()
+
+
+class HeaderEventFramer(EventFramer):
+    """
+    Una línea de encabezado (header_pattern) inicia cada evento; las líneas
+    siguientes son el mensaje. El evento termina con una línea vacía, con el
+    siguiente encabezado o por inactividad. Las líneas sueltas sin
+    encabezado se descartan.
+    """
+
+    def push(self, line: str) -> List[Frame]:
+        line = line.replace('\x00', '').strip()
+        frames: List[Frame] = []
+
+        if self.profile.frame_header_pattern.match(line):
+            frames = self.flush()
+            self.buffer_lines = [line]
+            self.last_activity_time = time.monotonic()
+        elif line:
+            if self.buffer_lines:
+                self.buffer_lines.append(line)
+                self.last_activity_time = time.monotonic()
+        else:
+            frames = self.flush()
+        return frames
+
+    def flush(self) -> List[Frame]:
+        # Un evento válido tiene la línea de encabezado y al menos una línea de mensaje
+        if len(self.buffer_lines) < 2:
+            self.buffer_lines = []
+            return []
+        return super().flush()
+
+
+FRAMERS = {
+    'line': LineEventFramer,
+    'block': BlockEventFramer,
+    'header': HeaderEventFramer
+}
+
+
+def create_event_framer(profile: PanelProfile) -> EventFramer:
+    return FRAMERS[profile.framing_mode](profile)
@@ -0,0 +1,180 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+GPIO_BACKEND_AUTO = 'auto'
+GPIO_BACKEND_RPI = 'rpi'
+GPIO_BACKEND_SIMULATED = 'simulated'
+
+GpioEvent = Tuple[float, int, int]  # (instante perf_counter, pin, nivel)
+
+def is_raspberry_pi() -> bool:
+    try:
+        with open('/sys/firmware/devicetree/base/model', 'r') as model:
+            return 'Raspberry Pi' in model.read()
+    except:
+        return False
+
+class SimulatedGpio:
+    """
+    Backend GPIO simulado con la misma interfaz que RPi.GPIO (la parte que usa
+    el gateway: setmode, setup, input, output, add_event_detect,
+    remove_event_detect y cleanup).
+
+    Las entradas se cambian con set_input(), que llama a los callbacks de
+    flanco en el hilo que la invoca, como lo hace el hilo de eventos de
+    RPi.GPIO. play() reproduce un guion de cambios con su temporización. Cada
+    flanco inyectado y cada output() quedan registrados con su instante
+    (perf_counter) en ``edges`` y ``outputs``.
+
+    Guion (JSON Lines), un cambio por línea:
+        {"t": 0.5, "pin": 13, "level": 1}
+      t      segundos desde el inicio del guion
+      pin    pin BCM de entrada
+      level  nivel nuevo (0 o 1)
+    """
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+
+    def __init__(self):
+        self.mode: int | None = None
+        self.levels: Dict[int, int] = {}
+        self.directions: Dict[int, int] = {}
+        self.callbacks: Dict[int, Tuple[int, Callable[[int], None]]] = {}
+        self.edges: List[GpioEvent] = []
+        self.outputs: List[GpioEvent] = []
+        self.condition = threading.Condition()
+
+    def setmode(self, mode: int) -> None:
+        self.mode = mode
+
+    def setup(self, pin: int, direction: int, pull_up_down: int = PUD_OFF, initial: int | None = None) -> None:
+        with self.condition:
+            self.directions[pin] = direction
+            if pin not in self.levels:
+                if initial is not None:
+                    self.levels[pin] = initial
+                else:
+                    self.levels[pin] = self.HIGH if pull_up_down == self.PUD_UP else self.LOW
+
+    def input(self, pin: int) -> int:
+        return self.levels.get(pin, self.LOW)
+
+    def output(self, pin: int, level: int) -> None:
+        with self.condition:
+            self.levels[pin] = level
+            self.outputs.append((time.perf_counter(), pin, level))
+            self.condition.notify_all()
+        logger.debug(f"[SIMULATION] GPIO {pin} -> {level}")
+
+    def add_event_detect(self, pin: int, edge: int, callback: Callable[[int], None] | None = None,
+                         bouncetime: int | None = None) -> None:
+        if pin in self.callbacks:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+        self.callbacks[pin] = (edge, callback)
+
+    def remove_event_detect(self, pin: int) -> None:
+        self.callbacks.pop(pin, None)
+
+    def cleanup(self, pins: int | List[int] | None = None) -> None:
+        if pins is None:
+            pins = list(self.directions)
+        elif isinstance(pins, int):
+            pins = [pins]
+        for pin in pins:
+            self.callbacks.pop(pin, None)
+            self.directions.pop(pin, None)
+
+    def set_input(self, pin: int, level: int) -> None:
+        """Cambia el nivel de una entrada y dispara su callback si hay flanco"""
+        with self.condition:
+            previous = self.levels.get(pin, self.LOW)
+            self.levels[pin] = level
+            if previous == level:
+                return
+            self.edges.append((time.perf_counter(), pin, level))
+        edge, callback = self.callbacks.get(pin, (None, None))
+        if callback is None:
+            return
+        if edge == self.BOTH or (edge == self.RISING and level == self.HIGH) or (edge == self.FALLING and level == self.LOW):
+            callback(pin)
+
+    def play(self, script: List[Dict[str, Any]], speed: float = 1.0, stop_event: threading.Event | None = None) -> None:
+        """Aplica los cambios del guion respetando sus tiempos (escalados por ``speed``)"""
+        start = time.perf_counter()
+        for step in script:
+            delay = start + step.get('t', 0.0) / speed - time.perf_counter()
+            if delay > 0:
+                if stop_event is not None:
+                    if stop_event.wait(delay):
+                        return
+                else:
+                    time.sleep(delay)
+            self.set_input(int(step['pin']), int(step['level']))
+
+    def play_in_background(self, script: List[Dict[str, Any]], speed: float = 1.0) -> threading.Thread:
+        thread = threading.Thread(target=self.play, args=(script, speed), name='gpio_script', daemon=True)
+        thread.start()
+        return thread
+
+    def wait_for_output(self, pin: int, level: int, after: float = 0.0, timeout: float | None = None) -> float | None:
+        """
+        Espera un output() de ``level`` en ``pin`` posterior al instante
+        ``after`` (perf_counter).
+
+        Returns:
+            El instante del output, o None si no llegó antes de ``timeout``
+        """
+        def find() -> float | None:
+            for at, out_pin, out_level in reversed(self.outputs):
+                if at < after:
+                    return None
+                if out_pin == pin and out_level == level:
+                    return at
+            return None
+
+        with self.condition:
+            self.condition.wait_for(lambda: find() is not None, timeout)
+            return find()
+
+def load_gpio_script(path: str) -> List[Dict[str, Any]]:
+    steps = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                steps.append(json.loads(line))
+    return steps
+
+def create_gpio_backend(backend: str = GPIO_BACKEND_AUTO) -> Any:
+    """
+    Devuelve el backend GPIO: el módulo RPi.GPIO o un SimulatedGpio.
+
+    Con 'auto' se usa RPi.GPIO si el equipo es una Raspberry Pi y el módulo
+    está instalado; si no, el simulado. Con 'rpi' un fallo al importar
+    RPi.GPIO es un error.
+    """
+    if backend == GPIO_BACKEND_RPI or (backend == GPIO_BACKEND_AUTO and is_raspberry_pi()):
+        try:
+            import RPi.GPIO as GPIO
+            return GPIO
+        except (ImportError, RuntimeError) as e:
+            if backend == GPIO_BACKEND_RPI:
+                raise
+            logger.warning(f"RPi.GPIO not available ({e}), using simulated GPIO")
+    elif backend == GPIO_BACKEND_AUTO:
+        logger.warning("Not running on Raspberry Pi. Using simulated GPIO.")
+    return SimulatedGpio()
@@ -0,0 +1,87 @@
+import re
+import time
+from typing import List
+
+
+class LineFramer:
+    """
+    Separa el flujo de bytes del puerto serial en líneas completas.
+
+    Los bytes recibidos se acumulan en un bytearray reutilizable; en cada
+    llamada a feed() se decodifica una sola vez todo el tramo que termina en
+    el último terminador y se separa en líneas. El fragmento final sin
+    terminador queda pendiente hasta la siguiente lectura.
+    """
+
+    def __init__(self, terminators: bytes = b"\n", encoding: str = 'latin-1', max_pending: int = 65536):
+        if not terminators:
+            raise ValueError("At least one frame terminator is required")
+        self.terminators = terminators
+        self.encoding = encoding
+        self.max_pending = max_pending
+        self._buffer = bytearray()
+        self._pending_since = 0.0
+        if len(terminators) == 1:
+            self._separator = terminators.decode(encoding)
+            self._split_pattern = None
+        else:
+            self._separator = None
+            self._split_pattern = re.compile('[' + re.escape(terminators.decode(encoding)) + ']')
+
+    @property
+    def pending(self) -> int:
+        """Cantidad de bytes recibidos que aún no forman una línea completa"""
+        return len(self._buffer)
+
+    def pending_age(self) -> float:
+        """Segundos desde que empezó a acumularse el fragmento pendiente"""
+        if not self._buffer:
+            return 0.0
+        return time.monotonic() - self._pending_since
+
+    def feed(self, data: bytes) -> List[str]:
+        """
+        Agrega bytes recibidos y devuelve las líneas completas, sin terminador.
+        Terminadores consecutivos producen líneas vacías.
+        """
+        if not data:
+            return []
+        if not self._buffer:
+            self._pending_since = time.monotonic()
+        self._buffer += data
+
+        end = max(self._buffer.rfind(t, len(self._buffer) - len(data)) for t in self._iter_terminators())
+        if end < 0:
+            if len(self._buffer) > self.max_pending:
+                # Sin terminador en mucho tiempo: entregar como línea para no crecer sin límite
+                return self.flush()
+            return []
+
+        text = self._buffer[:end + 1].decode(self.encoding)
+        del self._buffer[:end + 1]
+        if self._buffer:
+            self._pending_since = time.monotonic()
+
+        lines = self._split(text)
+        lines.pop()  # El texto termina en un terminador: el último elemento siempre es ''
+        return lines
+
+    def flush(self) -> List[str]:
+        """Entrega el fragmento pendiente como línea aunque no tenga terminador"""
+        if not self._buffer:
+            return []
+        text = self._buffer.decode(self.encoding)
+        self._buffer.clear()
+        return [text]
+
+    def reset(self) -> None:
+        self._buffer.clear()
+
+    def _iter_terminators(self):
+        for i in range(len(self.terminators)):
+            yield self.terminators[i:i + 1]
+
+    def _split(self, text: str) -> List[str]:
+        if self._separator is not None:
+            return text.split(self._separator)
+        return self._split_pattern.split(text)
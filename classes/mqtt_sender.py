@@ -1,48 +1,126 @@
-from tb_device_mqtt import TBDeviceMqttClient
-from app_utils.queue_operations import SafeQueue
+from app_utils.queue_operations import SafeQueue, QueueEntry, timestamped_telemetry
+from app_utils.rpc_executor import RpcExecutor
+from app_utils.delta_cache import DeltaCache
+from app_utils.metrics import REGISTRY
+from app_utils.event_trace import EventTracer, STAGE_DEQUEUED, STAGE_SENT
+from app_utils.startup import STARTUP, MQTT_CONNECTED, FIRST_PUBLISH
 import logging
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, List, TYPE_CHECKING
 import threading
 import time
+import asyncio
+import inspect
 from classes.enums import PublishType
-from config.schema import ConfigSchema
+from config.schema import ConfigSchema, RateLimitConfig, DEFAULT_RATE_LIMITS
 import queue
-from collections import deque
 import json
+import os
+from collections import deque
+
+if TYPE_CHECKING:
+    # tb_device_mqtt (y paho) se importan al crear el cliente, fuera del camino de arranque
+    from tb_device_mqtt import TBDeviceMqttClient, TBPublishInfo
+
+TB_ERR_SUCCESS = 0  # TBPublishInfo.TB_ERR_SUCCESS
+
+PUBLISH_ACKED = 'acked'
+PUBLISH_PENDING = 'pending'
+PUBLISH_FAILED = 'failed'
 
 class APILimitsManager:
-    def __init__(self):
-        self.second_limit = 100
-        self.minute_limit = 3000
-        self.hour_limit = 7000
-        self.second_window = deque()
-        self.minute_window = deque()
-        self.hour_window = deque()
+    """
+    Limitador de envíos a ThingsBoard con GCRA (Generic Cell Rate Algorithm).
+
+    Cada límite (N envíos por período) guarda solo su TAT (theoretical arrival
+    time): memoria y tiempo O(1) por envío, sin importar el tamaño de la
+    ventana. Equivale a un token bucket de capacidad N que se recarga a razón
+    de N/período, igual que los límites del servidor.
+
+    El estado se guarda en hora de reloj (time.time) en un archivo JSON para
+    que los reinicios no vuelvan a disponer de la ráfaga completa.
+    """
+
+    def __init__(self, limits: List[RateLimitConfig] | None = None, state_file: str | None = None,
+                 save_interval: float = 10):
+        self.logger = logging.getLogger(__name__)
+        limits = limits if limits is not None else DEFAULT_RATE_LIMITS
+        self.intervals = [limit.period / limit.limit for limit in limits]  # Intervalo entre envíos
+        self.tolerances = [limit.period - limit.period / limit.limit for limit in limits]  # Ráfaga permitida
+        self.periods = [limit.period for limit in limits]
+        self.tat = [0.0] * len(limits)
+        self.allowed_at = 0.0  # Primer instante en que todos los límites permiten enviar
+        self.last_time = 0.0
+        self.state_file = state_file
+        self.save_interval = save_interval
+        self.last_save = 0.0
+        self.dirty = False
+        self.load_state()
+
+    def _update_allowed_at(self) -> None:
+        self.allowed_at = max((tat - tolerance for tat, tolerance in zip(self.tat, self.tolerances)), default=0.0)
+
+    def _check_clock(self, current_time: float) -> None:
+        # Un reloj que retrocede (p. ej. ajuste NTP) no debe bloquear más de un período
+        if current_time < self.last_time:
+            self.tat = [min(tat, current_time + period) for tat, period in zip(self.tat, self.periods)]
+            self._update_allowed_at()
+        self.last_time = current_time
 
     def can_send(self) -> bool:
         current_time = time.time()
-        self._update_windows(current_time)
-        
-        if (len(self.second_window) < self.second_limit and
-            len(self.minute_window) < self.minute_limit and
-            len(self.hour_window) < self.hour_limit):
-            self._add_request(current_time)
-            return True
-        return False
-
-    def _update_windows(self, current_time: float):
-        self._clean_window(self.second_window, current_time - 1)
-        self._clean_window(self.minute_window, current_time - 60)
-        self._clean_window(self.hour_window, current_time - 3600)
-
-    def _clean_window(self, window: deque, oldest_allowed: float):
-        while window and window[0] < oldest_allowed:
-            window.popleft()
-
-    def _add_request(self, current_time: float):
-        self.second_window.append(current_time)
-        self.minute_window.append(current_time)
-        self.hour_window.append(current_time)
+        self._check_clock(current_time)
+        if current_time < self.allowed_at:
+            return False
+        allowed_at = 0.0
+        tat = self.tat
+        for index, interval in enumerate(self.intervals):
+            next_tat = (tat[index] if tat[index] > current_time else current_time) + interval
+            tat[index] = next_tat
+            next_tat -= self.tolerances[index]
+            if next_tat > allowed_at:
+                allowed_at = next_tat
+        self.allowed_at = allowed_at
+        self.dirty = True
+        if current_time - self.last_save >= self.save_interval:
+            self.save_state()
+        return True
+
+    def time_until_allowed(self) -> float:
+        """Segundos que faltan para que can_send() permita el próximo envío (0 si ya puede)"""
+        current_time = time.time()
+        self._check_clock(current_time)
+        return max(0.0, self.allowed_at - current_time)
+
+    def load_state(self) -> None:
+        if not self.state_file:
+            return
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            tat = [float(value) for value in state['tat']]
+            if len(tat) != len(self.intervals):
+                raise ValueError("rate limits changed")
+            current_time = time.time()
+            self.tat = [min(value, current_time + period) for value, period in zip(tat, self.periods)]
+            self._update_allowed_at()
+            self.logger.info(f"Rate limiter state loaded from {self.state_file}")
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Ignoring rate limiter state {self.state_file}: {e}")
+
+    def save_state(self) -> None:
+        self.last_save = time.time()
+        if not self.state_file or not self.dirty:
+            return
+        try:
+            temp_file = f"{self.state_file}.tmp"
+            with open(temp_file, 'w') as f:
+                json.dump({"tat": self.tat}, f)
+            os.replace(temp_file, self.state_file)
+            self.dirty = False
+        except OSError as e:
+            self.logger.error(f"Error saving rate limiter state: {e}")
 
 class MqttHandler:
     def __init__(self, config: ConfigSchema, queue: SafeQueue):
@@ -50,25 +128,92 @@ class MqttHandler:
         self.queue = queue
         self.logger = logging.getLogger(__name__)
         self.reconnect_interval = 5
+        self.retry_interval = 1
+        self.idle_wait = 1
         self.device_token = config.thingsboard.device_token
         self.tb_host = config.thingsboard.host
         self.tb_port = config.thingsboard.port
-        self.client: TBDeviceMqttClient = TBDeviceMqttClient(
-            host=self.tb_host, 
-            username=self.device_token, 
-            port=self.tb_port
-        )
-        self.api_limits_manager = APILimitsManager()
+        self.batch_size = max(1, config.thingsboard.batch_size)
+        self.inflight_window = max(1, config.thingsboard.inflight_window)
+        self.ack_timeout = config.thingsboard.ack_timeout
+        self.ack_poll_interval = 0.05
+        self.inflight = deque()  # Lotes enviados esperando PUBACK: (entradas, TBPublishInfo, instante de envío)
+        self.client: 'TBDeviceMqttClient | None' = None  # Se crea en el primer connect()
+        self.api_limits_manager = APILimitsManager(config.thingsboard.rate_limits, config.thingsboard.rate_limit_state_file)
         self.rpc_callbacks = {}  # Almacenar callbacks RPC
+        self.delta = DeltaCache(config.thingsboard.keyframe_interval, config.thingsboard.delta_telemetry)
+        self.rpc_executor = RpcExecutor(config.thingsboard.rpc_workers, config.thingsboard.rpc_max_pending)
+        self.tracer = EventTracer(config.tracing.enabled, config.tracing.max_traced)
+        self.loop: asyncio.AbstractEventLoop | None = None  # Event loop del runtime asyncio, si se usa
+        self.queue_ready: asyncio.Event | None = None
         logging.getLogger('tb_connection').setLevel(logging.WARNING)
+        self._register_metrics()
+
+    def _register_metrics(self) -> None:
+        self.publish_latency = REGISTRY.histogram('facp_mqtt_publish_ack_seconds',
+                                                  'Time from sending a queued batch to its PUBACK')
+        self.acked_items = REGISTRY.counter('facp_mqtt_acked_items_total', 'Queue items delivered with PUBACK')
+        self.rate_limited = REGISTRY.counter('facp_mqtt_rate_limited_total', 'Sends deferred or dropped by the rate limiter')
+        self.requeued_items = REGISTRY.counter('facp_mqtt_requeued_total',
+                                               'Queue items returned to the queue after a failed or unacknowledged send')
+        self.reconnects = REGISTRY.counter('facp_mqtt_reconnects_total', 'Reconnection attempts to ThingsBoard')
+        REGISTRY.gauge('facp_mqtt_connected', 'ThingsBoard connection state', lambda: int(self.is_connected()))
+        REGISTRY.gauge('facp_mqtt_inflight_batches', 'Batches sent and waiting for PUBACK', lambda: len(self.inflight))
+        REGISTRY.gauge('facp_rpc_pending', 'RPC tasks queued or running', lambda: self.rpc_executor.pending)
+        REGISTRY.gauge('facp_delta_suppressed_keys', 'Telemetry and attribute keys not sent because they did not change',
+                       lambda: self.delta.suppressed_keys)
+
+    def _ensure_client(self) -> 'TBDeviceMqttClient':
+        if self.client is None:
+            from tb_device_mqtt import TBDeviceMqttClient
+            self.client = TBDeviceMqttClient(
+                host=self.tb_host,
+                username=self.device_token,
+                port=self.tb_port
+            )
+            self.client.set_server_side_rpc_request_handler(self._handle_rpc_request)
+        return self.client
+
+    def is_connected(self) -> bool:
+        return self.client is not None and self.client.is_connected()
 
     def connect(self):
+        """Inicia la conexión; la red de paho la completa en su hilo (ver _wait_connected)"""
         try:
-            self.client.connect()
-            self.logger.info("Connected to ThingsBoard successfully")
+            self._ensure_client().connect()
+            self.logger.info("Connecting to ThingsBoard...")
         except Exception as e:
             self.logger.error(f"Failed to connect to ThingsBoard: {e}")
 
+    def _wait_connected(self, timeout: float) -> bool:
+        """
+        Espera hasta timeout segundos el CONNACK consultando is_connected()
+        cada ack_poll_interval. No se usa el callback de connect() del
+        cliente: se registra después de iniciar la red, así que puede perderse
+        si el CONNACK llega antes, y se llama 0.2 s tarde.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.is_connected():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self.shutdown_flag.wait(min(self.ack_poll_interval, remaining)):
+                return False
+        self._on_connected()
+        return True
+
+    async def _wait_connected_async(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while not self.is_connected():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(self.ack_poll_interval, remaining))
+        self._on_connected()
+        return True
+
+    def _on_connected(self) -> None:
+        self.logger.info("Connected to ThingsBoard successfully")
+        STARTUP.mark(MQTT_CONNECTED)
+
     def subscribe_to_rpc(self, method_name: str, callback: Callable):
         """
         Suscribe a comandos RPC desde ThingsBoard
@@ -77,15 +222,9 @@ class MqttHandler:
             method_name: Nombre del método RPC (ej: 'silenciar_panel')
             callback: Función que se ejecutará cuando llegue el comando
         """
-        try:
-            self.rpc_callbacks[method_name] = callback
-            # Configurar el callback genérico RPC si no existe
-            if not hasattr(self, '_rpc_configured'):
-                self.client.set_server_side_rpc_request_handler(self._handle_rpc_request)
-                self._rpc_configured = True
-            self.logger.info(f"Subscribed to RPC method: {method_name}")
-        except Exception as e:
-            self.logger.error(f"Error subscribing to RPC: {e}")
+        # El cliente atiende todos los RPC con _handle_rpc_request desde que se crea
+        self.rpc_callbacks[method_name] = callback
+        self.logger.info(f"Subscribed to RPC method: {method_name}")
 
     def _handle_rpc_request(self, request_id, request_body):
         """
@@ -99,32 +238,15 @@ class MqttHandler:
             params = request_body.get('params', {})
             
             if method in self.rpc_callbacks:
-                # Ejecutar el callback correspondiente en un thread separado
-                def execute_callback():
-                    try:
-                        result = self.rpc_callbacks[method](params)
-                        
-                        # Enviar respuesta a ThingsBoard
-                        response = {
-                            "success": True,
-                            "result": result if result else "Comando ejecutado correctamente"
-                        }
-                        self.client.send_rpc_reply(request_id, response)
-                        self.logger.info(f"RPC response sent: {response}")
-                        
-                    except Exception as e:
-                        self.logger.error(f"Error executing RPC callback: {e}")
-                        error_response = {
-                            "success": False,
-                            "error": str(e)
-                        }
-                        try:
-                            self.client.send_rpc_reply(request_id, error_response)
-                        except Exception as send_error:
-                            self.logger.error(f"Failed to send error response: {send_error}")
-                
-                # Ejecutar en thread separado para no bloquear
-                threading.Thread(target=execute_callback, daemon=True).start()
+                if self.loop is not None:
+                    # Runtime asyncio: el callback corre en el event loop
+                    asyncio.run_coroutine_threadsafe(self._execute_rpc_async(request_id, method, params), self.loop)
+                elif self.rpc_executor.submit(method, self._execute_rpc, request_id, method, params) is None:
+                    # Pool lleno: responder de inmediato en lugar de encolar sin límite
+                    self.client.send_rpc_reply(request_id, {
+                        "success": False,
+                        "error": "Dispositivo ocupado, intente de nuevo"
+                    })
                 
             else:
                 self.logger.warning(f"Unknown RPC method: {method}")
@@ -146,90 +268,363 @@ class MqttHandler:
             except Exception as send_error:
                 self.logger.error(f"Failed to send error response: {send_error}")
 
-    def publish_telemetry(self, telemetry: Dict[str, Any], bypass_queue: bool = False):
-        if not self.client.is_connected():
-            if bypass_queue:
-                self.logger.warning("Not connected to ThingsBoard. Dropping telemetry.")
-                return
-            else:
-                self.logger.warning("Not connected to ThingsBoard. Queueing telemetry.")
-                self.queue.put((PublishType.TELEMETRY, telemetry))
-                return
+    def _rpc_response(self, method: str, params: Any) -> Dict[str, Any]:
+        """Ejecuta el callback RPC registrado y arma la respuesta para ThingsBoard"""
+        try:
+            return self._rpc_success(self.rpc_callbacks[method](params))
+        except Exception as e:
+            return self._rpc_error(e)
 
-        if not self.api_limits_manager.can_send():
-            if bypass_queue:
-                self.logger.warning("API rate limit reached. Dropping telemetry.")
-                return
-            else:
-                self.logger.warning("API rate limit reached. Queueing telemetry.")
-                self.queue.put((PublishType.TELEMETRY, telemetry))
-                return
+    async def _rpc_response_async(self, method: str, params: Any) -> Dict[str, Any]:
+        """Como _rpc_response; si el callback devuelve un awaitable se espera en el loop"""
+        try:
+            result = self.rpc_callbacks[method](params)
+            if inspect.isawaitable(result):
+                result = await result
+            return self._rpc_success(result)
+        except Exception as e:
+            return self._rpc_error(e)
+
+    @staticmethod
+    def _rpc_success(result: Any) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "result": result if result else "Comando ejecutado correctamente"
+        }
+
+    def _rpc_error(self, error: Exception) -> Dict[str, Any]:
+        self.logger.error(f"Error executing RPC callback: {error}")
+        return {
+            "success": False,
+            "error": str(error)
+        }
 
+    def _send_rpc_reply(self, request_id, response: Dict[str, Any]) -> None:
         try:
-            self.client.send_telemetry(telemetry)
-            self.logger.debug(f"Telemetry sent successfully: {telemetry}")
+            self.client.send_rpc_reply(request_id, response)
+            self.logger.info(f"RPC response sent: {response}")
         except Exception as e:
-            self.logger.error(f"Failed to publish telemetry: {e}")
-            if not bypass_queue:
-                self.queue.put((PublishType.TELEMETRY, telemetry))
+            self.logger.error(f"Failed to send RPC response: {e}")
 
-    def publish_attributes(self, attributes: Dict[str, Any]):
-        if not self.client.is_connected():
-            self.logger.warning("Not connected to ThingsBoard. Queueing attributes.")
-            self.queue.put((PublishType.ATTRIBUTE, attributes))
+    def _execute_rpc(self, request_id, method: str, params: Any) -> None:
+        self._send_rpc_reply(request_id, self._rpc_response(method, params))
+
+    async def _execute_rpc_async(self, request_id, method: str, params: Any) -> None:
+        started_at = time.perf_counter()
+        response = await self._rpc_response_async(method, params)
+        self.rpc_executor.record(method, 0.0, time.perf_counter() - started_at)
+        await asyncio.get_running_loop().run_in_executor(None, self._send_rpc_reply, request_id, response)
+
+    def publish_telemetry(self, telemetry: Dict[str, Any], bypass_queue: bool = False, ts: float | None = None,
+                          keyframe: bool = False):
+        """
+        Publica telemetría. Por defecto pasa por la cola (y su log), que la
+        envía en cuanto el límite lo permite y la retira solo con el PUBACK.
+        ``ts`` es la hora de captura (time.time); por defecto, la actual.
+        Con bypass_queue se envía directo y se descarta si no se puede enviar.
+
+        Solo se envían las claves que cambiaron desde el último valor
+        publicado (DeltaCache); con keyframe=True se envían todas.
+        """
+        values = self.delta.filter('telemetry', telemetry, keyframe)
+        if not values:
+            return
+
+        if not bypass_queue:
+            self.queue.put((PublishType.TELEMETRY, timestamped_telemetry(values, ts)))
+            self.delta.commit('telemetry', values)
+            return
+
+        if not self.is_connected():
+            self.logger.warning("Not connected to ThingsBoard. Dropping telemetry.")
             return
 
         if not self.api_limits_manager.can_send():
-            self.logger.warning("API rate limit reached. Queueing attributes.")
-            self.queue.put((PublishType.ATTRIBUTE, attributes))
+            self.rate_limited.inc()
+            self.logger.warning("API rate limit reached. Dropping telemetry.")
             return
 
         try:
-            self.client.send_attributes(attributes)
-            self.logger.debug(f"Attributes sent successfully: {attributes}")
+            self.client.send_telemetry(values)
+            self.delta.commit('telemetry', values)
+            self.logger.debug("Telemetry sent: %s", values)
         except Exception as e:
-            self.logger.error(f"Failed to publish attributes: {e}")
-            self.queue.put((PublishType.ATTRIBUTE, attributes))
+            self.logger.error(f"Failed to publish telemetry: {e}")
+
+    def publish_attributes(self, attributes: Dict[str, Any]):
+        """Publica atributos a través de la cola; se retiran de ella solo con el PUBACK"""
+        values = self.delta.filter('attributes', attributes)
+        if not values:
+            return
+        self.queue.put((PublishType.ATTRIBUTE, values))
+        self.delta.commit('attributes', values)
+
+    def report_latency(self, shutdown_flag: threading.Event):
+        interval = self.config.tracing.report_interval
+        while not shutdown_flag.wait(interval):
+            self.publish_latency_report()
+
+    async def report_latency_async(self):
+        interval = self.config.tracing.report_interval
+        while True:
+            await asyncio.sleep(interval)
+            self.publish_latency_report()
+
+    def publish_latency_report(self):
+        """Encola los percentiles de latencia por etapa de los eventos entregados desde el último reporte"""
+        telemetry = self.tracer.report()
+        if telemetry:
+            self.publish_telemetry(telemetry)
+
+    def delta_stats(self) -> Dict[str, int]:
+        """Claves y mensajes enviados y suprimidos por la capa delta"""
+        return self.delta.stats()
 
     def subscribe_to_attribute(self, attribute_name: str, callback: Callable):
-        self.client.subscribe_to_attribute(attribute_name, callback)
+        self._ensure_client().subscribe_to_attribute(attribute_name, callback)
         self.logger.info(f"Subscribed to attribute: {attribute_name}")
 
     def request_attributes(self, client_attribute_names: list, shared_attribute_names: list, callback: Callable):
-        self.client.request_attributes(client_attribute_names, shared_attribute_names, callback=callback)
+        self._ensure_client().request_attributes(client_attribute_names, shared_attribute_names, callback=callback)
+
+    def _send_batch(self, batch: List[QueueEntry]) -> 'TBPublishInfo | None':
+        """
+        Envía en un solo mensaje un lote de entradas de la cola del mismo tipo.
+        La telemetría se envía como arreglo [{"ts": ..., "values": {...}}, ...]
+        y los atributos se combinan en un solo diccionario (gana el más reciente).
+
+        Returns:
+            TBPublishInfo | None: Resultado de la publicación, o None si falló
+        """
+        message_type = batch[0][1][0]
+        try:
+            if message_type == PublishType.TELEMETRY:
+                records = [timestamped_telemetry(message) for _, (_, message) in batch]
+                self.logger.debug("Sending telemetry batch of %d records", len(records))
+                return self.client.send_telemetry(records)
+            attributes: Dict[str, Any] = {}
+            for _, (_, message) in batch:
+                attributes.update(message)
+            self.logger.debug("Sending attributes: %s", attributes)
+            return self.client.send_attributes(attributes)
+        except Exception as e:
+            self.logger.error(f"Failed to publish queued batch: {e}")
+            return None
+
+    @staticmethod
+    def _publish_state(info: 'TBPublishInfo') -> str:
+        """Estado de una publicación QoS1: 'acked' (PUBACK de todas sus partes), 'pending' o 'failed'"""
+        messages = info.message_info if isinstance(info.message_info, list) else [info.message_info]
+        if not messages or info.rc() != TB_ERR_SUCCESS:
+            return PUBLISH_FAILED
+        if all(message.is_published() for message in messages):
+            return PUBLISH_ACKED
+        return PUBLISH_PENDING
+
+    def _collect_acks(self) -> None:
+        """
+        Confirma en la cola los lotes con PUBACK y devuelve a la cabeza los que
+        fallaron o superaron ack_timeout, en su orden original.
+        """
+        now = time.monotonic()
+        pending = deque()
+        failed = []
+        for batch, info, sent_at in self.inflight:
+            state = self._publish_state(info)
+            if state == PUBLISH_ACKED:
+                self.queue.ack(batch)
+                self.acked_items.inc(len(batch))
+                self.publish_latency.observe(now - sent_at)
+                self.tracer.finish(batch)
+                STARTUP.mark(FIRST_PUBLISH)
+            elif state == PUBLISH_FAILED or now - sent_at > self.ack_timeout:
+                failed.append(batch)
+            else:
+                pending.append((batch, info, sent_at))
+        self.inflight = pending
+        if failed:
+            self._requeue(failed, "not acknowledged")
+
+    def _requeue(self, batches: List[List[QueueEntry]], reason: str) -> None:
+        count = sum(len(batch) for batch in batches)
+        self.logger.warning(f"{count} queued items {reason}. Re-queueing.")
+        self.requeued_items.inc(count)
+        for batch in reversed(batches):
+            self.queue.requeue_front(batch)
+
+    def _wait_for_oldest_ack(self) -> None:
+        """Bloquea hasta el PUBACK del lote más antiguo en vuelo o hasta su timeout"""
+        batch, info, sent_at = self.inflight[0]
+        remaining = sent_at + self.ack_timeout - time.monotonic()
+        messages = info.message_info if isinstance(info.message_info, list) else [info.message_info]
+        if remaining > 0 and info.rc() == TB_ERR_SUCCESS:
+            for message in messages:
+                try:
+                    message.wait_for_publish(timeout=min(remaining, self.idle_wait))
+                except (RuntimeError, ValueError):
+                    break
+
+    def _accept_batch(self, batch: List[QueueEntry]) -> bool:
+        """
+        Valida un lote recién sacado de la cola y toma su turno del límite.
+        Si no se puede enviar lo confirma (tipo no soportado) o lo devuelve a
+        la cabeza de la cola (límite alcanzado).
+        """
+        if batch[0][1][0] not in (PublishType.TELEMETRY, PublishType.ATTRIBUTE):
+            self.logger.error(f'PublishType {batch[0][1][0]} is not supported')
+            self.queue.ack(batch)
+            return False
+        if not self.api_limits_manager.can_send():
+            self.rate_limited.inc()
+            self.queue.requeue_front(batch)
+            return False
+        return True
+
+    def _requeue_inflight(self) -> None:
+        if self.inflight:
+            self._requeue([batch for batch, _, _ in self.inflight], "in flight when the connection was lost")
+            self.inflight = deque()
 
     def process_queue(self):
+        # Primera conexión desde este hilo: un broker inalcanzable no demora el arranque
+        if not self.is_connected():
+            self.connect()
+            self._wait_connected(self.reconnect_interval)
         while not self.shutdown_flag.is_set():
-            if self.client.is_connected():
+            if self.is_connected():
+                self._collect_acks()
+                # Ventana llena: esperar el PUBACK del lote más antiguo
+                if len(self.inflight) >= self.inflight_window:
+                    self._wait_for_oldest_ack()
+                    continue
+                # Esperar exactamente hasta que el límite permita el próximo envío;
+                # mientras tanto el mensaje sigue en la cabeza de la cola
+                wait = self.api_limits_manager.time_until_allowed()
+                if wait > 0:
+                    self.rate_limited.inc()
+                    self.logger.debug("API rate limit reached. Next send in %.3fs", wait)
+                    self.shutdown_flag.wait(wait)
+                    continue
                 try:
-                    message_type, message = self.queue.get(block=False)
-                    if self.api_limits_manager.can_send():
-                        if message_type == PublishType.TELEMETRY:
-                            self.publish_telemetry(message)
-                        elif message_type == PublishType.ATTRIBUTE:
-                            self.publish_attributes(message)
-                        else:
-                            self.logger.error(f'PublishType {message_type} is not supported')
-                    else:
-                        self.logger.warning("API rate limit reached. Re-queueing message.")
-                        self.queue.put((message_type, message))
-                    time.sleep(0.1) 
+                    batch = self.queue.get_batch(self.batch_size,
+                                                 timeout=self.ack_poll_interval if self.inflight else self.idle_wait)
                 except queue.Empty:
-                    time.sleep(1)
+                    continue
+                self.tracer.mark(batch, STAGE_DEQUEUED)
+                if not self._accept_batch(batch):
+                    continue
+                info = self._send_batch(batch)
+                if info is None:
+                    self.requeued_items.inc(len(batch))
+                    self.queue.requeue_front(batch)
+                    self.shutdown_flag.wait(self.retry_interval)
+                else:
+                    self.tracer.mark(batch, STAGE_SENT)
+                    self.inflight.append((batch, info, time.monotonic()))
             else:
+                self._requeue_inflight()
+                # Tras reconectar se envía todo completo
+                self.delta.reset("reconnect")
                 self.logger.warning("Not connected to ThingsBoard. Attempting to reconnect...")
+                self.reconnects.inc()
                 self.connect()
-                time.sleep(self.reconnect_interval)
+                # Seguir en cuanto llegue el CONNACK; como máximo reconnect_interval
+                self._wait_connected(self.reconnect_interval)
+
+    async def _wait_queue_ready(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self.queue_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def process_queue_async(self):
+        """
+        Versión de process_queue para el runtime asyncio. Las esperas son
+        coroutines: la cola vacía despierta al consumidor con queue_ready, el
+        límite con asyncio.sleep, y connect y send van al executor del loop.
+        Sin mensajes en vuelo solo despierta cada reconnect_interval para
+        revisar la conexión.
+        """
+        loop = asyncio.get_running_loop()
+        if not self.is_connected():
+            await loop.run_in_executor(None, self.connect)
+            await self._wait_connected_async(self.reconnect_interval)
+        while True:
+            if self.is_connected():
+                self._collect_acks()
+                # Ventana llena: revisar los PUBACK cada ack_poll_interval
+                if len(self.inflight) >= self.inflight_window:
+                    await asyncio.sleep(self.ack_poll_interval)
+                    continue
+                wait = self.api_limits_manager.time_until_allowed()
+                if wait > 0:
+                    self.rate_limited.inc()
+                    self.logger.debug("API rate limit reached. Next send in %.3fs", wait)
+                    await asyncio.sleep(wait)
+                    continue
+                self.queue_ready.clear()
+                try:
+                    batch = self.queue.get_batch(self.batch_size, timeout=0)
+                except queue.Empty:
+                    await self._wait_queue_ready(self.ack_poll_interval if self.inflight else self.reconnect_interval)
+                    continue
+                self.tracer.mark(batch, STAGE_DEQUEUED)
+                if not self._accept_batch(batch):
+                    continue
+                info = await loop.run_in_executor(None, self._send_batch, batch)
+                if info is None:
+                    self.requeued_items.inc(len(batch))
+                    self.queue.requeue_front(batch)
+                    await asyncio.sleep(self.retry_interval)
+                else:
+                    self.tracer.mark(batch, STAGE_SENT)
+                    self.inflight.append((batch, info, time.monotonic()))
+            else:
+                self._requeue_inflight()
+                # Tras reconectar se envía todo completo
+                self.delta.reset("reconnect")
+                self.logger.warning("Not connected to ThingsBoard. Attempting to reconnect...")
+                self.reconnects.inc()
+                await loop.run_in_executor(None, self.connect)
+                await self._wait_connected_async(self.reconnect_interval)
 
     def start(self):
-        self.connect()
+        """
+        Inicia el hilo de vaciado, que conecta y empieza a enviar en cuanto
+        llega el CONNACK; no bloquea al llamador.
+        """
         self.shutdown_flag = threading.Event()
-        time.sleep(2)
         threading.Thread(target=self.process_queue, daemon=True).start()
         self.logger.info("MQTT Handler started")
 
+    async def start_async(self):
+        """
+        Arranque para el runtime asyncio: deja la conexión y el vaciado de la
+        cola a process_queue_async en lugar de un hilo. Los RPC se ejecutan
+        en el loop y cada put en la cola despierta al consumidor.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.queue_ready = asyncio.Event()
+        self.queue.on_put = self._notify_queue_ready
+        self.shutdown_flag = threading.Event()
+        self.logger.info("MQTT Handler started")
+
+    def _notify_queue_ready(self) -> None:
+        # Desde el propio loop basta con set(); desde otro hilo hay que despertarlo
+        if threading.get_ident() == self.loop_thread_id:
+            self.queue_ready.set()
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.queue_ready.set)
+        except RuntimeError:
+            pass  # Loop cerrado durante el apagado
+
     def stop(self):
+        self.queue.on_put = None
         self.shutdown_flag.set()
+        self.rpc_executor.shutdown()
+        self.api_limits_manager.save_state()
         if self.client:
             self.client.disconnect()
         self.logger.info("MQTT Handler stopped")
@@ -0,0 +1,105 @@
+import re
+from typing import Dict, Any, List, Tuple
+from config.schema import PanelProfileSchema
+
+
+class PanelProfile:
+    """
+    Perfil de un modelo de panel compilado a partir de Codigos_FACP.yml.
+
+    Todas las expresiones regulares del perfil se compilan una sola vez al
+    crearlo; el parseo de cada evento solo usa los patrones ya compilados.
+    """
+
+    def __init__(self, code: int, schema: PanelProfileSchema):
+        self.code = code
+        self.name = schema.name
+        self.schema = schema
+
+        self.serial_config: Dict[str, Any] = schema.serial.model_dump()
+        self.terminators: bytes = schema.framing.terminators.encode('latin-1')
+
+        framing = schema.framing
+        self.framing_mode = framing.mode
+        self.report_delimiter = framing.report_delimiter
+        self.max_report_delimiter_count = framing.max_report_delimiter_count
+        self.message_timeout = framing.message_timeout
+        self.complete_pattern = re.compile(framing.complete_pattern) if framing.complete_pattern else None
+        self.frame_header_pattern = re.compile(framing.header_pattern) if framing.header_pattern else None
+
+        parser = schema.parser
+        self.header_pattern = re.compile(parser.header_pattern) if parser.header_pattern else None
+        self.patterns = [re.compile(pattern) for pattern in parser.patterns]
+        self.meta_date_tokens = parser.meta_date_tokens
+        self.description_split = re.compile(parser.description_split) if parser.description_split else None
+        self.description_join = parser.description_join
+
+        self._validate()
+
+    def _validate(self) -> None:
+        for pattern in self.patterns:
+            if 'event' not in pattern.groupindex:
+                raise ValueError(f"Panel profile {self.name}: pattern '{pattern.pattern}' has no 'event' group")
+        if self.framing_mode == 'block' and self.complete_pattern is None:
+            raise ValueError(f"Panel profile {self.name}: framing mode 'block' requires complete_pattern")
+        if self.framing_mode == 'header' and self.frame_header_pattern is None:
+            raise ValueError(f"Panel profile {self.name}: framing mode 'header' requires header_pattern")
+
+    def extract_fields(self, event: str) -> Tuple[str, str, str]:
+        """
+        Extrae (ID del evento, descripción, fecha del panel) de un evento crudo.
+
+        Raises:
+            ValueError: Si el evento no tiene el formato del perfil
+        """
+        lines = list(filter(None, event.strip().split('\n')))
+        if not lines:
+            raise ValueError("Invalid event received")
+
+        FACP_date = ""
+        if self.header_pattern is not None:
+            header_match = self.header_pattern.match(lines[0])
+            if header_match is None or len(lines) < 2:
+                raise ValueError("Invalid event header")
+            FACP_date = self._date_from_groups(header_match.groupdict())
+            lines = lines[1:]
+
+        line = lines[0].strip()
+        for pattern in self.patterns:
+            match = pattern.search(line)
+            if match is not None:
+                break
+        else:
+            raise ValueError("Invalid event format")
+
+        groups = match.groupdict()
+        ID_Event = groups['event'].strip()
+        description_parts: List[str] = []
+
+        if groups.get('meta') is not None:
+            meta = groups['meta'].split()
+            if len(meta) < self.meta_date_tokens:
+                raise ValueError("Invalid date/time format")
+            FACP_date = " ".join(meta[:self.meta_date_tokens])
+            description_parts = meta[self.meta_date_tokens:]
+        elif groups.get('date') is not None or groups.get('time') is not None:
+            FACP_date = self._date_from_groups(groups)
+
+        if groups.get('description') is not None:
+            description_text = groups['description'].strip()
+            if self.description_split is not None:
+                description_parts.extend(part for part in self.description_split.split(description_text) if part)
+            elif description_text:
+                description_parts.append(description_text)
+
+        description = self.description_join.join(description_parts).strip()
+
+        # Agregar líneas adicionales si existen
+        if len(lines) > 1:
+            description += "\n" + "\n".join(lines[1:])
+
+        return ID_Event, description, FACP_date
+
+    @staticmethod
+    def _date_from_groups(groups: Dict[str, str | None]) -> str:
+        return " ".join(groups[key].strip() for key in ('date', 'time') if groups.get(key))
@@ -1,19 +1,40 @@
-import RPi.GPIO as GPIO
 import threading
-from typing import Dict
+import asyncio
+import time
+from typing import Any, Dict, Callable
 from classes.enums import PublishType
 import logging
 from config.schema import ConfigSchema
 from classes.mqtt_sender import MqttHandler
 
+RELAY_MODE_EDGE = 'edge'
+
 class RelayMonitor:
-    def __init__(self, config: ConfigSchema, mqtt_handler: MqttHandler):
+    """
+    Monitoreo de los relays de alarma y problema del panel.
+
+    En modo 'polling' lee los pines cada publish_interval y publica ambos
+    estados. En modo 'edge' el callback de detección de flancos del backend GPIO
+    despierta al monitor; tras debounce_ms sin nuevos flancos lee los pines y
+    publica por la cola solo los relays que cambiaron, con la hora del primer
+    flanco. Cada keepalive_interval publica el estado completo. Si la
+    detección de flancos no está disponible vuelve al modo 'polling'.
+    """
+    def __init__(self, config: ConfigSchema, mqtt_handler: MqttHandler, gpio: Any):
         self.config = config
         self.mqtt_handler = mqtt_handler
+        self.gpio = gpio  # Backend GPIO: RPi.GPIO o SimulatedGpio
         self.relay_pins = self._get_relay_pins()
         self.active_states = self._get_active_states()
         self.publish_interval = config.relay_monitor.publish_interval
+        self.mode = config.relay_monitor.mode
+        self.debounce = config.relay_monitor.debounce_ms / 1000
+        self.keepalive_interval = config.relay_monitor.keepalive_interval
         self.logger = logging.getLogger(__name__)
+        self.last_states: Dict[str, bool] | None = None
+        self.edge_time: float | None = None  # Hora (time.time) del primer flanco sin procesar
+        self.edge_event = threading.Event()
+        self.notify_edge: Callable[[], None] = self.edge_event.set
         self._setup_gpio()
 
     def _get_relay_pins(self) -> Dict[str, int]:
@@ -24,35 +45,134 @@ class RelayMonitor:
 
     def _get_active_states(self) -> Dict[str, int]:
         return {
-            'ALARM': GPIO.HIGH if self.config.relay_monitor.alarm_active_high else GPIO.LOW,
-            'TROUBLE': GPIO.HIGH if self.config.relay_monitor.trouble_active_high else GPIO.LOW
+            'ALARM': self.gpio.HIGH if self.config.relay_monitor.alarm_active_high else self.gpio.LOW,
+            'TROUBLE': self.gpio.HIGH if self.config.relay_monitor.trouble_active_high else self.gpio.LOW
         }
 
     def _setup_gpio(self):
-        GPIO.setmode(GPIO.BCM)
+        self.gpio.setmode(self.gpio.BCM)
         for pin in self.relay_pins.values():
-            GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            self.gpio.setup(pin, self.gpio.IN, pull_up_down=self.gpio.PUD_UP)
+
+    def _setup_edge_detection(self) -> bool:
+        if self.mode != RELAY_MODE_EDGE:
+            return False
+        try:
+            for pin in self.relay_pins.values():
+                # Un reinicio del monitor no debe chocar con la detección anterior
+                self.gpio.remove_event_detect(pin)
+                self.gpio.add_event_detect(pin, self.gpio.BOTH, callback=self._on_edge)
+            self.logger.info(f"Relay edge detection enabled (debounce {self.debounce * 1000:.0f} ms)")
+            return True
+        except RuntimeError as e:
+            self.logger.warning(f"Relay edge detection unavailable, falling back to polling: {e}")
+            return False
+
+    def _on_edge(self, channel: int) -> None:
+        # Corre en el hilo de eventos del backend GPIO: solo anota la hora y despierta al monitor
+        if self.edge_time is None:
+            self.edge_time = time.time()
+        self.notify_edge()
 
     def monitor_relays(self, shutdown_flag: threading.Event):
+        if not self._setup_edge_detection():
+            self._poll_relays(shutdown_flag)
+            return
+
+        self._publish_initial_states()
+        next_keepalive = time.monotonic() + self.keepalive_interval
+        while not shutdown_flag.is_set():
+            if self.edge_event.wait(max(0.0, next_keepalive - time.monotonic())):
+                # Antirrebote: leer solo tras debounce sin flancos nuevos
+                while self.edge_event.is_set():
+                    self.edge_event.clear()
+                    if shutdown_flag.wait(self.debounce):
+                        return
+                self._publish_changes()
+            if time.monotonic() >= next_keepalive:
+                self._publish_keepalive()
+                next_keepalive = time.monotonic() + self.keepalive_interval
+
+    def _poll_relays(self, shutdown_flag: threading.Event):
         while not shutdown_flag.is_set():
             telemetry = self._get_relay_states()
             self._publish_telemetry(telemetry)
-            
+
             if shutdown_flag.wait(self.publish_interval):
                 break
 
+    async def monitor_relays_async(self):
+        loop = asyncio.get_running_loop()
+        if not self._setup_edge_detection():
+            while True:
+                self._publish_telemetry(self._get_relay_states())
+                await asyncio.sleep(self.publish_interval)
+
+        edge_event = asyncio.Event()
+        self.notify_edge = lambda: loop.call_soon_threadsafe(edge_event.set)
+        try:
+            self._publish_initial_states()
+            next_keepalive = loop.time() + self.keepalive_interval
+            while True:
+                try:
+                    await asyncio.wait_for(edge_event.wait(), max(0.0, next_keepalive - loop.time()))
+                    while edge_event.is_set():
+                        edge_event.clear()
+                        await asyncio.sleep(self.debounce)
+                    self._publish_changes()
+                except asyncio.TimeoutError:
+                    pass
+                if loop.time() >= next_keepalive:
+                    self._publish_keepalive()
+                    next_keepalive = loop.time() + self.keepalive_interval
+        finally:
+            self.notify_edge = self.edge_event.set
+
     def _get_relay_states(self) -> Dict[str, bool]:
         states = {}
         for status, pin in self.relay_pins.items():
-            gpio_state = GPIO.input(pin)
+            gpio_state = self.gpio.input(pin)
             active_state = self.active_states[status]
             is_active = gpio_state == active_state
             states[f"{status.lower()}_relay"] = is_active
         return states
 
-    def _publish_telemetry(self, telemetry: Dict[str, bool]):
+    def _publish_changes(self) -> None:
+        """Publica por la cola los relays que cambiaron desde la última lectura"""
+        edge_time, self.edge_time = self.edge_time, None
+        states = self._get_relay_states()
+        if self.last_states is None:
+            changes = states
+        else:
+            changes = {key: value for key, value in states.items() if self.last_states.get(key) != value}
+        self.last_states = states
+        if not changes:
+            return
+        self.logger.info(f"Relay state changed: {changes}")
+        try:
+            self.mqtt_handler.publish_telemetry(changes, ts=edge_time)
+        except Exception as e:
+            self.logger.error(f'Failed to publish relay change: {e}')
+
+    def _publish_initial_states(self) -> None:
+        """Estado completo al arrancar, por la cola: se entrega aunque ThingsBoard aún no esté conectado"""
+        self.last_states = self._get_relay_states()
+        try:
+            self.mqtt_handler.publish_telemetry(self.last_states, keyframe=True)
+        except Exception as e:
+            self.logger.error(f'Failed to publish relay states: {e}')
+
+    def _publish_keepalive(self) -> None:
+        """Estado completo sin pasar por la cola; un cambio no visto por flancos se publica como cambio"""
+        if self.last_states is not None and self._get_relay_states() != self.last_states:
+            self._publish_changes()
+        elif self.last_states is None:
+            self.last_states = self._get_relay_states()
+        self._publish_telemetry(self.last_states, keyframe=True)
+
+    def _publish_telemetry(self, telemetry: Dict[str, bool], keyframe: bool = False):
         try:
-            self.mqtt_handler.publish_telemetry(telemetry, bypass_queue=True)
+            self.mqtt_handler.publish_telemetry(telemetry, bypass_queue=True, keyframe=keyframe)
             #.logger.debug(f'Relay states published: {telemetry}')
         except Exception as e:
             self.logger.error(f'Failed to publish relay states: {e}')
@@ -65,4 +185,4 @@ class RelayMonitor:
             self.logger.error(f"Error during GPIO cleanup in RelayMonitor: {e}")
 
     def _cleanup_gpio(self):
-        GPIO.cleanup(list(self.relay_pins.values()))
\ No newline at end of file
+        self.gpio.cleanup(list(self.relay_pins.values()))
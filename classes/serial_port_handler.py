@@ -1,23 +1,45 @@
 import serial
-from app_utils.queue_operations import SafeQueue
-from typing import Tuple, Dict, Any
+from app_utils.queue_operations import SafeQueue, timestamped_telemetry
+from typing import Dict, Any, List
 from classes.enums import PublishType
 import time
 import logging
 import threading
 from config.schema import ConfigSchema
-import re
+from classes.line_framer import LineFramer
+from classes.panel_profile import PanelProfile
+from classes.event_framer import create_event_framer, EventFramer, Frame, FRAME_REPORT
+from classes.severity_classifier import SeverityClassifier
+from app_utils.capture_ring import CaptureRing
+from app_utils.metrics import REGISTRY
+from app_utils.event_trace import EventTracer
+from app_utils.startup import STARTUP, SERIAL_LISTENING
+from datetime import datetime
+import os
+import select
+import asyncio
 
 class SerialPortHandler:
-    def __init__(self, config: ConfigSchema, eventSeverityLevels: Dict[str, int], queue: SafeQueue):
+    """
+    Lector serial genérico para todos los modelos de panel. El framing y el
+    parseo de cada modelo se describen en su perfil (Codigos_FACP.yml).
+    """
+    def __init__(self, config: ConfigSchema, eventSeverityLevels: Dict[str, int], queue: SafeQueue, profile: PanelProfile,
+                 tracer: EventTracer | None = None):
         self.config = config
         self.queue = queue
+        self.tracer = tracer  # Trazas de latencia de los eventos (MqttHandler.tracer)
         self.eventSeverityLevels = eventSeverityLevels
+        self.profile = profile
         self.ser: serial.Serial | None = None
         self.logger = logging.getLogger(__name__)
-        self.report_delimiter = ""
-        self.max_report_delimiter_count = -1
         self.default_event_severity_not_recognized = 0
+        self.severity_classifier = SeverityClassifier(
+            eventSeverityLevels,
+            self.default_event_severity_not_recognized,
+            config.events.max_unknown_events
+        )
+        self.unknown_report_interval = config.events.unknown_report_interval
         self.parity_dic = {'none': serial.PARITY_NONE, 
             'even': serial.PARITY_EVEN,
             'odd': serial.PARITY_ODD
@@ -25,11 +47,37 @@ class SerialPortHandler:
         self.attempt = 0
         self.max_reconnect_delay = 60
         self.base_delay = 1
-        self.serial_config = {}
-        
-        # Pattern para detectar líneas con timestamp (fin de mensaje)
-        # Formato: HH:MMA DDMMYY XXX (ejemplo: 08:57A 102925 Mie)
-        self.timestamp_pattern = re.compile(r'\d{1,2}:\d{2}[AP]\s+\d{6}\s+\w+\s*$')
+        self.serial_config = profile.serial_config
+        self.read_mode = config.serial.read_mode
+        self.read_timeout = config.serial.read_timeout
+        self.poll_interval = 0.1
+        # Pipe interno para despertar al lector bloqueado en select() durante el apagado
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+        self._stop_requested = threading.Event()
+        # Terminadores de línea del panel y ensamblador de líneas sobre los bytes leídos
+        self.frame_terminators = profile.terminators
+        self.framer: LineFramer | None = None
+        # Copia opcional de los bytes crudos recibidos para reproducirlos después
+        self.capture = self._open_capture()
+        self.bytes_read = REGISTRY.counter('facp_serial_bytes_total', 'Bytes read from the serial port')
+        self.lines_read = REGISTRY.counter('facp_serial_lines_total', 'Lines read from the serial port')
+        self.events_parsed = REGISTRY.counter('facp_events_parsed_total', 'Events parsed and queued')
+        self.parse_failures = REGISTRY.counter('facp_events_parse_failed_total', 'Event buffers that failed to parse')
+        # Hora (monotonic) de la lectura con el primer byte aún no publicado y de la última lectura
+        self.first_byte_at: float | None = None
+        self.last_read_at = 0.0
+
+    def _open_capture(self) -> CaptureRing | None:
+        capture_file = self.config.serial.capture_file
+        if not capture_file:
+            return None
+        try:
+            return CaptureRing(capture_file, self.config.serial.capture_size)
+        except Exception as e:
+            self.logger.error(f"Serial capture unavailable ({capture_file}): {e}")
+            return None
 
     def init_serial_port(self) -> None:
         self.ser = serial.Serial(
@@ -54,11 +102,102 @@ class SerialPortHandler:
         except serial.SerialException as e:
             raise serial.SerialException(f"An error occurred while opening the specified port: {e}")
         
+    def _serial_fileno(self) -> int | None:
+        try:
+            return self.ser.fileno()
+        except (AttributeError, NotImplementedError, ValueError, OSError):
+            return None
+
+    def wait_for_data(self, shutdown_flag: threading.Event, timeout: float | None = None) -> bool:
+        """
+        Espera hasta que haya bytes disponibles en el puerto serial.
+
+        En modo 'event' bloquea en select() sobre el descriptor del puerto y
+        solo despierta cuando llegan datos, cuando se solicita el apagado
+        (request_stop) o al cumplirse ``timeout``; sin ``timeout`` (ningún
+        fragmento pendiente con plazo) no despierta por tiempo. En modo
+        'polling' conserva el comportamiento anterior: revisar in_waiting y
+        dormir 0.1 s.
+
+        Returns:
+            True si hay datos listos para leer
+        """
+        if self.ser.in_waiting > 0:
+            return True
+        if shutdown_flag.is_set() or self._stop_requested.is_set():
+            return False
+
+        fd = self._serial_fileno() if self.read_mode == 'event' else None
+        if fd is None:
+            time.sleep(min(self.poll_interval, self.read_timeout if timeout is None else timeout))
+            return self.ser.in_waiting > 0
+
+        ready, _, _ = select.select([fd, self._wakeup_r], [], [], timeout)
+        if self._wakeup_r in ready:
+            try:
+                os.read(self._wakeup_r, 64)
+            except BlockingIOError:
+                pass
+        return fd in ready
+
+    def read_available_lines(self, shutdown_flag: threading.Event, timeout: float | None = None) -> List[str] | None:
+        """
+        Espera datos y lee todo lo disponible en una sola llamada a read().
+
+        Returns:
+            Las líneas completas recibidas (puede ser una lista vacía si solo
+            llegó un fragmento), o None si no llegaron datos antes de ``timeout``.
+            Un fragmento sin terminador que lleva más del timeout serial
+            pendiente se entrega como línea, igual que hacía readline().
+        """
+        timeout = self._frame_wait_timeout(timeout)
+        return self._read_lines(self.wait_for_data(shutdown_flag, timeout))
+
+    def _frame_wait_timeout(self, timeout: float | None) -> float | None:
+        """Acorta ``timeout`` para entregar a tiempo un fragmento sin terminador"""
+        if self.framer is None:
+            self.framer = LineFramer(self.frame_terminators)
+        if self.framer.pending:
+            remaining = max(0.0, self._line_timeout() - self.framer.pending_age())
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
+
+    def _line_timeout(self) -> float:
+        return self.serial_config.get('timeout') or self.read_timeout
+
+    def _read_lines(self, ready: bool) -> List[str] | None:
+        if ready:
+            data = self.ser.read(self.ser.in_waiting or 1)
+            self.last_read_at = time.monotonic()
+            if self.first_byte_at is None:
+                self.first_byte_at = self.last_read_at
+            self.bytes_read.inc(len(data))
+            if self.capture is not None:
+                self.capture.write(data)
+            return self.framer.feed(data)
+
+        if self.framer.pending and self.framer.pending_age() >= self._line_timeout():
+            return self.framer.flush()
+        return None
+
+    def request_stop(self) -> None:
+        """Despierta al lector bloqueado para que termine sin esperar read_timeout"""
+        self._stop_requested.set()
+        try:
+            os.write(self._wakeup_w, b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
     def publish_parsed_report(self, buffer: str) -> None:
         self.logger.warning("Publish reports is currently not supported. Dismissing report.")
 
-    def publish_parsed_event(self, buffer: str) -> None:
-        """Publica un evento parseado a la cola para envío MQTT"""
+    def publish_parsed_event(self, buffer: str, read_at: float | None = None) -> None:
+        """
+        Publica un evento parseado a la cola para envío MQTT. ``read_at`` es la
+        hora (time.monotonic) en que se leyó su primer byte, para la traza de
+        latencia.
+        """
+        framed_at = time.monotonic()
         # Limpiar el buffer de espacios extra pero mantener la estructura
         buffer = buffer.strip()
         
@@ -66,51 +205,83 @@ class SerialPortHandler:
             self.logger.debug("Empty buffer, skipping.")
             return
             
-        self.logger.debug(f"📥 Raw event buffer received:\n{repr(buffer)}")
+        # Ruta caliente: argumentos %-style diferidos y repr() solo si DEBUG está habilitado
+        logger = self.logger
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📥 Raw event buffer received:\n%r", buffer)
         
         parsed_data = self.parse_string_event(buffer)
         
         if parsed_data is not None:
-            # Log detallado del evento parseado
-            self.logger.info(f'✅ Event queued successfully:')
-            self.logger.info(f'   - Event ID: {parsed_data.get("event")}')
-            self.logger.info(f'   - Severity: {parsed_data.get("severity")}')
-            self.logger.info(f'   - Description: {parsed_data.get("description")}')
-            self.logger.info(f'   - FACP Date: {parsed_data.get("FACP_date")}')
+            # Poner en la cola
+            parsed_at = time.monotonic()
+            message = timestamped_telemetry(parsed_data)
+            # La traza antes del put: el consumidor puede sacarlo y confirmarlo enseguida
+            if self.tracer is not None:
+                self.tracer.start(message, read_at or framed_at, framed_at, parsed_at)
+            self.queue.put((PublishType.TELEMETRY, message))
+            if self.tracer is not None:
+                self.tracer.enqueued(message, time.monotonic())
+            self.events_parsed.inc()
+
+            # Log detallado del evento parseado, en un solo registro
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("✅ Event queued successfully:\n   - Event ID: %s\n   - Severity: %s\n"
+                            "   - Description: %s\n   - FACP Date: %s",
+                            parsed_data.get("event"), parsed_data.get("severity"),
+                            parsed_data.get("description"), parsed_data.get("FACP_date"))
             
             # Advertencia si el evento no tiene severidad asignada
             if parsed_data.get("severity") == 0:
-                self.logger.warning(f'⚠️  EVENT NOT IN SEVERITY LIST: "{parsed_data.get("event")}"')
-                self.logger.warning(f'    This event will be sent but consider adding it to eventSeverityLevels.yml')
+                logger.warning('⚠️  EVENT NOT IN SEVERITY LIST: "%s"\n'
+                               '    This event will be sent but consider adding it to eventSeverityLevels.yml',
+                               parsed_data.get("event"))
             
-            # Poner en la cola
-            self.queue.put((PublishType.TELEMETRY, parsed_data))
-            self.logger.debug(f'   - Queue size after adding: {self.queue.qsize()}')
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('   - Queue size after adding: %d', self.queue.qsize())
         else:
-            self.logger.warning(f"❌ Failed to parse event. Buffer was:\n{repr(buffer)}")
-            self.logger.debug("The parsed event information is empty, skipping MQTT publish.")
+            self.parse_failures.inc()
+            logger.warning("❌ Failed to parse event. Buffer was:\n%r", buffer)
+            logger.debug("The parsed event information is empty, skipping MQTT publish.")
 
     def parse_string_event(self, event: str) -> Dict[str, Any] | None:
-        self.logger.error("The 'parse_string_event' function must be implemented in the specific handler!")
-        return None
+        try:
+            ID_Event, description, FACP_date = self.profile.extract_fields(event)
+        except ValueError as e:
+            self.logger.error(f"{e}: {event}")
+            return None
+        except Exception:
+            self.logger.exception(f"An error occurred while parsing the event: {event}")
+            return None
 
-    def is_complete_message(self, line: str) -> bool:
-        """
-        Determina si una línea contiene un mensaje completo.
-        Un mensaje completo típicamente contiene un timestamp al final.
-        Formato esperado: ... HH:MMA DDMMYY XXX
-        Ejemplo: REARME DEL SISTEMA    Sys.Initialization    SISTEMA NORMAL   08:57A 102925 Mie
-        """
-        if not line.strip():
-            return False
-        
-        # Verificar si la línea contiene un timestamp
-        if self.timestamp_pattern.search(line):
-            return True
-        
-        # Si no hay timestamp, podría ser un mensaje de reporte
-        # o un mensaje parcial que necesita acumularse
-        return False
+        return {
+            "event": ID_Event,
+            "description": description,
+            "severity": self.severity_classifier.classify(ID_Event),
+            "SBC_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"),
+            "FACP_date": FACP_date
+        }
+
+    def _report_unknown_if_changed(self, last_version: int) -> int:
+        """Encola la tabla de eventos no reconocidos si cambió desde last_version; devuelve la versión actual"""
+        version, telemetry = self.severity_classifier.unknown_snapshot()
+        if version != last_version:
+            self.queue.put((PublishType.TELEMETRY, timestamped_telemetry(telemetry)))
+            self.logger.info(f"Unknown events report queued: {telemetry['unknown_events_total']} total, "
+                             f"{len(telemetry['unknown_events'])} distinct")
+        return version
+
+    def report_unknown_events(self, shutdown_flag: threading.Event) -> None:
+        """Publica periódicamente la tabla de eventos no reconocidos si cambió"""
+        last_version = 0
+        while not shutdown_flag.wait(self.unknown_report_interval):
+            last_version = self._report_unknown_if_changed(last_version)
+
+    async def report_unknown_events_async(self) -> None:
+        last_version = 0
+        while True:
+            await asyncio.sleep(self.unknown_report_interval)
+            last_version = self._report_unknown_if_changed(last_version)
 
     def attempt_reconnection(self, shutdown_flag: threading.Event) -> None:
         while not shutdown_flag.is_set():
@@ -140,120 +311,114 @@ class SerialPortHandler:
         self.ser = None
         self.queue.is_serial_connected = False
 
-    def process_incoming_data(self, shutdown_flag: threading.Event) -> None:
-        buffer = ""
-        report_count = 0
-        last_activity_time = time.time()
-        message_timeout = 2.0  # Segundos de timeout para considerar mensaje completo
+    def _publish_frames(self, frames: List[Frame]) -> None:
+        # Todo lo delimitado llegó, a más tardar, en la última lectura
+        read_at = self.first_byte_at or self.last_read_at
+        self.first_byte_at = None
+        for frame_type, text in frames:
+            if frame_type == FRAME_REPORT:
+                self.publish_parsed_report(text)
+            else:
+                self.publish_parsed_event(text, read_at)
 
+    def process_incoming_data(self, shutdown_flag: threading.Event) -> None:
         if self.ser is None:
             raise ValueError("Serial port is not initialized")
 
+        self.framer = LineFramer(self.frame_terminators)
+        event_framer = create_event_framer(self.profile)
+
         try:
-            while not shutdown_flag.is_set():
-                if self.ser.in_waiting > 0:
-                    raw_data = self.ser.readline()
-                    incoming_line = raw_data.decode('latin-1').strip()
-                    
-                    # Log de datos recibidos
-                    if incoming_line:
-                        self.logger.debug(f"📡 Serial data received: {repr(incoming_line)}")
-                        last_activity_time = time.time()
-                    
-                    # Procesar la línea recibida
-                    if incoming_line:
-                        # Verificar si es un delimitador de reporte
-                        if self.report_delimiter and self.report_delimiter in incoming_line:
-                            report_count += 1
-                            buffer += incoming_line + "\n"
-                            self.logger.debug(f"Report delimiter detected. Count: {report_count}")
-                        
-                        # Verificar si la línea contiene un mensaje completo
-                        elif self.is_complete_message(incoming_line):
-                            # Si hay buffer acumulado, agregarlo primero
-                            if buffer:
-                                buffer += incoming_line
-                                self.logger.debug(f"🎯 Complete multi-line message detected")
-                                if report_count > 0:
-                                    self.publish_parsed_report(buffer)
-                                else:
-                                    self.publish_parsed_event(buffer)
-                                buffer = ""
-                                report_count = 0
-                            else:
-                                # Mensaje completo en una sola línea
-                                self.logger.debug(f"🎯 Complete single-line message detected")
-                                self.publish_parsed_event(incoming_line)
-                        else:
-                            # Línea parcial, acumular en buffer
-                            buffer += incoming_line + "\n"
-                            self.logger.debug(f"Partial line accumulated. Buffer size: {len(buffer)} chars")
-                    
-                    # Línea vacía puede indicar fin de mensaje multi-línea
-                    elif buffer:
-                        self.logger.debug(f"Empty line received with buffer content")
-                        # Verificar si es fin de reporte
-                        if report_count == self.max_report_delimiter_count and report_count > 0:
-                            self.logger.debug(f"Publishing report (delimiter count matched)")
-                            self.publish_parsed_report(buffer)
-                        elif buffer.strip():
-                            self.logger.debug(f"Publishing accumulated buffer as event")
-                            self.publish_parsed_event(buffer)
-                        buffer = ""
-                        report_count = 0
-                
-                # Timeout check: Si hay buffer y pasó tiempo sin actividad
-                elif buffer and (time.time() - last_activity_time) > message_timeout:
-                    self.logger.debug(f"⏱️ Message timeout - publishing accumulated buffer")
-                    if report_count > 0:
-                        self.publish_parsed_report(buffer)
-                    else:
-                        self.publish_parsed_event(buffer)
-                    buffer = ""
-                    report_count = 0
-                    last_activity_time = time.time()
-                else:
-                    time.sleep(0.1)
-                    
+            while not shutdown_flag.is_set() and not self._stop_requested.is_set():
+                lines = self.read_available_lines(shutdown_flag, event_framer.pending_timeout())
+                self._handle_lines(event_framer, lines)
+
         except (serial.SerialException, serial.SerialTimeoutException, OSError) as e:
             # Antes de lanzar la excepción, procesar buffer si hay contenido
-            if buffer.strip():
-                self.logger.warning("Serial error occurred, processing remaining buffer...")
-                if report_count > 0:
-                    self.publish_parsed_report(buffer)
-                else:
-                    self.publish_parsed_event(buffer)
+            self._flush_frames(event_framer, "Serial error occurred")
             raise serial.SerialException(str(e))
         except (TypeError, UnicodeDecodeError) as e:
-            if buffer.strip():
-                self.logger.warning("Decode error occurred, processing remaining buffer...")
-                if report_count > 0:
-                    self.publish_parsed_report(buffer)
-                else:
-                    self.publish_parsed_event(buffer)
+            self._flush_frames(event_framer, "Decode error occurred")
             raise TypeError(str(e))
         except Exception as e:
             raise Exception(f"Unexpected failure occurred: {str(e)}")
 
-    def handle_data_line(self, incoming_line: str, buffer: str, report_count: int) -> Tuple[str, int]:
-        """DEPRECATED: Esta función ya no se usa con la nueva lógica"""
-        if self.report_delimiter in incoming_line:
-            report_count += 1
-        buffer += incoming_line + "\n"
-        return buffer, report_count
-
-    def handle_empty_line(self, buffer: str, report_count: int) -> bool:
-        """DEPRECATED: Esta función ya no se usa con la nueva lógica"""
-        if report_count == self.max_report_delimiter_count and buffer.strip():
-            self.publish_parsed_report(buffer)
+    def _handle_lines(self, event_framer: EventFramer, lines: List[str] | None) -> None:
+        if lines is None:
+            # Sin datos nuevos: publicar lo acumulado si venció message_timeout
+            frames = event_framer.expire()
+            if frames:
+                self.logger.debug("⏱️ Message timeout - publishing accumulated buffer")
+                self._publish_frames(frames)
+            return
+
+        self.lines_read.inc(len(lines))
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        for line in lines:
+            if line and debug:
+                self.logger.debug("📡 Serial data received: %r", line)
+            self._publish_frames(event_framer.push(line))
+        # Lo que quedó sin delimitar pertenece al próximo evento
+        if self.first_byte_at is None and (self.framer.pending or event_framer.buffer_lines):
+            self.first_byte_at = self.last_read_at
+
+    def _flush_frames(self, event_framer: EventFramer, reason: str) -> None:
+        frames = event_framer.flush()
+        if frames:
+            self.logger.warning(f"{reason}, processing remaining buffer...")
+            self._publish_frames(frames)
+
+    async def _wait_for_data_async(self, data_ready: asyncio.Event, fd: int | None, timeout: float | None) -> bool:
+        """
+        Espera datos en el runtime asyncio. Con descriptor, data_ready lo marca
+        el reader del loop sobre el puerto; sin él (modo 'polling') revisa
+        in_waiting cada 0.1 s. Sin fragmentos pendientes no hay timeout: la
+        coroutine duerme hasta que lleguen bytes o se cancele.
+        """
+        if self.ser.in_waiting > 0:
             return True
-        elif report_count == 0 and buffer.strip():
-            self.logger.debug(f"🎯 Detected complete event, publishing...")
-            self.publish_parsed_event(buffer)
+        if fd is None:
+            await asyncio.sleep(self.poll_interval if timeout is None else min(self.poll_interval, timeout))
+            return self.ser.in_waiting > 0
+        # El reader es level-triggered: si quedan bytes sin leer vuelve a marcarlo
+        data_ready.clear()
+        try:
+            await asyncio.wait_for(data_ready.wait(), timeout)
             return True
-        else:
+        except asyncio.TimeoutError:
             return False
 
+    async def process_incoming_data_async(self) -> None:
+        """Versión de process_incoming_data para el runtime asyncio; termina al cancelarse"""
+        if self.ser is None:
+            raise ValueError("Serial port is not initialized")
+
+        self.framer = LineFramer(self.frame_terminators)
+        event_framer = create_event_framer(self.profile)
+        loop = asyncio.get_running_loop()
+        data_ready = asyncio.Event()
+        fd = self._serial_fileno() if self.read_mode == 'event' else None
+        if fd is not None:
+            loop.add_reader(fd, data_ready.set)
+
+        try:
+            while True:
+                timeout = self._frame_wait_timeout(event_framer.pending_timeout())
+                ready = await self._wait_for_data_async(data_ready, fd, timeout)
+                self._handle_lines(event_framer, self._read_lines(ready))
+
+        except (serial.SerialException, serial.SerialTimeoutException, OSError) as e:
+            self._flush_frames(event_framer, "Serial error occurred")
+            raise serial.SerialException(str(e))
+        except (TypeError, UnicodeDecodeError) as e:
+            self._flush_frames(event_framer, "Decode error occurred")
+            raise TypeError(str(e))
+        except Exception as e:
+            raise Exception(f"Unexpected failure occurred: {str(e)}")
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+
     def listening_to_serial(self, shutdown_flag: threading.Event) -> None:
         max_delay = 60  
         delay = 1 
@@ -261,7 +426,10 @@ class SerialPortHandler:
             try:
                 self.open_serial_port()
                 self.logger.info("🎧 Started listening to serial port...")
+                STARTUP.mark(SERIAL_LISTENING)
                 self.process_incoming_data(shutdown_flag)
+                if self._stop_requested.is_set():
+                    break
             except (serial.SerialException, serial.SerialTimeoutException) as e:
                 self.logger.error(f"Lost serial connection. Retrying in 5 seconds. Error: {e} ")
                 self.close_serial_port()
@@ -279,3 +447,53 @@ class SerialPortHandler:
             else:
                 delay = 1 
         self.close_serial_port()
+
+    async def attempt_reconnection_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.open_serial_port)
+                if self.ser and self.ser.is_open:
+                    self.queue.is_serial_connected = True
+                    self.attempt = 1
+                    return
+            except Exception as e:
+                self.queue.is_serial_connected = False
+                delay = min(self.base_delay * (2 ** self.attempt), self.max_reconnect_delay)
+                self.logger.error(f"Error found trying to open serial: {e}. Retrying in {delay} seconds.")
+                await asyncio.sleep(delay)
+                self.attempt += 1
+
+    async def listening_to_serial_async(self) -> None:
+        """
+        Lector serial del runtime asyncio: el puerto se abre desde el executor
+        y los bytes se leen cuando el loop avisa que el descriptor está listo.
+        Se detiene al cancelar la tarea.
+        """
+        loop = asyncio.get_running_loop()
+        max_delay = 60
+        delay = 1
+        try:
+            while True:
+                try:
+                    await loop.run_in_executor(None, self.open_serial_port)
+                    self.logger.info("🎧 Started listening to serial port...")
+                    STARTUP.mark(SERIAL_LISTENING)
+                    await self.process_incoming_data_async()
+                except (serial.SerialException, serial.SerialTimeoutException) as e:
+                    self.logger.error(f"Lost serial connection. Retrying in 5 seconds. Error: {e} ")
+                    self.close_serial_port()
+                    await self.attempt_reconnection_async()
+                except (TypeError, UnicodeDecodeError) as e:
+                    self.logger.error(f"Error occurred, strange character found. Resetting the serial: {e}")
+                    if self.ser:
+                        self.ser.reset_input_buffer()
+                except Exception as e:
+                    self.close_serial_port()
+                    self.logger.error(f"An unexpected error has occurred: {str(e)}")
+                    delay = min(delay * 2, max_delay)
+                    await asyncio.sleep(delay)
+                else:
+                    delay = 1
+        finally:
+            self.close_serial_port()
@@ -0,0 +1,116 @@
+import re
+import threading
+from typing import Dict, Any, List, Tuple
+
+_TRIE_VALUE = object()
+
+
+class SeverityClassifier:
+    """
+    Clasificador de severidad construido una sola vez a partir de
+    eventSeverityLevels.yml.
+
+    Tipos de regla según la clave:
+      - Exacta:   'HUMO ACT'  -> dict, O(largo del ID)
+      - Prefijo:  'HUMO *'    -> trie, gana el prefijo más largo, O(largo del ID)
+      - Comodín:  '*:*', 'AVER?? ACT' -> una sola regex compilada con todas las reglas
+
+    Precedencia: exacta, luego prefijo más largo, luego el primer comodín en
+    orden del archivo. Los IDs que no coinciden se cuentan en una tabla
+    acotada (algoritmo Space-Saving: conserva los más frecuentes).
+    """
+
+    def __init__(self, levels: Dict[Any, int], default_severity: int = 0, max_unknown: int = 100):
+        self.default_severity = default_severity
+        self.max_unknown = max_unknown
+        self.exact: Dict[str, int] = {}
+        self.prefix_trie: Dict[Any, Any] = {}
+        self.wildcard_pattern: re.Pattern | None = None
+        self.wildcard_severities: Dict[str, int] = {}
+        self.unknown_counts: Dict[str, int] = {}
+        self.unknown_total = 0
+        self.unknown_version = 0
+        self.unknown_lock = threading.Lock()
+
+        wildcard_rules: List[Tuple[str, int]] = []
+        for key, severity in (levels or {}).items():
+            key = str(key)
+            if key.endswith('*') and not any(c in key[:-1] for c in '*?'):
+                self._add_prefix(key[:-1], severity)
+            elif '*' in key or '?' in key:
+                wildcard_rules.append((key, severity))
+            else:
+                self.exact[key] = severity
+
+        if wildcard_rules:
+            alternatives = []
+            for index, (key, severity) in enumerate(wildcard_rules):
+                group = f"r{index}"
+                self.wildcard_severities[group] = severity
+                alternatives.append(f"(?P<{group}>{self._translate(key)})")
+            self.wildcard_pattern = re.compile("|".join(alternatives), re.DOTALL)
+
+    @staticmethod
+    def _translate(rule: str) -> str:
+        return "".join('.*' if c == '*' else '.' if c == '?' else re.escape(c) for c in rule)
+
+    def _add_prefix(self, prefix: str, severity: int) -> None:
+        node = self.prefix_trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[_TRIE_VALUE] = severity
+
+    def _match_prefix(self, event_id: str) -> int | None:
+        node = self.prefix_trie
+        found = node.get(_TRIE_VALUE)
+        for char in event_id:
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(_TRIE_VALUE, found)
+        return found
+
+    def lookup(self, event_id: str) -> int | None:
+        """Severidad del evento según las reglas, o None si ninguna coincide"""
+        severity = self.exact.get(event_id)
+        if severity is not None:
+            return severity
+        if self.prefix_trie:
+            severity = self._match_prefix(event_id)
+            if severity is not None:
+                return severity
+        if self.wildcard_pattern is not None:
+            match = self.wildcard_pattern.fullmatch(event_id)
+            if match is not None:
+                return self.wildcard_severities[match.lastgroup]
+        return None
+
+    def classify(self, event_id: str) -> int:
+        """Severidad del evento; los no reconocidos se registran y reciben la severidad por defecto"""
+        severity = self.lookup(event_id)
+        if severity is None:
+            self._record_unknown(event_id)
+            return self.default_severity
+        return severity
+
+    def _record_unknown(self, event_id: str) -> None:
+        with self.unknown_lock:
+            self.unknown_total += 1
+            self.unknown_version += 1
+            if event_id in self.unknown_counts:
+                self.unknown_counts[event_id] += 1
+            elif len(self.unknown_counts) < self.max_unknown:
+                self.unknown_counts[event_id] = 1
+            else:
+                # Tabla llena: reemplazar el menos frecuente heredando su conteo
+                least = min(self.unknown_counts, key=self.unknown_counts.get)
+                self.unknown_counts[event_id] = self.unknown_counts.pop(least) + 1
+
+    def unknown_snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """Devuelve (versión, telemetría) de la tabla de eventos no reconocidos"""
+        with self.unknown_lock:
+            counts = dict(sorted(self.unknown_counts.items(), key=lambda item: item[1], reverse=True))
+            return self.unknown_version, {
+                "unknown_events": counts,
+                "unknown_events_total": self.unknown_total
+            }
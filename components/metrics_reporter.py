@@ -0,0 +1,43 @@
+import threading
+import asyncio
+import logging
+from app_utils.metrics import MetricsRegistry, MetricsServer
+from classes.mqtt_sender import MqttHandler
+from config.schema import MetricsConfig
+
+class MetricsReporter:
+    """
+    Exposición de las métricas del proceso: endpoint HTTP local en formato
+    Prometheus y, si telemetry_interval > 0, envío periódico como telemetría
+    directa a ThingsBoard (la capa delta solo envía las que cambiaron).
+    """
+
+    def __init__(self, registry: MetricsRegistry, mqtt_handler: MqttHandler, config: MetricsConfig):
+        self.registry = registry
+        self.mqtt_handler = mqtt_handler
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.server = MetricsServer(registry, config.host, config.port)
+
+    def start_server(self) -> None:
+        if self.config.enabled:
+            self.server.start()
+
+    def report_metrics(self, shutdown_flag: threading.Event):
+        while not shutdown_flag.wait(self.config.telemetry_interval):
+            self.publish_metrics()
+
+    async def report_metrics_async(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.config.telemetry_interval)
+            await loop.run_in_executor(None, self.publish_metrics)
+
+    def publish_metrics(self):
+        try:
+            self.mqtt_handler.publish_telemetry(self.registry.snapshot(), bypass_queue=True)
+        except Exception as e:
+            self.logger.error(f"Failed to publish metrics: {e}")
+
+    def stop(self) -> None:
+        self.server.stop()
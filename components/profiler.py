@@ -0,0 +1,219 @@
+import asyncio
+import collections
+import concurrent.futures
+import glob
+import gzip
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+from config.schema import ProfilingConfig
+
+MODE_STACK = 'stack'
+MODE_MEMORY = 'memory'
+MAX_STACK_DEPTH = 64
+# Un hilo se considera ocupado si usó al menos esta fracción de CPU en la ventana
+BUSY_CPU_FRACTION = 0.01
+
+Frame = Tuple[str, str, int]  # (archivo, función, línea)
+
+def _thread_cpu_times() -> Dict[int, float]:
+    """Segundos de CPU consumidos por cada hilo vivo (vacío si la plataforma no lo permite)"""
+    times = {}
+    for thread in threading.enumerate():
+        try:
+            times[thread.ident] = time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+        except (AttributeError, OSError, TypeError, OverflowError):
+            pass
+    return times
+
+def _format_frame(frame: Frame) -> str:
+    filename, function, line = frame
+    return f"{function} ({os.path.basename(filename)}:{line})"
+
+class ProfilerController:
+    """
+    Perfilado bajo demanda del proceso en ejecución, por RPC.
+
+    Modo 'stack': muestrea cada sample_interval_ms las pilas de todos los
+    hilos con sys._current_frames() y mide la CPU de cada hilo. Guarda las
+    pilas en formato "folded" (flamegraph.pl, speedscope). El resumen indica
+    los hilos que más CPU usaron y las funciones más frecuentes en la cima de
+    la pila de los hilos ocupados.
+
+    Modo 'memory': activa tracemalloc durante la ventana (si no estaba activo)
+    y guarda las asignaciones que siguen vivas al final, agrupadas por
+    traceback. El resumen lista las líneas que más memoria retienen.
+
+    Los resultados se escriben comprimidos con gzip en output_dir y se
+    conservan los max_files más recientes. Fuera de una ventana de perfilado
+    no hay hilos ni trazas activas. Solo se ejecuta un perfil a la vez.
+    """
+
+    def __init__(self, config: ProfilingConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.loop: asyncio.AbstractEventLoop | None = None  # Event loop del runtime asyncio, si se usa
+        self.logger = logging.getLogger(__name__)
+
+    def handle_profile_rpc(self, params: Dict[str, Any]):
+        """
+        Callback del RPC de perfilado. Parámetros opcionales: mode ('stack' o
+        'memory'), duration (segundos, hasta max_duration) y top (filas del
+        resumen).
+
+        Con el runtime asyncio devuelve una coroutine: el perfil corre en un
+        hilo propio y el event loop sigue atendiendo mientras tanto.
+        """
+        params = params if isinstance(params, dict) else {}
+        mode = params.get('mode', MODE_STACK)
+        if mode not in (MODE_STACK, MODE_MEMORY):
+            raise ValueError(f"Modo de perfilado '{mode}' no reconocido (stack o memory)")
+        duration = min(float(params.get('duration', self.config.default_duration)), self.config.max_duration)
+        if duration <= 0:
+            raise ValueError("La duración debe ser mayor que 0")
+        top = int(params.get('top', self.config.top_n))
+
+        if not self.lock.acquire(blocking=False):
+            return "Perfilado ya en curso, intente de nuevo al terminar"
+        if self.loop is None:
+            return self._run_profile(mode, duration, top)
+        return self._profile_async(mode, duration, top)
+
+    async def _profile_async(self, mode: str, duration: float, top: int) -> Dict[str, Any]:
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(self._run_profile(mode, duration, top))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name='profiler', daemon=True).start()
+        return await asyncio.wrap_future(future)
+
+    def _run_profile(self, mode: str, duration: float, top: int) -> Dict[str, Any]:
+        """Ejecuta el perfil con el lock ya tomado y lo libera al terminar"""
+        try:
+            self.logger.info(f"Profiling process: mode={mode}, duration={duration:.1f}s")
+            if mode == MODE_STACK:
+                summary = self._profile_stacks(duration, top)
+            else:
+                summary = self._profile_memory(duration, top)
+            self._prune_old_files()
+            self.logger.info(f"Profile written to {summary['file']}")
+            return summary
+        finally:
+            self.lock.release()
+
+    def _output_path(self, mode: str, extension: str) -> str:
+        os.makedirs(self.config.output_dir, exist_ok=True)
+        now = time.time()
+        name = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}_{mode}.{extension}.gz"
+        return os.path.join(self.config.output_dir, name)
+
+    def _prune_old_files(self) -> None:
+        files = sorted(glob.glob(os.path.join(self.config.output_dir, '*.gz')), key=os.path.getmtime)
+        for path in files[:max(0, len(files) - self.config.max_files)]:
+            try:
+                os.remove(path)
+            except OSError as e:
+                self.logger.warning(f"Could not remove old profile {path}: {e}")
+
+    def _profile_stacks(self, duration: float, top: int) -> Dict[str, Any]:
+        interval = self.config.sample_interval_ms / 1000
+        me = threading.get_ident()
+        stacks: collections.Counter = collections.Counter()  # (hilo, pila) -> muestras
+        names: Dict[int, str] = {}
+        samples = 0
+
+        cpu_before = _thread_cpu_times()
+        started_at = time.monotonic()
+        deadline = started_at + duration
+        while time.monotonic() < deadline:
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack: List[Frame] = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_name, frame.f_lineno))
+                    frame = frame.f_back
+                stacks[(ident, tuple(stack))] += 1
+            samples += 1
+            time.sleep(interval)
+        elapsed = time.monotonic() - started_at
+        cpu_after = _thread_cpu_times()
+
+        cpu = {ident: cpu_after[ident] - cpu_before.get(ident, 0.0) for ident in cpu_after if ident != me}
+        busy = {ident for ident, seconds in cpu.items() if seconds >= BUSY_CPU_FRACTION * elapsed}
+        leaf_counts: collections.Counter = collections.Counter()
+        thread_samples: collections.Counter = collections.Counter()
+        for (ident, stack), count in stacks.items():
+            thread_samples[ident] += count
+            if stack and (not cpu or ident in busy):
+                leaf_counts[stack[0]] += count
+
+        path = self._output_path(MODE_STACK, 'folded')
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            for (ident, stack), count in stacks.most_common():
+                frames = ';'.join(_format_frame(frame) for frame in reversed(stack))
+                f.write(f"{names.get(ident, ident)};{frames} {count}\n")
+
+        leaf_total = sum(leaf_counts.values()) or 1
+        threads = sorted(thread_samples, key=lambda ident: cpu.get(ident, 0.0), reverse=True)
+        return {
+            "mode": MODE_STACK,
+            "duration_s": round(elapsed, 2),
+            "samples": samples,
+            "file": path,
+            "threads": [{"name": names.get(ident, str(ident)),
+                         "cpu_s": round(cpu[ident], 3) if ident in cpu else None,
+                         "samples": thread_samples[ident]} for ident in threads[:top]],
+            "top": [{"function": _format_frame(frame), "samples": count,
+                     "percent": round(100 * count / leaf_total, 1)}
+                    for frame, count in leaf_counts.most_common(top)],
+        }
+
+    def _profile_memory(self, duration: float, top: int) -> Dict[str, Any]:
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start(self.config.traceback_frames)
+        try:
+            before = tracemalloc.take_snapshot()
+            time.sleep(duration)
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                   tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                   tracemalloc.Filter(False, "<unknown>")]
+        before, after = before.filter_traces(filters), after.filter_traces(filters)
+        growth = after.compare_to(before, 'lineno')
+
+        path = self._output_path(MODE_MEMORY, 'txt')
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            for stat in after.statistics('traceback')[:200]:
+                f.write(f"{stat.size} B in {stat.count} blocks\n")
+                for line in stat.traceback.format():
+                    f.write(f"{line}\n")
+                f.write("\n")
+
+        return {
+            "mode": MODE_MEMORY,
+            "duration_s": duration,
+            "file": path,
+            "traced_kib": round(current / 1024, 1),
+            "peak_kib": round(peak / 1024, 1),
+            "top": [{"line": f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                     "size_diff_kib": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+                    for stat in growth[:top]],
+        }
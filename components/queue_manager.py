@@ -1,45 +1,112 @@
+import itertools
+import os
 import threading
+import asyncio
 import logging
-from app_utils.file_operations import save_to_file, load_from_file
+from app_utils.file_operations import load_from_file
 from app_utils.queue_operations import SafeQueue
+from app_utils.write_ahead_log import WriteAheadLog, FSYNC_INTERVAL
+from app_utils.startup import STARTUP, QUEUE_RESTORED
+from config.schema import QueueConfig
 import pickle
 
 class QueueManager:
-    def __init__(self, queue: SafeQueue, queue_file_path: str):
+    """
+    Persistencia de la cola de salida con un log de solo-anexado.
+
+    Cada elemento se escribe en el log al encolarse y sale de él cuando el
+    MqttHandler confirma su entrega; al iniciar solo se reencolan los
+    elementos sin confirmar.
+
+    Con start_restore() esa recuperación corre en un hilo propio: la cola
+    acepta elementos desde el primer momento y el backlog sale antes que
+    ellos.
+    """
+
+    def __init__(self, queue: SafeQueue, config: QueueConfig, legacy_file_path: str = "queue_backup.pkl"):
         self.queue = queue
-        self.queue_file_path = queue_file_path
+        self.config = config
+        self.legacy_file_path = legacy_file_path
         self.logger = logging.getLogger(__name__)
+        self.wal = WriteAheadLog(config.wal_dir, config.segment_size, config.fsync)
+        self.queue.configure(config)
+        self.restore_thread: threading.Thread | None = None
+        self.restore_stop = threading.Event()
+
+    def _sync_interval(self) -> float:
+        return self.config.fsync_interval if self.config.fsync == FSYNC_INTERVAL else 30
 
-    def save_queue_periodically(self, shutdown_flag: threading.Event):
+    def sync_queue_periodically(self, shutdown_flag: threading.Event):
+        interval = self._sync_interval()
         while not shutdown_flag.is_set():
-            self.save_queue()
-            if shutdown_flag.wait(30):
+            self.sync_queue()
+            if shutdown_flag.wait(interval):
                 break
 
-    def save_queue(self):
+    async def sync_queue_periodically_async(self):
+        """Versión para el runtime asyncio; el fsync corre en el executor"""
+        loop = asyncio.get_running_loop()
+        interval = self._sync_interval()
+        while True:
+            await loop.run_in_executor(None, self.sync_queue)
+            await asyncio.sleep(interval)
+
+    def sync_queue(self):
         try:
-            with self.queue.mutex:
-                queue_contents = list(self.queue.queue)
-            save_to_file(queue_contents, self.queue_file_path)
-            #self.logger.debug(f"Queue saved to {self.queue_file_path}")
+            self.wal.sync()
         except Exception as e:
-            self.logger.error(f"Error saving queue: {e}")
+            self.logger.error(f"Error syncing queue log: {e}")
+
+    def start_restore(self) -> None:
+        """Inicia la restauración del backlog en segundo plano; los elementos nuevos esperan detrás"""
+        self.queue.begin_restore()
+        self.restore_thread = threading.Thread(target=self.load_queue, name='queue_restore', daemon=True)
+        self.restore_thread.start()
 
     def load_queue(self) -> None:
         try:
-            items = load_from_file(self.queue_file_path)
+            entries = self.wal.recover()
+            # A partir de aquí cada put se escribe en el log
+            self.queue.attach_log(self.wal)
+            count = self.queue.restore(itertools.takewhile(lambda _: not self.restore_stop.is_set(), entries))
+            self.logger.info(f"Queue loaded from {self.config.wal_dir}, {count} items added")
+            if not self.restore_stop.is_set():
+                self._migrate_legacy_backup()
+        except Exception as e:
+            self.logger.error(f"Unexpected error loading queue, continuing without persistence: {e}")
+        finally:
+            held = self.queue.end_restore()
+            if held:
+                self.logger.info(f"{held} items queued during restore released behind the backlog")
+            STARTUP.mark(QUEUE_RESTORED)
+
+    def _migrate_legacy_backup(self) -> None:
+        """Importa al log la copia pickle de versiones anteriores, si existe"""
+        if not os.path.exists(self.legacy_file_path):
+            return
+        try:
+            items = load_from_file(self.legacy_file_path)
             if not isinstance(items, list):
                 raise TypeError("Loaded data is not a list")
-            
-            for item in items:
-                self.queue.put(item)
-            
-            self.logger.info(f"Queue loaded from {self.queue_file_path}, {len(items)} items added")
-        except FileNotFoundError:
-            self.logger.warning(f"File {self.queue_file_path} not found. Starting with an empty queue.")
+
+            # Como el backlog: delante de los elementos retenidos durante la restauración
+            self.queue.restore((self.wal.append(item), item) for item in items)
+            self.wal.sync()
+            os.remove(self.legacy_file_path)
+
+            self.logger.info(f"Legacy queue {self.legacy_file_path} migrated, {len(items)} items added")
         except EOFError:
-            self.logger.debug("Queue file is empty. Starting with an empty queue.")
+            os.remove(self.legacy_file_path)
         except (pickle.UnpicklingError, AttributeError, TypeError) as e:
-            self.logger.error(f"Error unpickling queue data: {e}")
+            self.logger.error(f"Error unpickling legacy queue data: {e}")
+        except Exception as e:
+            self.logger.error(f"Unexpected error migrating legacy queue: {e}")
+
+    def close(self) -> None:
+        self.restore_stop.set()
+        if self.restore_thread is not None:
+            self.restore_thread.join(timeout=5)
+        try:
+            self.wal.close()
         except Exception as e:
-            self.logger.error(f"Unexpected error loading queue: {e}")
\ No newline at end of file
+            self.logger.error(f"Error closing queue log: {e}")
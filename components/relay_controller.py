@@ -1,38 +1,28 @@
 import threading
+import asyncio
 import logging
+from typing import Any
 from config.schema import RelayConfig
 
 class RelayController:
-    def __init__(self, relay_config: RelayConfig):
+    def __init__(self, relay_config: RelayConfig, gpio: Any):
         self.relay_pin = relay_config.pin
         self.relay_high_time = relay_config.high_time
         self.relay_low_time = relay_config.low_time
-        self.is_raspberry_pi = self._is_raspberry_pi()
-        self.GPIO = None
+        self.GPIO = None  # Backend GPIO (RPi.GPIO o SimulatedGpio); None si no se pudo configurar
+        self._setup_gpio(gpio)
 
-        if self.is_raspberry_pi:
-            self._setup_gpio()
-
-    def _is_raspberry_pi(self):
-        try:
-            with open('/sys/firmware/devicetree/base/model', 'r') as model:
-                return 'Raspberry Pi' in model.read()
-        except:
-            return False
-
-    def _setup_gpio(self):
+    def _setup_gpio(self, GPIO: Any):
         try:
-            import RPi.GPIO as GPIO
             GPIO.setmode(GPIO.BCM)
             GPIO.setup(self.relay_pin, GPIO.OUT)
             self.GPIO = GPIO
-        except ImportError:
-            logging.warning("RPi.GPIO module not found. Relay control will be disabled.")
-            self.is_raspberry_pi = False
+        except Exception as e:
+            logging.warning(f"Error setting up GPIO for relay: {e}. Relay control will be disabled.")
 
     def relay_control(self, shutdown_flag: threading.Event):
-        if not self.is_raspberry_pi:
-            logging.info("Relay control is disabled as this is not a Raspberry Pi.")
+        if not self.GPIO:
+            logging.info("Relay control is disabled as GPIO is not available.")
             return
 
         while not shutdown_flag.is_set():
@@ -43,6 +33,17 @@ class RelayController:
             if shutdown_flag.wait(self.relay_low_time):
                 break
 
+    async def relay_control_async(self):
+        if not self.GPIO:
+            logging.info("Relay control is disabled as GPIO is not available.")
+            return
+
+        while True:
+            self.GPIO.output(self.relay_pin, self.GPIO.HIGH)
+            await asyncio.sleep(self.relay_high_time)
+            self.GPIO.output(self.relay_pin, self.GPIO.LOW)
+            await asyncio.sleep(self.relay_low_time)
+
     def cleanup(self):
-        if self.is_raspberry_pi and self.GPIO:
+        if self.GPIO:
             self.GPIO.cleanup(self.relay_pin)
\ No newline at end of file
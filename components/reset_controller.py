@@ -1,36 +1,28 @@
 import threading
 import logging
 import time
+import asyncio
 from config.schema import ResetRelayConfig
 from typing import Dict, Any
 
 class ResetController:
-    def __init__(self, reset_config: ResetRelayConfig, mqtt_handler):
+    def __init__(self, reset_config: ResetRelayConfig, mqtt_handler, gpio: Any):
         self.reset_pin = reset_config.pin
         self.activation_time = reset_config.activation_time
         self.active_high = reset_config.active_high
         self.mqtt_handler = mqtt_handler
-        self.is_raspberry_pi = self._is_raspberry_pi()
-        self.GPIO = None
+        self.GPIO = None  # Backend GPIO (RPi.GPIO o SimulatedGpio); None si no se pudo configurar
         self.is_resetting = False
+        self.active_until = 0.0  # Instante (monotonic) en que termina el pulso en curso
         self.reset_lock = threading.Lock()
+        self.loop: asyncio.AbstractEventLoop | None = None  # Event loop del runtime asyncio, si se usa
+        self.tasks: set[asyncio.Task] = set()  # Referencias a las activaciones en curso en el loop
         self.logger = logging.getLogger(__name__)
 
-        if self.is_raspberry_pi:
-            self._setup_gpio()
-        else:
-            self.logger.warning("Not running on Raspberry Pi. Reset control will be simulated.")
-
-    def _is_raspberry_pi(self):
-        try:
-            with open('/sys/firmware/devicetree/base/model', 'r') as model:
-                return 'Raspberry Pi' in model.read()
-        except:
-            return False
+        self._setup_gpio(gpio)
 
-    def _setup_gpio(self):
+    def _setup_gpio(self, GPIO: Any):
         try:
-            import RPi.GPIO as GPIO
             GPIO.setmode(GPIO.BCM)
             GPIO.setup(self.reset_pin, GPIO.OUT)
             # Set initial state to inactive
@@ -38,12 +30,8 @@ class ResetController:
             GPIO.output(self.reset_pin, initial_state)
             self.GPIO = GPIO
             self.logger.info(f"Reset relay GPIO {self.reset_pin} configured successfully")
-        except ImportError:
-            self.logger.warning("RPi.GPIO module not found. Reset control will be disabled.")
-            self.is_raspberry_pi = False
         except Exception as e:
-            self.logger.error(f"Error setting up GPIO for reset relay: {e}")
-            self.is_raspberry_pi = False
+            self.logger.error(f"Error setting up GPIO for reset relay: {e}. Reset control will be simulated.")
 
     def handle_reset_rpc(self, params: Dict[str, Any]) -> str:
         """
@@ -62,8 +50,18 @@ class ResetController:
             activate = params.get('activate', True) if isinstance(params, dict) else True
             
             if activate:
-                # Ejecutar en un hilo separado para no bloquear
-                threading.Thread(target=self.activate_reset, daemon=True).start()
+                if not self._begin_reset():
+                    # Pulso en curso: el comando repetido se une a él y se responde de inmediato
+                    self.mqtt_handler.rpc_executor.record_coalesced('reset_pulse')
+                    return f"Reinicio ya en curso, {self._remaining_time():.0f} s restantes"
+                if self.loop is not None:
+                    # Runtime asyncio: el pulso es una tarea del event loop
+                    task = self.loop.create_task(self._reset_pulse_async())
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+                elif self.mqtt_handler.rpc_executor.submit('reset_pulse', self._reset_pulse) is None:
+                    self._fail_reset(RuntimeError("RPC pool full"))
+                    return "Comando de reinicio rechazado: dispositivo ocupado"
                 return "Comando de reinicio aceptado y en ejecución"
             else:
                 return "Comando de reinicio recibido pero no activado (activate=False)"
@@ -73,45 +71,41 @@ class ResetController:
             self.logger.error(error_msg)
             return error_msg
 
-    def activate_reset(self):
-        """Activa el relay de reinicio por el tiempo configurado"""
+    def _begin_reset(self) -> bool:
+        """Marca el reinicio en curso y publica su inicio; False si ya había uno"""
         with self.reset_lock:
             if self.is_resetting:
-                self.logger.warning("Reset already in progress, ignoring new request")
+                self.logger.info("Reset already in progress, coalescing request")
                 return False
 
             self.is_resetting = True
+            self.active_until = time.monotonic() + self.activation_time
             
         self.logger.info(f"Activating reset relay for {self.activation_time} seconds")
         
         # Publicar estado inicial
         self._publish_reset_state(True, "started")
-        
-        if self.is_raspberry_pi and self.GPIO:
-            try:
-                # Activar el relay
-                active_state = self.GPIO.HIGH if self.active_high else self.GPIO.LOW
-                self.GPIO.output(self.reset_pin, active_state)
-                self.logger.info(f"Reset relay GPIO {self.reset_pin} activated")
-                
-                # Esperar el tiempo configurado
-                time.sleep(self.activation_time)
-                
-                # Desactivar el relay
-                inactive_state = self.GPIO.LOW if self.active_high else self.GPIO.HIGH
-                self.GPIO.output(self.reset_pin, inactive_state)
-                self.logger.info(f"Reset relay GPIO {self.reset_pin} deactivated")
-                
-            except Exception as e:
-                self.logger.error(f"Error controlling reset relay: {e}")
-                self._publish_reset_state(False, f"error: {e}")
-                with self.reset_lock:
-                    self.is_resetting = False
-                return False
+        return True
+
+    def _remaining_time(self) -> float:
+        return max(0.0, self.active_until - time.monotonic())
+
+    def _set_reset_relay(self, active: bool) -> None:
+        if active:
+            state = self.GPIO.HIGH if self.active_high else self.GPIO.LOW
         else:
-            self.logger.info(f"[SIMULATION] Reset relay would be active for {self.activation_time} seconds")
-            time.sleep(self.activation_time)
-        
+            state = self.GPIO.LOW if self.active_high else self.GPIO.HIGH
+        self.GPIO.output(self.reset_pin, state)
+        self.logger.info(f"Reset relay GPIO {self.reset_pin} {'activated' if active else 'deactivated'}")
+
+    def _fail_reset(self, error: Exception) -> bool:
+        self.logger.error(f"Error controlling reset relay: {error}")
+        self._publish_reset_state(False, f"error: {error}")
+        with self.reset_lock:
+            self.is_resetting = False
+        return False
+
+    def _finish_reset(self) -> bool:
         with self.reset_lock:
             self.is_resetting = False
         
@@ -120,6 +114,42 @@ class ResetController:
         self.logger.info("Reset cycle completed successfully")
         return True
 
+    def activate_reset(self):
+        """Activa el relay de reinicio por el tiempo configurado"""
+        if not self._begin_reset():
+            return False
+        return self._reset_pulse()
+
+    def _reset_pulse(self) -> bool:
+        if self.GPIO:
+            try:
+                self._set_reset_relay(True)
+                # Esperar el tiempo configurado
+                time.sleep(self.activation_time)
+                self._set_reset_relay(False)
+            except Exception as e:
+                return self._fail_reset(e)
+        else:
+            self.logger.info(f"[SIMULATION] Reset relay would be active for {self.activation_time} seconds")
+            time.sleep(self.activation_time)
+
+        return self._finish_reset()
+
+    async def _reset_pulse_async(self) -> bool:
+        """Igual que _reset_pulse, pero espera en el event loop en lugar de ocupar un hilo"""
+        if self.GPIO:
+            try:
+                self._set_reset_relay(True)
+                await asyncio.sleep(self.activation_time)
+                self._set_reset_relay(False)
+            except Exception as e:
+                return self._fail_reset(e)
+        else:
+            self.logger.info(f"[SIMULATION] Reset relay would be active for {self.activation_time} seconds")
+            await asyncio.sleep(self.activation_time)
+
+        return self._finish_reset()
+
     def _publish_reset_state(self, is_active: bool, status: str = ""):
         """Publica el estado del relay de reinicio a ThingsBoard"""
         try:
@@ -136,7 +166,7 @@ class ResetController:
     def cleanup(self):
         """Limpia los recursos GPIO"""
         try:
-            if self.is_raspberry_pi and self.GPIO:
+            if self.GPIO:
                 # Asegurar que el relay esté en estado inactivo
                 inactive_state = self.GPIO.LOW if self.active_high else self.GPIO.HIGH
                 self.GPIO.output(self.reset_pin, inactive_state)
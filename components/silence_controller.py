@@ -1,36 +1,28 @@
 import threading
 import logging
 import time
+import asyncio
 from config.schema import SilenceRelayConfig
 from typing import Dict, Any
 
 class SilenceController:
-    def __init__(self, silence_config: SilenceRelayConfig, mqtt_handler):
+    def __init__(self, silence_config: SilenceRelayConfig, mqtt_handler, gpio: Any):
         self.silence_pin = silence_config.pin
         self.activation_time = silence_config.activation_time
         self.active_high = silence_config.active_high
         self.mqtt_handler = mqtt_handler
-        self.is_raspberry_pi = self._is_raspberry_pi()
-        self.GPIO = None
+        self.GPIO = None  # Backend GPIO (RPi.GPIO o SimulatedGpio); None si no se pudo configurar
         self.is_silencing = False
+        self.active_until = 0.0  # Instante (monotonic) en que termina el pulso en curso
         self.silence_lock = threading.Lock()
+        self.loop: asyncio.AbstractEventLoop | None = None  # Event loop del runtime asyncio, si se usa
+        self.tasks: set[asyncio.Task] = set()  # Referencias a las activaciones en curso en el loop
         self.logger = logging.getLogger(__name__)
 
-        if self.is_raspberry_pi:
-            self._setup_gpio()
-        else:
-            self.logger.warning("Not running on Raspberry Pi. Silence control will be simulated.")
-
-    def _is_raspberry_pi(self):
-        try:
-            with open('/sys/firmware/devicetree/base/model', 'r') as model:
-                return 'Raspberry Pi' in model.read()
-        except:
-            return False
+        self._setup_gpio(gpio)
 
-    def _setup_gpio(self):
+    def _setup_gpio(self, GPIO: Any):
         try:
-            import RPi.GPIO as GPIO
             GPIO.setmode(GPIO.BCM)
             GPIO.setup(self.silence_pin, GPIO.OUT)
             # Set initial state to inactive
@@ -38,12 +30,8 @@ class SilenceController:
             GPIO.output(self.silence_pin, initial_state)
             self.GPIO = GPIO
             self.logger.info(f"Silence relay GPIO {self.silence_pin} configured successfully")
-        except ImportError:
-            self.logger.warning("RPi.GPIO module not found. Silence control will be disabled.")
-            self.is_raspberry_pi = False
         except Exception as e:
-            self.logger.error(f"Error setting up GPIO for silence relay: {e}")
-            self.is_raspberry_pi = False
+            self.logger.error(f"Error setting up GPIO for silence relay: {e}. Silence control will be simulated.")
 
     def handle_silence_rpc(self, params: Dict[str, Any]) -> str:
         """
@@ -62,8 +50,18 @@ class SilenceController:
             activate = params.get('activate', True) if isinstance(params, dict) else True
             
             if activate:
-                # Ejecutar en un hilo separado para no bloquear
-                threading.Thread(target=self.activate_silence, daemon=True).start()
+                if not self._begin_silence():
+                    # Pulso en curso: el comando repetido se une a él y se responde de inmediato
+                    self.mqtt_handler.rpc_executor.record_coalesced('silence_pulse')
+                    return f"Silencio ya en curso, {self._remaining_time():.0f} s restantes"
+                if self.loop is not None:
+                    # Runtime asyncio: el pulso es una tarea del event loop
+                    task = self.loop.create_task(self._silence_pulse_async())
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+                elif self.mqtt_handler.rpc_executor.submit('silence_pulse', self._silence_pulse) is None:
+                    self._fail_silence(RuntimeError("RPC pool full"))
+                    return "Comando de silencio rechazado: dispositivo ocupado"
                 return "Comando de silencio aceptado y en ejecución"
             else:
                 return "Comando de silencio recibido pero no activado (activate=False)"
@@ -73,45 +71,41 @@ class SilenceController:
             self.logger.error(error_msg)
             return error_msg
 
-    def activate_silence(self):
-        """Activa el relay de silencio por el tiempo configurado"""
+    def _begin_silence(self) -> bool:
+        """Marca el silencio en curso y publica su inicio; False si ya había uno"""
         with self.silence_lock:
             if self.is_silencing:
-                self.logger.warning("Silence already in progress, ignoring new request")
+                self.logger.info("Silence already in progress, coalescing request")
                 return False
 
             self.is_silencing = True
+            self.active_until = time.monotonic() + self.activation_time
             
         self.logger.info(f"Activating silence relay for {self.activation_time} seconds")
         
         # Publicar estado inicial
         self._publish_silence_state(True, "started")
-        
-        if self.is_raspberry_pi and self.GPIO:
-            try:
-                # Activar el relay
-                active_state = self.GPIO.HIGH if self.active_high else self.GPIO.LOW
-                self.GPIO.output(self.silence_pin, active_state)
-                self.logger.info(f"Silence relay GPIO {self.silence_pin} activated")
-                
-                # Esperar el tiempo configurado
-                time.sleep(self.activation_time)
-                
-                # Desactivar el relay
-                inactive_state = self.GPIO.LOW if self.active_high else self.GPIO.HIGH
-                self.GPIO.output(self.silence_pin, inactive_state)
-                self.logger.info(f"Silence relay GPIO {self.silence_pin} deactivated")
-                
-            except Exception as e:
-                self.logger.error(f"Error controlling silence relay: {e}")
-                self._publish_silence_state(False, f"error: {e}")
-                with self.silence_lock:
-                    self.is_silencing = False
-                return False
+        return True
+
+    def _remaining_time(self) -> float:
+        return max(0.0, self.active_until - time.monotonic())
+
+    def _set_silence_relay(self, active: bool) -> None:
+        if active:
+            state = self.GPIO.HIGH if self.active_high else self.GPIO.LOW
         else:
-            self.logger.info(f"[SIMULATION] Silence relay would be active for {self.activation_time} seconds")
-            time.sleep(self.activation_time)
-        
+            state = self.GPIO.LOW if self.active_high else self.GPIO.HIGH
+        self.GPIO.output(self.silence_pin, state)
+        self.logger.info(f"Silence relay GPIO {self.silence_pin} {'activated' if active else 'deactivated'}")
+
+    def _fail_silence(self, error: Exception) -> bool:
+        self.logger.error(f"Error controlling silence relay: {error}")
+        self._publish_silence_state(False, f"error: {error}")
+        with self.silence_lock:
+            self.is_silencing = False
+        return False
+
+    def _finish_silence(self) -> bool:
         with self.silence_lock:
             self.is_silencing = False
         
@@ -120,6 +114,42 @@ class SilenceController:
         self.logger.info("Silence cycle completed successfully")
         return True
 
+    def activate_silence(self):
+        """Activa el relay de silencio por el tiempo configurado"""
+        if not self._begin_silence():
+            return False
+        return self._silence_pulse()
+
+    def _silence_pulse(self) -> bool:
+        if self.GPIO:
+            try:
+                self._set_silence_relay(True)
+                # Esperar el tiempo configurado
+                time.sleep(self.activation_time)
+                self._set_silence_relay(False)
+            except Exception as e:
+                return self._fail_silence(e)
+        else:
+            self.logger.info(f"[SIMULATION] Silence relay would be active for {self.activation_time} seconds")
+            time.sleep(self.activation_time)
+
+        return self._finish_silence()
+
+    async def _silence_pulse_async(self) -> bool:
+        """Igual que _silence_pulse, pero espera en el event loop en lugar de ocupar un hilo"""
+        if self.GPIO:
+            try:
+                self._set_silence_relay(True)
+                await asyncio.sleep(self.activation_time)
+                self._set_silence_relay(False)
+            except Exception as e:
+                return self._fail_silence(e)
+        else:
+            self.logger.info(f"[SIMULATION] Silence relay would be active for {self.activation_time} seconds")
+            await asyncio.sleep(self.activation_time)
+
+        return self._finish_silence()
+
     def _publish_silence_state(self, is_active: bool, status: str = ""):
         """Publica el estado del relay de silencio a ThingsBoard"""
         try:
@@ -136,7 +166,7 @@ class SilenceController:
     def cleanup(self):
         """Limpia los recursos GPIO"""
         try:
-            if self.is_raspberry_pi and self.GPIO:
+            if self.GPIO:
                 # Asegurar que el relay esté en estado inactivo
                 inactive_state = self.GPIO.LOW if self.active_high else self.GPIO.HIGH
                 self.GPIO.output(self.silence_pin, inactive_state)
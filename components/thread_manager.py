@@ -2,12 +2,14 @@ import logging
 import time
 import threading
 from typing import List, Union, Callable, Dict
+from app_utils.metrics import REGISTRY
 
 class ThreadManager:
     def __init__(self):
         self.threads: Dict[str, threading.Thread] = {}
         self.shutdown_flags: Dict[str, threading.Event] = {}
         self.logger: logging.Logger = logging.getLogger(__name__)
+        self.restarts = REGISTRY.counter('facp_thread_restarts_total', 'Tasks restarted after dying')
 
     def start_threads(self, thread_configs: List[Union[threading.Thread, Callable]]):
         for config in thread_configs:
@@ -41,6 +43,7 @@ class ThreadManager:
         new_thread.daemon = True
         new_thread.start()
         self.threads[thread_name] = new_thread
+        self.restarts.inc()
         self.logger.info(f"Restarted thread: {thread_name}")
 
     def stop_thread(self, thread_name: str):
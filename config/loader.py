@@ -1,14 +1,21 @@
 import yaml
 from typing import Dict, Any
-from .schema import ConfigSchema
+from .schema import ConfigSchema, PanelProfileSchema
+
+# Parser en C de libyaml si está disponible; mismo resultado que safe_load
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
 def load_yaml(file_path: str) -> Dict[str, Any]:
     with open(file_path, 'r') as file:
-        return yaml.safe_load(file)
+        return yaml.load(file, Loader=SafeLoader)
 
 def load_and_validate_config(config_path: str) -> ConfigSchema:
     config_data = load_yaml(config_path)
     return ConfigSchema(**config_data)
 
 def load_event_severity_levels(file_path: str) -> Dict[int, Dict[str, int]]:
-    return load_yaml(file_path)
\ No newline at end of file
+    return load_yaml(file_path)
+
+def load_panel_profiles(file_path: str) -> Dict[int, PanelProfileSchema]:
+    profiles_data = load_yaml(file_path) or {}
+    return {int(code): PanelProfileSchema(**profile) for code, profile in profiles_data.items()}
\ No newline at end of file
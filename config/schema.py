@@ -1,12 +1,37 @@
 from pydantic import BaseModel
+from typing import Literal, List, Optional
+
+class RateLimitConfig(BaseModel):
+    limit: int  # Máximo de mensajes
+    period: float  # Por cada período en segundos
+
+# Límites por defecto de ThingsBoard: 100/s, 3000/min y 7000/h
+DEFAULT_RATE_LIMITS = [
+    RateLimitConfig(limit=100, period=1),
+    RateLimitConfig(limit=3000, period=60),
+    RateLimitConfig(limit=7000, period=3600),
+]
 
 class ThingsboardConfig(BaseModel):
     device_token: str
     host: str
     port: int
+    batch_size: int = 50  # Máximo de eventos en cola enviados en un solo mensaje de telemetría
+    rate_limits: List[RateLimitConfig] = DEFAULT_RATE_LIMITS
+    rate_limit_state_file: str = "rate_limit_state.json"  # Estado del limitador entre reinicios ('' = no guardar)
+    inflight_window: int = 10  # Mensajes QoS1 enviados sin PUBACK como máximo
+    ack_timeout: float = 15  # Segundos sin PUBACK tras los que un mensaje se reenvía
+    delta_telemetry: bool = True  # Enviar solo las claves de telemetría y atributos que cambiaron
+    keyframe_interval: float = 3600  # Segundos entre envíos completos con delta_telemetry
+    rpc_workers: int = 4  # Hilos para comandos RPC y pulsos de relay
+    rpc_max_pending: int = 16  # Tareas RPC en cola o en ejecución antes de rechazar nuevas
 
 class SerialConfig(BaseModel):
     puerto: str
+    read_mode: Literal['event', 'polling'] = 'event'  # 'event' bloquea en select() sobre el puerto, 'polling' revisa in_waiting cada 0.1 s
+    read_timeout: float = 1.0  # Modo 'polling': tiempo máximo en segundos bloqueado esperando datos
+    capture_file: str = ""  # Anillo de captura de los bytes crudos recibidos ('' = deshabilitado)
+    capture_size: int = 4194304  # Bytes del archivo de captura; al llenarse se sobrescribe lo más antiguo
 
 class RelayConfig(BaseModel):
     pin: int
@@ -16,9 +41,12 @@ class RelayConfig(BaseModel):
 class RelayMonitorConfig(BaseModel):
     alarm_pin: int
     trouble_pin: int
-    publish_interval: int
+    publish_interval: int  # Modo 'polling': segundos entre lecturas (se publican siempre)
     alarm_active_high: bool
     trouble_active_high: bool
+    mode: Literal['edge', 'polling'] = 'edge'  # 'edge' publica al detectar un flanco, 'polling' lee cada publish_interval
+    debounce_ms: int = 50  # Modo 'edge': ms sin flancos antes de leer el estado
+    keepalive_interval: int = 300  # Modo 'edge': segundos entre publicaciones del estado completo sin cambios
 
 class SilenceRelayConfig(BaseModel):
     pin: int
@@ -30,6 +58,53 @@ class ResetRelayConfig(BaseModel):
     activation_time: int  # Tiempo en segundos que el relay estará activo
     active_high: bool  # True si el relay se activa con HIGH, False si se activa con LOW
 
+class GpioConfig(BaseModel):
+    backend: Literal['auto', 'rpi', 'simulated'] = 'auto'  # 'auto' usa RPi.GPIO en una Raspberry Pi y el simulado en otro equipo
+    script: Optional[str] = None  # Backend simulado: guion JSON Lines de cambios en las entradas
+    script_speed: float = 1.0  # Factor de velocidad del guion
+
+class EventsConfig(BaseModel):
+    unknown_report_interval: int = 3600  # Segundos entre publicaciones de eventos no reconocidos (0 = deshabilitado)
+    max_unknown_events: int = 100  # Máximo de IDs no reconocidos distintos que se contabilizan
+
+class QueueExpiryRule(BaseModel):
+    severity: Optional[int] = None  # Severidad del evento (None = telemetría sin severidad, p. ej. estado de relays)
+    max_age: Optional[float] = None  # Segundos desde la captura tras los que se descarta
+    max_items: Optional[int] = None  # Máximo en cola con esta severidad; se descartan los más antiguos
+
+class QueueConfig(BaseModel):
+    wal_dir: str = "queue_wal"  # Directorio del log de la cola de salida
+    segment_size: int = 1048576  # Bytes por segmento del log
+    fsync: Literal['always', 'interval', 'never'] = 'interval'  # Cuándo forzar el log a disco
+    fsync_interval: float = 1.0  # Segundos entre fsync con la política 'interval'
+    max_memory_items: int = 5000  # Elementos en memoria antes de desbordar a disco (0 = sin límite)
+    spill_dir: str = "queue_spill"  # Directorio temporal de los bloques desbordados
+    spill_chunk_items: int = 500  # Elementos por bloque desbordado
+    expiry: List[QueueExpiryRule] = []  # Reglas de expiración por severidad
+    priority: bool = True  # Carriles por severidad: las alarmas (3) salen antes que el backlog
+    starvation_limit: int = 5  # Lotes seguidos que un carril con elementos puede esperar (0 = prioridad estricta)
+
+class MetricsConfig(BaseModel):
+    enabled: bool = True  # Servir las métricas en formato Prometheus en http://host:port/metrics
+    host: str = "127.0.0.1"  # Solo local por defecto
+    port: int = 9108
+    telemetry_interval: int = 0  # Segundos entre envíos de las métricas como telemetría (0 = deshabilitado)
+
+class ProfilingConfig(BaseModel):
+    enabled: bool = False  # Registrar el RPC 'perfilar_proceso'
+    output_dir: str = "profiles"  # Directorio de los resultados comprimidos
+    default_duration: float = 5  # Segundos de perfilado si el RPC no indica duration
+    max_duration: float = 30  # Duración máxima aceptada
+    sample_interval_ms: int = 10  # Modo 'stack': ms entre muestras de las pilas
+    traceback_frames: int = 10  # Modo 'memory': frames guardados por asignación
+    top_n: int = 10  # Filas del resumen devuelto en la respuesta RPC
+    max_files: int = 10  # Resultados conservados; se borran los más antiguos
+
+class TracingConfig(BaseModel):
+    enabled: bool = True  # Medir la latencia de cada evento del primer byte serial al PUBACK
+    report_interval: int = 300  # Segundos entre envíos de los percentiles por etapa como telemetría (0 = no enviar)
+    max_traced: int = 1000  # Eventos en curso trazados como máximo
+
 class ConfigSchema(BaseModel):
     thingsboard: ThingsboardConfig
     serial: SerialConfig
@@ -38,3 +113,41 @@ class ConfigSchema(BaseModel):
     silence_relay: SilenceRelayConfig
     reset_relay: ResetRelayConfig
     id_modelo_panel: int
+    runtime: Literal['threads', 'asyncio'] = 'threads'  # 'asyncio' ejecuta serial, MQTT, GPIO y RPC en un solo event loop
+    gpio: GpioConfig = GpioConfig()
+    events: EventsConfig = EventsConfig()
+    queue: QueueConfig = QueueConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
+    tracing: TracingConfig = TracingConfig()
+
+
+class PanelSerialSettings(BaseModel):
+    baudrate: int = 9600
+    bytesize: int = 8
+    parity: Literal['none', 'even', 'odd'] = 'none'
+    stopbits: int = 1
+    xonxoff: bool = False
+    timeout: float = 1
+
+class PanelFramingConfig(BaseModel):
+    mode: Literal['line', 'block', 'header'] = 'line'
+    terminators: str = "\n"  # Caracteres que terminan una línea en el flujo serial
+    report_delimiter: str = ""
+    max_report_delimiter_count: int = -1
+    complete_pattern: Optional[str] = None  # Modo 'block': línea que cierra un mensaje
+    header_pattern: Optional[str] = None  # Modo 'header': línea que inicia un evento
+    message_timeout: Optional[float] = None  # Segundos sin datos para publicar lo acumulado
+
+class PanelParserConfig(BaseModel):
+    header_pattern: Optional[str] = None  # Si existe, la primera línea trae la fecha y la segunda el evento
+    patterns: List[str]  # Se prueban en orden sobre la línea del evento, gana el primero que coincide
+    meta_date_tokens: int = 2  # Tokens iniciales del grupo 'meta' que forman FACP_date
+    description_split: Optional[str] = None  # Separador (regex) de los campos del grupo 'description'
+    description_join: str = " | "
+
+class PanelProfileSchema(BaseModel):
+    name: str
+    serial: PanelSerialSettings = PanelSerialSettings()
+    framing: PanelFramingConfig = PanelFramingConfig()
+    parser: PanelParserConfig
@@ -1,12 +1,67 @@
+import atexit
 import logging
 import logging.config
+import logging.handlers
+import queue
 import yaml
 import os
 
-def setup_logging(config_path: str) -> None:
+DEFAULT_LOG_QUEUE_SIZE = 10000
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que nunca bloquea a quien registra: si la cola está llena
+    descarta el registro y lo cuenta. El formateo (getMessage y el formatter)
+    ocurre en el hilo del QueueListener, no en el que registra, así que los
+    argumentos de los registros no deben modificarse después de registrarlos.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # El traceback no puede esperar: se formatea aquí
+            return super().prepare(record)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogWriter(logging.handlers.QueueListener):
+    """QueueListener cuyo stop() espera lugar en la cola para vaciarla completa"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            super().stop()
+
+def _start_queue_listener(queue_size: int) -> LogWriter:
+    """Mueve los handlers de root a un hilo escritor detrás de una cola acotada"""
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(DroppingQueueHandler(log_queue))
+
+    listener = LogWriter(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+def setup_logging(config_path: str) -> LogWriter:
+    queue_size = DEFAULT_LOG_QUEUE_SIZE
     if os.path.exists(config_path):
         with open(config_path, 'r') as f:
             config = yaml.safe_load(f)
+        queue_size = config.pop('queue_size', queue_size)
         logging.config.dictConfig(config)
         print(f"Logging configuration loaded from {config_path}")
     else:
@@ -17,5 +72,5 @@ def setup_logging(config_path: str) -> None:
                                 logging.FileHandler("app.log")
                             ])
         print(f"Logging configuration file not found at {config_path}. Using basic configuration.")
-    
-    logging.getLogger().setLevel(logging.DEBUG)
\ No newline at end of file
+
+    return _start_queue_listener(queue_size)
@@ -1,5 +1,5 @@
 import os
-from config.loader import load_and_validate_config, load_event_severity_levels
+from config.loader import load_and_validate_config, load_event_severity_levels, load_panel_profiles
 from logging_setup import setup_logging
 from app.core import Application
 
@@ -14,9 +14,10 @@ def main():
     # Load configurations
     config = load_and_validate_config(os.path.join(current_dir, "config", "config.yml"))
     event_severity_levels = load_event_severity_levels(os.path.join(current_dir, "config", "eventSeverityLevels.yml"))
+    panel_profiles = load_panel_profiles(os.path.join(current_dir, "Codigos_FACP.yml"))
 
     # Initialize and run the application
-    app = Application(config, event_severity_levels)
+    app = Application(config, event_severity_levels, panel_profiles)
     app.start()
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+"""Recuperación del log de la cola (WriteAheadLog, SafeQueue) y migración de la copia pickle antigua"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app_utils.file_operations import save_to_file
+from app_utils.queue_operations import SafeQueue
+from app_utils.write_ahead_log import FSYNC_NEVER, SEGMENT_SUFFIX, WriteAheadLog
+from classes.enums import PublishType
+from components.queue_manager import QueueManager
+from config.schema import QueueConfig
+
+
+def telemetry(index):
+    return (PublishType.TELEMETRY, {"ts": 1700000000000 + index, "values": {"event": f"HUMO ACT|{index}", "severity": 1}})
+
+
+def open_log(directory, **kwargs):
+    wal = WriteAheadLog(str(directory), **kwargs)
+    return wal, list(wal.recover())
+
+
+def segments(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX))
+
+
+def test_replay_keeps_order_and_seq(tmp_path):
+    wal, _ = open_log(tmp_path)
+    seqs = [wal.append(telemetry(index)) for index in range(5)]
+    wal.close()
+
+    wal, entries = open_log(tmp_path)
+    assert entries == [(seq, telemetry(index)) for index, seq in enumerate(seqs)]
+    # Los seq siguen después de los recuperados
+    assert wal.append(telemetry(5)) == seqs[-1] + 1
+    wal.close()
+
+
+def test_acked_entries_are_not_replayed(tmp_path):
+    wal, _ = open_log(tmp_path)
+    seqs = [wal.append(telemetry(index)) for index in range(4)]
+    wal.ack([seqs[0], seqs[2]])
+    wal.close()
+
+    wal, entries = open_log(tmp_path)
+    assert entries == [(seqs[1], telemetry(1)), (seqs[3], telemetry(3))]
+    assert wal.pending == 2
+    wal.close()
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    wal, _ = open_log(tmp_path)
+    seqs = [wal.append(telemetry(index)) for index in range(3)]
+    wal.close()
+    path = os.path.join(tmp_path, segments(tmp_path)[-1])
+    size = os.path.getsize(path)
+    os.truncate(path, size - 3)  # Escritura cortada del último registro
+
+    wal, entries = open_log(tmp_path)
+    assert entries == [(seqs[0], telemetry(0)), (seqs[1], telemetry(1))]
+    # El registro incompleto se trunca y un seq nuevo no choca con los recuperados
+    assert os.path.getsize(path) < size - 3
+    assert wal.append(telemetry(3)) > seqs[1]
+    wal.close()
+
+    wal, entries = open_log(tmp_path)
+    assert [item for _, item in entries] == [telemetry(0), telemetry(1), telemetry(3)]
+    wal.close()
+
+
+def test_acked_segments_are_deleted(tmp_path):
+    wal, _ = open_log(tmp_path, segment_size=256, fsync=FSYNC_NEVER)
+    seqs = [wal.append(telemetry(index)) for index in range(20)]
+    assert len(segments(tmp_path)) > 2
+    wal.ack(seqs[:-1])
+    # Solo queda el segmento con la última entrada (y el activo)
+    assert len(segments(tmp_path)) <= 2
+    wal.close()
+
+    wal, entries = open_log(tmp_path, segment_size=256)
+    assert entries == [(seqs[-1], telemetry(19))]
+    assert wal.append(telemetry(20)) == seqs[-1] + 1
+    wal.close()
+
+
+def test_queue_restores_backlog_before_items_put_during_restore(tmp_path):
+    wal, _ = open_log(tmp_path)
+    backlog = [wal.append(telemetry(index)) for index in range(3)]
+    wal.close()
+
+    queue = SafeQueue()
+    queue.begin_restore()
+    queue.put(telemetry(10))
+    wal = WriteAheadLog(str(tmp_path))
+    entries = wal.recover()
+    queue.attach_log(wal)
+    queue.put(telemetry(11))
+    assert queue.restore(entries) == 3
+    assert queue.end_restore() == 2
+
+    batch = queue.get_batch(10)
+    assert [item for _, item in batch] == [telemetry(index) for index in (0, 1, 2, 10, 11)]
+    assert [seq for seq, _ in batch[:3]] == backlog
+    # Los elementos retenidos también quedaron en el log
+    assert wal.pending == 5
+    queue.ack(batch)
+    wal.close()
+
+    _, entries = open_log(tmp_path)
+    assert entries == []
+
+
+def test_items_put_during_restore_are_not_replayed_from_reused_segment(tmp_path):
+    wal, _ = open_log(tmp_path, segment_size=256, fsync=FSYNC_NEVER)
+    seqs = [wal.append(telemetry(index)) for index in range(6)]
+    wal.ack(seqs[:3])
+    wal.close()
+
+    queue = SafeQueue()
+    queue.begin_restore()
+    queue.put(telemetry(100))
+    wal = WriteAheadLog(str(tmp_path), segment_size=256, fsync=FSYNC_NEVER)
+    entries = wal.recover()
+    queue.attach_log(wal)
+    queue.put(telemetry(101))
+    assert queue.restore(entries) == 3
+    assert queue.end_restore() == 2
+
+    assert queue.items() == [telemetry(index) for index in (3, 4, 5, 100, 101)]
+    assert wal.pending == 5
+    queue.ack(queue.get_batch(10))
+    assert wal.pending == 0
+    wal.close()
+
+    _, entries = open_log(tmp_path, segment_size=256)
+    assert entries == []
+
+
+def test_closed_log_ignores_late_writes(tmp_path):
+    wal, _ = open_log(tmp_path)
+    seq = wal.append(telemetry(0))
+    wal.close()
+    # Un hilo de restauración que sigue vivo tras el cierre no debe fallar ni escribir
+    wal.append(telemetry(1))
+    wal.ack([seq])
+
+    _, entries = open_log(tmp_path)
+    assert entries == [(seq, telemetry(0))]
+
+
+def test_log_executor_writes_puts_and_acks_in_order(tmp_path):
+    wal, _ = open_log(tmp_path)
+    queue = SafeQueue(wal=wal)
+    queue.log_executor = ThreadPoolExecutor(max_workers=1)
+    for index in range(50):
+        queue.put(telemetry(index))
+    batch = queue.get_batch(10, timeout=5)
+    queue.ack(batch)
+    queue.log_executor.shutdown(wait=True)
+    queue.log_executor = None
+
+    assert [item for _, item in batch] == [telemetry(index) for index in range(10)]
+    assert queue.qsize() == 40
+    wal.close()
+
+    _, entries = open_log(tmp_path)
+    assert [item for _, item in entries] == [telemetry(index) for index in range(10, 50)]
+
+
+@pytest.fixture
+def queue_config(tmp_path):
+    return QueueConfig(wal_dir=str(tmp_path / "wal"), spill_dir=str(tmp_path / "spill"))
+
+
+def test_legacy_backup_is_migrated_once(tmp_path, queue_config):
+    legacy_path = str(tmp_path / "queue_backup.pkl")
+    save_to_file([telemetry(0), telemetry(1)], legacy_path)
+
+    manager = QueueManager(SafeQueue(), queue_config, legacy_path)
+    manager.load_queue()
+    assert manager.queue.items() == [telemetry(0), telemetry(1)]
+    assert not os.path.exists(legacy_path)
+    manager.close()
+
+    # En el siguiente arranque los elementos salen del log, no otra vez de la copia
+    manager = QueueManager(SafeQueue(), queue_config, legacy_path)
+    manager.load_queue()
+    assert manager.queue.items() == [telemetry(0), telemetry(1)]
+    manager.close()